@@ -6,18 +6,50 @@ import com.intellij.icons.AllIcons
 import com.intellij.openapi.actionSystem.*;
 import com.intellij.openapi.vfs.VfsUtil;
 import com.intellij.openapi.project.Project;
-import com.intellij.ide.actions.SaveAllAction;
+import com.intellij.openapi.command.WriteCommandAction;
+import com.intellij.openapi.fileEditor.FileDocumentManager;
+import com.intellij.openapi.vfs.LocalFileSystem;
+import com.google.gson.Gson;
+import com.google.gson.reflect.TypeToken;
+import java.io.File;
 import liveplugin.*
 
 
-// Функция, которая вызывает действие сохранить всё
-fun saveAllChanges(event: AnActionEvent) {
-  // Получаем экземпляр ActionManager
-  val am = ActionManager.getInstance()
-  // Получаем экземпляр AnAction для действия SaveAllAction
-  val saveAllAction = am.getAction("SaveAll")
-  // Вызываем действие, передавая событие, контекст, место и флаги
-  am.tryToExecute(saveAllAction, null, null, null, true)
+// Функция, которая запускает генератор, передавая ему несохранённые документы вместо сохранения всех файлов:
+// генератор читает их вместо файлов на диске, а новое содержимое изменённых документов возвращает в --overlays-out
+fun runGenerator(project: Project, vararg arguments: String): String {
+  val documentManager = FileDocumentManager.getInstance()
+  // Собираем текст несохранённых документов по путям их файлов
+  val overlays = documentManager.unsavedDocuments.mapNotNull { document ->
+    documentManager.getFile(document)?.let { file -> file.path to document.text }
+  }.toMap()
+  val overlaysFile = File.createTempFile("devnetgen-overlays", ".json")
+  val resultsFile = File.createTempFile("devnetgen-results", ".json")
+  try {
+    overlaysFile.writeText(Gson().toJson(overlays))
+    val result = runShellCommand("dev-netgen-client", *arguments,
+      "--overlays", overlaysFile.path, "--overlays-out", resultsFile.path)
+    applyResults(project, resultsFile)
+    return result.stdout + result.stderr
+  } finally {
+    overlaysFile.delete()
+    resultsFile.delete()
+  }
+}
+
+
+// Функция, которая заменяет текст открытых документов, изменённых генератором
+fun applyResults(project: Project, resultsFile: File) {
+  val text = resultsFile.readText()
+  if (text.isBlank()) return
+  val type = object : TypeToken<Map<String, String>>() {}.type
+  val results: Map<String, String> = Gson().fromJson(text, type)
+  WriteCommandAction.runWriteCommandAction(project) {
+    for ((path, content) in results) {
+      val file = LocalFileSystem.getInstance().findFileByPath(path) ?: continue
+      FileDocumentManager.getInstance().getDocument(file)?.setText(content)
+    }
+  }
 }
 
 
@@ -48,11 +80,9 @@ fun domainUpdate(event: AnActionEvent) {
 
 
 fun summaryPerform(event: AnActionEvent) {
-    saveAllChanges(event);
     val project = event.getProject()!!;
     val filepath = event.virtualFile!!.getPath();
-    val result = runShellCommand("dev-netgen", "summary", filepath);
-    show(result.stdout + result.stderr);
+    show(runGenerator(project, "summary", filepath));
     refreshProject(project);
 }
 
@@ -66,11 +96,9 @@ class CrudAction: AnAction("Create CRUD") {
     }
 
     override fun actionPerformed(event: AnActionEvent) {
-        saveAllChanges(event);
         val project = event.getProject()!!;
         val filepath = event.virtualFile!!.getPath();
-        val result = runShellCommand("dev-netgen", "crud", filepath);
-        show(result.stdout + result.stderr);
+        show(runGenerator(project, "crud", filepath));
         refreshProject(project);
     }
 }
@@ -82,11 +110,9 @@ class LegacyCrudAction: AnAction("Create CRUD: legacy controller") {
     }
 
     override fun actionPerformed(event: AnActionEvent) {
-        saveAllChanges(event);
         val project = event.getProject()!!;
         val filepath = event.virtualFile!!.getPath();
-        val result = runShellCommand("dev-netgen", "crud", filepath, "--legacy-controller");
-        show(result.stdout + result.stderr);
+        show(runGenerator(project, "crud", filepath, "--legacy-controller"));
         refreshProject(project);
     }
 }
@@ -97,11 +123,22 @@ class TestsAction: AnAction("Create Tests") {
     }
 
     override fun actionPerformed(event: AnActionEvent) {
-        saveAllChanges(event);
         val project = event.getProject()!!;
         val filepath = event.virtualFile!!.getPath();
-        val result = runShellCommand("dev-netgen", "tests", filepath);
-        show(result.stdout + result.stderr);
+        show(runGenerator(project, "tests", filepath));
+        refreshProject(project);
+    }
+}
+
+class AllAction: AnAction("Create CRUD, tests and summaries") {
+    override fun update(event: AnActionEvent) {
+       domainUpdate(event)
+    }
+
+    override fun actionPerformed(event: AnActionEvent) {
+        val project = event.getProject()!!;
+        val filepath = event.virtualFile!!.getPath();
+        show(runGenerator(project, "all", filepath));
         refreshProject(project);
     }
 }
@@ -156,6 +193,11 @@ val testsAction = registerAction(
     action = TestsAction()
 )
 
+val allAction = registerAction(
+    id = "Сгенерировать CRUD, тесты и <summary> в Vm/Dto",
+    action = AllAction()
+)
+
 val domainSummaryAction = registerAction(
     id = "Сгенерировать <summary> в файле(-ах) Vm/Dto на основе сущности",
     action = DomainSummariesAction()
@@ -171,6 +213,7 @@ val actionGroup = CustomActionGroup().also { it.isPopup = true }
 actionGroup.add(crudAction)
 actionGroup.add(crudLegacyAction)
 actionGroup.add(testsAction)
+actionGroup.add(allAction)
 actionGroup.add(domainSummaryAction)
 actionGroup.add(applicationSummaryAction)
 
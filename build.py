@@ -0,0 +1,8 @@
+"""
+Сборочный скрипт poetry: компиляция jinja-шаблонов пакета в python-модули (devnetgen/compiled_templates),
+чтобы при запуске генератора шаблоны не разбирались и не компилировались заново
+"""
+from devnetgen.config import compile_templates
+
+if __name__ == '__main__':
+    compile_templates()
@@ -0,0 +1,164 @@
+"""
+Python API dev-netgen для встраивания генерации в другие инструменты: команды выполняются в текущем процессе
+и возвращают сгенерированные файлы и замеры вместо вывода в stdout. По умолчанию API не изменяет файлы на диске,
+не добавляет файлы в git и не сохраняет манифест генерации и индекс решения
+
+    from devnetgen.api import GenerationOptions, generate_crud
+
+    result = generate_crud('src/Domain/Entities/Orders/Order.cs', GenerationOptions(update=True))
+    for artifact in result.artifacts:
+        print(artifact.status, artifact.path)
+"""
+from __future__ import annotations
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Optional, Union
+
+from devnetgen.index import persistence
+from devnetgen.staging import StagingArea, use_overlays
+from devnetgen.timings import timings
+
+if TYPE_CHECKING:
+    from devnetgen.entities import Entity
+
+# Статусы сгенерированных файлов
+created = 'created'
+modified = 'modified'
+
+
+@dataclass
+class Artifact:
+    """
+    Файл, созданный или изменённый генерацией
+
+    Attributes:
+        path: абсолютный путь файла
+        content: новое содержимое (с переводами строк '\\n')
+        status: 'created' - файл не существовал, 'modified' - содержимое файла изменено
+        original: содержимое файла до генерации (None для созданных файлов)
+    """
+    path: Path
+    content: str
+    status: str
+    original: Optional[str] = None
+
+
+@dataclass
+class GenerationOptions:
+    """
+    Параметры генерации
+
+    Attributes:
+        legacy_controller: генерировать контроллер для legacy проектов (crud)
+        update: перегенерировать существующие файлы, входные данные которых изменились (crud, tests)
+        write: записать файлы на диск, сохранить манифест генерации и индекс решения
+        use_git: добавить записанные файлы в git (вместе с write)
+        overlays: содержимое несохранённых буферов редактора по путям файлов, читается вместо файлов на диске
+         (файлы из overlays не записываются на диск и при write)
+    """
+    legacy_controller: bool = False
+    update: bool = False
+    write: bool = False
+    use_git: bool = False
+    overlays: Optional[dict[str, str]] = None
+
+
+@dataclass
+class GenerationResult:
+    """
+    Результат генерации
+
+    Attributes:
+        artifacts: созданные и изменённые файлы в порядке генерации
+        written: файлы, записанные на диск (пусто без GenerationOptions.write)
+        modified_files: существующие файлы, не обновлённые из-за изменений после генерации (update)
+        unmanaged_files: существующие файлы, отсутствующие в манифесте генерации (update)
+        timings: замеры генерации: total - общее время, phases - время фаз в секундах, counters - счётчики операций
+    """
+    artifacts: list[Artifact] = field(default_factory=list)
+    written: list[Path] = field(default_factory=list)
+    modified_files: list[Path] = field(default_factory=list)
+    unmanaged_files: list[Path] = field(default_factory=list)
+    timings: dict = field(default_factory=dict)
+
+
+def generate_crud(entity_path: Union[str, Path], options: GenerationOptions = None) -> GenerationResult:
+    """
+    Сгенерировать CRUD и контроллер сущности (dev-netgen crud)
+    :param entity_path: путь до файла сущности
+    """
+    from devnetgen.executors.crud_executor import CrudExecutor
+
+    def generate(staging: StagingArea, options: GenerationOptions) -> CrudExecutor:
+        executor = CrudExecutor(_load_entity(entity_path, options.update), staging, options.use_git, options.update)
+        executor.create_crud(options.legacy_controller, output=False)
+        return executor
+    return _run(generate, options)
+
+
+def generate_tests(entity_path: Union[str, Path], options: GenerationOptions = None) -> GenerationResult:
+    """
+    Сгенерировать тесты CRUD'а сущности (dev-netgen tests)
+    :param entity_path: путь до файла сущности
+    """
+    from devnetgen.executors.tests_executor import TestsExecutor
+
+    def generate(staging: StagingArea, options: GenerationOptions) -> TestsExecutor:
+        executor = TestsExecutor(_load_entity(entity_path, options.update), staging, options.use_git, options.update)
+        executor.create_tests(output=False)
+        return executor
+    return _run(generate, options)
+
+
+def generate_summaries(path: Union[str, Path], options: GenerationOptions = None) -> GenerationResult:
+    """
+    Добавить summaries в Vm/Dto (dev-netgen summary)
+    :param path: путь до файла сущности (обновляются все её Vm/Dto) или до файла Vm/Dto
+    """
+    from devnetgen.entities import VmDto
+    from devnetgen.executors.summaries_executor import SummariesExecutor
+
+    def generate(staging: StagingArea, options: GenerationOptions) -> Optional[SummariesExecutor]:
+        if str(path).endswith('Vm.cs') or str(path).endswith('Dto.cs'):
+            VmDto(path, staging=staging).add_summaries()
+            return None
+        executor = SummariesExecutor(_load_entity(path, False), staging)
+        executor.add_summaries(output=False)
+        return executor
+    return _run(generate, options)
+
+
+def _load_entity(path: Union[str, Path], update: bool) -> Entity:
+    """ Сущность из кэша или, для update, разобранная с флагами свойств из манифеста генерации """
+    if update:
+        from devnetgen.manifest import GenerationManifest
+        return GenerationManifest.for_entity(path).parse_entity(path)
+    from devnetgen.cache import load_entity
+    return load_entity(path)
+
+
+def _run(generate: Callable[[StagingArea, GenerationOptions], object],
+         options: Optional[GenerationOptions]) -> GenerationResult:
+    """
+    Выполнить генерацию в staging в режиме dry_run (исполнители не пишут на диск), собрать запланированные
+    изменения и, если задан options.write, записать их
+    :param generate: функция, планирующая файлы в staging; возвращает исполнителя или None
+    """
+    options = options or GenerationOptions()
+    started, started_time = timings.snapshot(), time.perf_counter()
+    result = GenerationResult()
+    with persistence(options.write), use_overlays(options.overlays) if options.overlays else nullcontext():
+        staging = StagingArea(dry_run=True)
+        executor = generate(staging, options)
+        for path, (original, _) in staging.changed_files().items():
+            result.artifacts.append(Artifact(path.absolute(), staging.files[path],
+                                             created if original is None else modified, original))
+        if options.write:
+            staging.dry_run = False
+            result.written = executor.write_files() if executor is not None else staging.flush()
+    result.modified_files = list(getattr(executor, 'modified_files', []))
+    result.unmanaged_files = list(getattr(executor, 'unmanaged_files', []))
+    result.timings = {'total': time.perf_counter() - started_time, **timings.since(started)}
+    return result
@@ -0,0 +1,93 @@
+from __future__ import annotations
+import os
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from devnetgen.timings import timings
+
+
+def get_mtime(path: Path | str) -> Optional[int]:
+    """
+    :return: время изменения файла/директории в наносекундах или None, если путь не существует
+    """
+    timings.count('stat')
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class MtimeCache:
+    """
+    Кэш значений, инвалидируемый по времени изменения файлов и директорий, от которых зависит значение.
+    Используется для хранения разобранных моделей между запросами к демону (dev-netgen serve)
+    """
+    def __init__(self):
+        self._entries: dict[Any, tuple[Any, dict[str, Optional[int]]]] = {}
+
+    def get(self, key: Any) -> Any:
+        """
+        :return: значение по ключу или None, если значение отсутствует или изменилась одна из его зависимостей
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, dependencies = entry
+        if any(get_mtime(path) != mtime for path, mtime in dependencies.items()):
+            del self._entries[key]
+            return None
+        return value
+
+    def set(self, key: Any, value: Any, dependencies: Iterable[Path | str]) -> None:
+        """
+        Сохранить значение вместе с текущими временами изменения его зависимостей
+        :param dependencies: пути, изменение которых делает значение недействительным
+        """
+        self._entries[key] = (value, {str(path): get_mtime(path) for path in dependencies})
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+directories_cache = MtimeCache()
+entities_cache = MtimeCache()
+
+
+def list_classes(directory: Path) -> set[str]:
+    """
+    Получить имена классов (.cs файлов) директории, используя кэш листингов
+    :param directory: существующая директория
+    :return: множество имён классов
+    """
+    key = str(directory)
+    classes = directories_cache.get(key)
+    if classes is None:
+        timings.count('listdir')
+        classes = {file.name.removesuffix('.cs') for file in directory.iterdir() if
+                   file.is_file() and file.name.endswith('.cs')}
+        directories_cache.set(key, classes, (directory,))
+    return set(classes)
+
+
+def load_entity(path: str | Path):
+    """
+    Получить разобранную сущность из кэша или разобрать её заново, если изменился файл сущности,
+    файлы навигационных свойств или директории пространств имён, по которым вычислялась модель
+    :param path: путь до файла сущности
+    :return: объект Entity
+    """
+    from devnetgen.entities import Entity
+    from devnetgen.staging import overlays
+
+    if overlays:
+        # Модели, разобранные из буферов редактора, не кэшируются: зависимости от них не отслеживаются по mtime
+        return Entity(path)
+    key = str(Path(path).resolve())
+    entity = entities_cache.get(key)
+    if entity is None:
+        entity = Entity(path)
+        entities_cache.set(key, entity, entity.dependencies())
+    return entity
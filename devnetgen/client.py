@@ -0,0 +1,178 @@
+"""
+Тонкий клиент dev-netgen: передаёт команду запущенному демону (dev-netgen serve),
+а при его отсутствии выполняет команду в текущем процессе.
+Модуль намеренно импортирует только стандартную библиотеку, чтобы запуск клиента был быстрым
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Optional
+
+
+def get_socket_path(socket_path: Optional[str] = None) -> Path:
+    """
+    :param socket_path: явно заданный путь до сокета
+    :return: путь до unix-сокета демона (DEVNETGEN_SOCKET или сокет в XDG_RUNTIME_DIR/временной директории)
+    """
+    if socket_path:
+        return Path(socket_path)
+    if env_path := os.environ.get('DEVNETGEN_SOCKET'):
+        return Path(env_path)
+    import tempfile
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return Path(runtime_dir) / f'devnetgen-{os.getuid()}.sock'
+
+
+def send_request(request: dict[str, Any], socket_path: Optional[Path] = None) -> Optional[dict[str, Any]]:
+    """
+    Отправить запрос демону. Без файла сокета демон не запущен: модуль socket при этом не импортируется
+    :return: ответ демона или None, если демон не запущен
+    """
+    path = socket_path or get_socket_path()
+    if not path.exists():
+        return None
+    import socket
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(str(path))
+    except OSError:
+        client.close()
+        return None
+
+    with client, client.makefile('rwb') as stream:
+        stream.write(json.dumps(request, ensure_ascii=False).encode('utf-8') + b'\n')
+        stream.flush()
+        line = stream.readline()
+    return json.loads(line) if line else None
+
+
+def is_running(socket_path: Optional[Path] = None) -> bool:
+    """ Проверка, запущен ли демон """
+    return send_request({'command': 'ping'}, socket_path) is not None
+
+
+def read_overlays(overlays_path: Optional[str] = None, stdin_path: Optional[str] = None) -> Optional[dict[str, str]]:
+    """
+    Прочитать содержимое несохранённых буферов редактора, передаваемое команде вместо файлов на диске
+    :param overlays_path: файл JSON {путь: содержимое} ('-' - читать JSON из stdin)
+    :param stdin_path: путь файла, содержимое которого передано в stdin
+    :return: содержимое буферов по абсолютным путям или None, если буферы не переданы
+    :raise ValueError: некорректный файл буферов или stdin занят дважды
+    """
+    if overlays_path == '-' and stdin_path:
+        raise ValueError('--stdin нельзя использовать вместе с --overlays -')
+    files = {}
+    if overlays_path:
+        try:
+            if overlays_path == '-':
+                files = json.load(sys.stdin)
+            else:
+                with open(overlays_path, 'r', encoding='utf-8') as file:
+                    files = json.load(file)
+        except (OSError, ValueError) as error:
+            raise ValueError(f'Не удалось прочитать буферы редактора {overlays_path}: {error}')
+        if not isinstance(files, dict) or not all(isinstance(text, str) for text in files.values()):
+            raise ValueError(f'Буферы редактора {overlays_path} должны быть объектом JSON {{путь: содержимое}}')
+    if stdin_path:
+        files[stdin_path] = sys.stdin.read()
+    return {str(Path(path).absolute()): text for path, text in files.items()} or None
+
+
+def write_overlays(path: str, results: dict[str, str]):
+    """ Записать новое содержимое изменённых буферов редактора в файл JSON {путь: содержимое} """
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(results, file, ensure_ascii=False)
+
+
+def parse_args(argv: list[str]) -> dict[str, Any]:
+    """
+    Разобрать аргументы командной строки в запрос к демону
+    :param argv: аргументы в формате dev-netgen (пр. ["crud", "path/to/entity.cs", "--legacy-controller"])
+    :return: запрос; путь --overlays-out передаётся в ключе overlays_out и демоном не используется
+    """
+    parser = argparse.ArgumentParser(prog='dev-netgen-client')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for command in ('crud', 'tests', 'summary', 'all'):
+        subparser = subparsers.add_parser(command)
+        subparser.add_argument('--dry-run', action='store_true')
+        subparser.add_argument('--diff', action='store_true')
+        subparser.add_argument('--timings', action='store_true')
+        subparser.add_argument('--timings-json', action='store_true')
+        subparser.add_argument('--stdin', action='store_true')
+        subparser.add_argument('--overlays')
+        subparser.add_argument('--overlays-out')
+        if command == 'summary':
+            subparser.add_argument('path', nargs='?')
+            subparser.add_argument('--all', action='store_true', dest='all_files')
+            subparser.add_argument('--jobs', '-j', type=int)
+            continue
+        subparser.add_argument('paths', nargs='+')
+        subparser.add_argument('--jobs', '-j', type=int)
+        subparser.add_argument('--no-git', action='store_true')
+        subparser.add_argument('--update', action='store_true')
+        if command in ('crud', 'all'):
+            subparser.add_argument('--legacy-controller', action='store_true')
+
+    namespace = vars(parser.parse_args(argv))
+    command = namespace.pop('command')
+    timings, timings_json = namespace.pop('timings'), namespace.pop('timings_json')
+    namespace['timings'] = 'json' if timings_json else 'text' if timings else None
+    if 'path' in namespace:
+        if namespace['path'] or namespace['all_files']:
+            namespace['path'] = str(Path(namespace['path'] or os.getcwd()).absolute())
+    else:
+        namespace['paths'] = [str(Path(path).absolute()) for path in namespace['paths']]
+
+    stdin, overlays_out = namespace.pop('stdin'), namespace.pop('overlays_out')
+    stdin_path = None
+    if stdin:
+        stdin_paths = [namespace['path']] if 'path' in namespace else namespace['paths']
+        if len(stdin_paths) != 1 or stdin_paths[0] is None or namespace.get('all_files'):
+            parser.error('--stdin: нужен ровно один путь файла, содержимое которого передано в stdin')
+        stdin_path = stdin_paths[0]
+    try:
+        namespace['overlays'] = read_overlays(namespace['overlays'], stdin_path)
+    except ValueError as error:
+        parser.error(str(error))
+    request = {'command': command, 'arguments': namespace}
+    if overlays_out:
+        request['overlays_out'] = str(Path(overlays_out).absolute())
+    return request
+
+
+def run_locally(request: dict[str, Any]) -> dict[str, str]:
+    """
+    Выполнить команду в текущем процессе без typer (импортируются только модули, нужные команде)
+    :return: новое содержимое изменённых командой буферов редактора
+    """
+    from devnetgen.commands import UsageError, commands
+    try:
+        return commands[request['command']](**request['arguments'])
+    except UsageError as error:
+        sys.stderr.write(f'dev-netgen-client: ошибка: {error}\n')
+        sys.exit(2)
+
+
+def main(argv: Optional[list[str]] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    request = parse_args(argv)
+    response = send_request(request)
+
+    if response is None:
+        results = run_locally(request)
+    else:
+        sys.stdout.write(response['output'])
+        sys.stderr.write(response.get('stderr', ''))
+        if not response['ok']:
+            sys.stderr.write(response['error'])
+            sys.exit(1)
+        results = response.get('overlays', {})
+    if request.get('overlays_out'):
+        write_overlays(request['overlays_out'], results)
+
+
+if __name__ == '__main__':
+    main()
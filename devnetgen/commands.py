@@ -0,0 +1,200 @@
+"""
+Команды dev-netgen без зависимости от typer: вызываются CLI (devnetgen.main), клиентом при незапущенном демоне
+(devnetgen.client) и демоном (devnetgen.server). Модули генерации импортируются внутри команд,
+чтобы каждая команда загружала только нужное ей (summary не импортирует конструкторы CRUD и jinja).
+Время этих импортов замеряется фазой imports
+"""
+from __future__ import annotations
+from functools import wraps
+from typing import Callable, Optional
+
+from devnetgen.timings import output_formats, report, timings as measurements
+
+
+class UsageError(ValueError):
+    """ Некорректные аргументы команды """
+
+
+def _timed(command: Callable[..., dict[str, str]]) -> Callable[..., dict[str, str]]:
+    """ Добавить команде параметр timings: формат отчёта о замерах фаз ('text', 'json') или None """
+    @wraps(command)
+    def wrapper(*args, timings: Optional[str] = None, **kwargs):
+        if timings is not None and timings not in output_formats:
+            raise UsageError(f'Неизвестный формат замеров: {timings}')
+        with report(timings):
+            return command(*args, **kwargs)
+    return wrapper
+
+
+def _overlaid(command: Callable[..., None]) -> Callable[..., dict[str, str]]:
+    """
+    Добавить команде параметр overlays: содержимое несохранённых буферов редактора по путям файлов,
+    читается вместо файлов на диске. Изменённые командой файлы из overlays не записываются на диск
+    :return: команда, возвращающая новое содержимое изменённых ею буферов по путям
+    """
+    @wraps(command)
+    def wrapper(*args, overlays: Optional[dict[str, str]] = None, **kwargs):
+        if not overlays:
+            command(*args, **kwargs)
+            return {}
+        with measurements.phase('imports'):
+            from devnetgen.staging import use_overlays
+        with use_overlays(overlays) as results:
+            command(*args, **kwargs)
+        for path in results:
+            print(f'Изменён буфер редактора (не записан на диск): {path}')
+        return {str(path): text for path, text in results.items()}
+    return wrapper
+
+
+def _dry_run_persistence(command: Callable[..., dict[str, str]]) -> Callable[..., dict[str, str]]:
+    """ С dry_run команда не сохраняет индекс решения на диск (не создаёт .devnetgen в решении) """
+    @wraps(command)
+    def wrapper(*args, **kwargs):
+        with measurements.phase('imports'):
+            from devnetgen.index import persistence
+        with persistence(not kwargs.get('dry_run', False)):
+            return command(*args, **kwargs)
+    return wrapper
+
+
+def _expand_paths(paths: list[str]) -> list[str]:
+    with measurements.phase('imports'):
+        from devnetgen.executors.batch_executor import expand_paths
+    if not (expanded := expand_paths(paths)):
+        raise UsageError(f'Не найдено файлов сущностей: {" ".join(paths)}')
+    return expanded
+
+
+def _load_entity(path: str, update: bool):
+    """ Сущность из кэша или, для --update, разобранная с флагами свойств из манифеста генерации """
+    with measurements.phase('imports'):
+        if update:
+            from devnetgen.manifest import GenerationManifest
+        else:
+            from devnetgen.cache import load_entity
+    if update:
+        return GenerationManifest.for_entity(path).parse_entity(path)
+    return load_entity(path)
+
+
+@_timed
+@_dry_run_persistence
+@_overlaid
+def create_crud(paths: list[str], legacy_controller: bool = False, jobs: Optional[int] = None,
+                dry_run: bool = False, diff: bool = False, no_git: bool = False, update: bool = False):
+    with measurements.phase('imports'):
+        from devnetgen.executors.batch_executor import BatchExecutor
+        from devnetgen.executors.crud_executor import CrudExecutor
+        from devnetgen.staging import StagingArea
+
+    paths = _expand_paths(paths)
+    if len(paths) > 1:
+        BatchExecutor(paths, jobs, dry_run, diff, use_git=not no_git,
+                      update=update).create_crud(legacy_controller=legacy_controller)
+        return
+
+    entity = _load_entity(paths[0], update)
+    executor = CrudExecutor(entity, StagingArea(dry_run, diff), use_git=not no_git, update=update)
+    executor.create_crud(legacy_controller=legacy_controller)
+
+
+@_timed
+@_dry_run_persistence
+@_overlaid
+def create_tests(paths: list[str], jobs: Optional[int] = None, dry_run: bool = False, diff: bool = False,
+                 no_git: bool = False, update: bool = False):
+    with measurements.phase('imports'):
+        from devnetgen.executors.batch_executor import BatchExecutor
+        from devnetgen.executors.tests_executor import TestsExecutor
+        from devnetgen.staging import StagingArea
+
+    paths = _expand_paths(paths)
+    if len(paths) > 1:
+        BatchExecutor(paths, jobs, dry_run, diff, use_git=not no_git, update=update).create_tests()
+        return
+
+    entity = _load_entity(paths[0], update)
+    executor = TestsExecutor(entity, StagingArea(dry_run, diff), use_git=not no_git, update=update)
+    executor.create_tests()
+
+
+@_timed
+@_dry_run_persistence
+@_overlaid
+def add_summaries(path: Optional[str] = None, all_files: bool = False, jobs: Optional[int] = None,
+                  dry_run: bool = False, diff: bool = False):
+    with measurements.phase('imports'):
+        from devnetgen.staging import StagingArea
+        if all_files:
+            from devnetgen.executors.summaries_executor import SummariesSweepExecutor
+        elif path is not None and (path.endswith('Vm.cs') or path.endswith('Dto.cs')):
+            from devnetgen.entities import VmDto
+        else:
+            from devnetgen.cache import load_entity
+            from devnetgen.executors.summaries_executor import SummariesExecutor
+
+    staging = StagingArea(dry_run, diff)
+    if all_files:
+        SummariesSweepExecutor.from_path(path, staging, jobs).add_summaries()
+        return
+    if path is None:
+        raise UsageError('Не указан путь до файла сущности или Vm/Dto')
+
+    if path.endswith('Vm.cs') or path.endswith('Dto.cs'):
+        entity = VmDto(path, staging=staging)
+        entity.add_summaries()
+        if dry_run:
+            print(staging.describe(), end='')
+        staging.flush()
+    else:
+        entity = load_entity(path)
+        executor = SummariesExecutor(entity, staging)
+        executor.add_summaries()
+
+
+@_timed
+@_dry_run_persistence
+@_overlaid
+def create_all(paths: list[str], legacy_controller: bool = False, jobs: Optional[int] = None, dry_run: bool = False,
+               diff: bool = False, no_git: bool = False, update: bool = False):
+    """ CRUD, тесты и summaries Vm/Dto за один запуск: контекст генерации сущности вычисляется один раз """
+    with measurements.phase('imports'):
+        from devnetgen.executors import CrudExecutor, GenerationContext, SummariesExecutor, TestsExecutor
+        from devnetgen.executors.batch_executor import BatchExecutor
+        from devnetgen.staging import StagingArea
+
+    paths = _expand_paths(paths)
+    if len(paths) > 1:
+        BatchExecutor(paths, jobs, dry_run, diff, use_git=not no_git,
+                      update=update).create_all(legacy_controller=legacy_controller)
+        return
+
+    entity = _load_entity(paths[0], update)
+    context = GenerationContext(entity, persist=not dry_run)
+    CrudExecutor(entity, StagingArea(dry_run, diff), use_git=not no_git, update=update,
+                 context=context).create_crud(legacy_controller=legacy_controller)
+    TestsExecutor(entity, StagingArea(dry_run, diff), use_git=not no_git, update=update,
+                  context=context).create_tests()
+    SummariesExecutor(entity, StagingArea(dry_run, diff), context=context).add_summaries()
+
+
+def watch(path: Optional[str] = None, polling: bool = False, interval: float = 0.5, dry_run: bool = False,
+          diff: bool = False):
+    """ Не регистрируется в commands: выполняется до прерывания и не подходит для запросов к демону """
+    from devnetgen.executors.watch_executor import WatchExecutor
+    from devnetgen.staging import StagingArea
+    from devnetgen.watcher import create_watcher
+
+    if interval <= 0:
+        raise UsageError('Интервал опроса должен быть положительным')
+    executor = WatchExecutor.from_path(path, StagingArea(dry_run, diff))
+    executor.watch(create_watcher(executor.domain_path, polling, interval))
+
+
+commands: dict[str, Callable[..., dict[str, str]]] = {
+    'crud': create_crud,
+    'tests': create_tests,
+    'summary': add_summaries,
+    'all': create_all,
+}
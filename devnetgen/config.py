@@ -1,9 +1,121 @@
-from jinja2 import Environment, PackageLoader, select_autoescape
+from __future__ import annotations
+import compileall
+import hashlib
+import json
+import os
+import shutil
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
 
-
-env = Environment(
-    loader=PackageLoader('devnetgen'),
-    autoescape=select_autoescape(),
-    lstrip_blocks=True,
-    trim_blocks=True
+from devnetgen.timings import timings
+from jinja2 import (
+    BaseLoader,
+    BytecodeCache,
+    Environment,
+    FileSystemBytecodeCache,
+    ModuleLoader,
+    PackageLoader,
+    Template,
+    TemplateNotFound,
+    select_autoescape
 )
+
+templates_path = Path(__file__).parent / 'templates'
+compiled_templates_path = Path(__file__).parent / 'compiled_templates'
+manifest_name = 'manifest.json'
+
+
+def _hash_file(path: Path) -> Optional[str]:
+    try:
+        return hashlib.sha1(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+class PrecompiledLoader(ModuleLoader):
+    """
+    Загрузчик шаблонов, скомпилированных в python-модули при сборке пакета (build.py).
+    Шаблоны, отсутствующие среди скомпилированных или изменённые после компиляции, загружаются из исходников
+
+    Attributes:
+        source_loader: загрузчик исходников шаблонов
+        hashes: sha1 исходников шаблонов на момент компиляции по именам шаблонов
+    """
+    source_loader: BaseLoader
+    hashes: dict[str, str]
+
+    def __init__(self, path: Path, source_loader: BaseLoader, hashes: dict[str, str]):
+        super().__init__(path)
+        self.source_loader = source_loader
+        self.hashes = hashes
+
+    def get_source(self, environment: Environment, template: str):
+        return self.source_loader.get_source(environment, template)
+
+    def list_templates(self) -> list[str]:
+        return self.source_loader.list_templates()
+
+    def load(self, environment: Environment, name: str, globals: Optional[dict] = None) -> Template:
+        if name in self.hashes and self.hashes[name] == _hash_file(templates_path / name):
+            try:
+                return super().load(environment, name, globals)
+            except TemplateNotFound:
+                pass
+        return self.source_loader.load(environment, name, globals)
+
+
+@lru_cache(maxsize=None)
+def templates_hash() -> str:
+    """ :return: хэш исходников всех шаблонов пакета (шаблоны включают друг друга, поэтому хэшируются вместе) """
+    digest = hashlib.sha1()
+    for path in sorted(templates_path.rglob('*.j2')):
+        digest.update(f'{path.relative_to(templates_path).as_posix()}:{_hash_file(path)}'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def create_environment(loader: BaseLoader, bytecode_cache: Optional[BytecodeCache] = None) -> Environment:
+    return Environment(
+        loader=loader,
+        autoescape=select_autoescape(),
+        lstrip_blocks=True,
+        trim_blocks=True,
+        bytecode_cache=bytecode_cache
+    )
+
+
+def compile_templates(target: Path = compiled_templates_path):
+    """ Скомпилировать шаблоны пакета в python-модули для PrecompiledLoader (выполняется при сборке пакета) """
+    source_loader = PackageLoader('devnetgen')
+    shutil.rmtree(target, ignore_errors=True)
+    target.mkdir()
+    create_environment(source_loader).compile_templates(str(target), zip=None, ignore_errors=False)
+    hashes = {name: _hash_file(templates_path / name) for name in source_loader.list_templates()}
+    with open(target / manifest_name, 'w', encoding='utf-8') as file:
+        json.dump(hashes, file, indent=2, sort_keys=True)
+    compileall.compile_dir(str(target), quiet=1)
+
+
+def _create_loader() -> BaseLoader:
+    """ Загрузчик предкомпилированных шаблонов или, если пакет собран без них, загрузчик исходников """
+    source_loader = PackageLoader('devnetgen')
+    try:
+        with open(compiled_templates_path / manifest_name, 'r', encoding='utf-8') as file:
+            hashes = json.load(file)
+    except (OSError, ValueError):
+        return source_loader
+    return PrecompiledLoader(compiled_templates_path, source_loader, hashes)
+
+
+def _create_bytecode_cache() -> Optional[BytecodeCache]:
+    """ Кэш байткода шаблонов, загружаемых из исходников, в пользовательской директории кэша """
+    directory = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'devnetgen' / 'jinja'
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    return FileSystemBytecodeCache(str(directory))
+
+
+with timings.phase('templates'):
+    env = create_environment(_create_loader(), _create_bytecode_cache())
@@ -1,8 +1,8 @@
 from __future__ import annotations
+from functools import cached_property
 from typing import TYPE_CHECKING
 
-from devnetgen.constructors.base_crud_constructors import Constructor
-from devnetgen.config import env
+from devnetgen.constructors.constructor import Constructor, RenderTask
 
 if TYPE_CHECKING:
     from devnetgen.executors import TestsExecutor
@@ -26,39 +26,32 @@ class TestsConstructor(Constructor):
     def filename_middle_part(self):
         return self.entity.class_name
 
-    @property
+    @cached_property
     def namespace(self) -> Namespace:
         """Вернуть пространство имени для генерируемых файлов"""
-        tests_namespace = self.executor.application_namespace.name.replace('Application', 'Application.IntegrationTests.Tests')
-        namespace_string = f'{tests_namespace}.{self.namespace_prefix}'
+        namespace_string = f'{self.executor.context.tests_namespace}.{self.namespace_prefix}'
         return self.entity.get_namespace_obj(namespace_string, for_tests=True)
 
     def __init__(self, executor: TestsExecutor):
         super().__init__(executor)
 
-    def create_files(self) -> None:
-        self.namespace.path.mkdir(parents=True, exist_ok=True)
-
-        template = env.get_template(self.template)
-        content = template.render(entity=self.entity,
-                                  target_namespace=self.namespace.name,
-                                  sieve=self.executor.meta.sieve,
-                                  **self.executor.command_namespaces)
+    def plan_files(self) -> list[RenderTask]:
+        context = dict(entity=self.entity,
+                       target_namespace=self.namespace.name,
+                       sieve=self.executor.meta.sieve,
+                       **self.executor.command_namespaces)
         filename = f"{self.filename_prefix}{self.filename_middle_part}{self.command_suffix}.cs"
-        self._create_file_if_not_exists(self.namespace, filename, content)
         self.executor.add_to_git(self.namespace.path)
-        self.create_base()
+        return [RenderTask(self.namespace, filename, self.template, context), self._plan_base()]
 
-    def create_base(self) -> None:
+    def _plan_base(self) -> RenderTask:
         base_namespace_string = self.namespace.name.removesuffix(f".{self.namespace.last_name_part}")
         base_namespace = self.entity.get_namespace_obj(base_namespace_string, for_tests=True)
 
-        template = env.get_template(self.base_template)
-        content = template.render(entity=self.entity, target_namespace=base_namespace_string)
-
         filename = f"{self.entity.class_name}Base.cs"
-        self._create_file_if_not_exists(base_namespace, filename, content)
         self.executor.add_to_git(base_namespace.path)
+        return RenderTask(base_namespace, filename, self.base_template,
+                          dict(entity=self.entity, target_namespace=base_namespace_string))
 
 
 class CommandTestsConstructor(TestsConstructor):
@@ -1,18 +1,89 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING
+import hashlib
+import json
+from collections.abc import ValuesView
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from devnetgen.config import env, templates_hash
+from devnetgen.entities import Entity, Namespace, NavigationEntity
+from devnetgen.manifest import manifest_version
+from devnetgen.timings import timings
 
 if TYPE_CHECKING:
     from devnetgen.executors import SourceGeneratorExecutor
-    from devnetgen.entities import Namespace
+
+
+@dataclass
+class RenderTask:
+    """
+    Запланированный к генерации файл
+
+    Attributes:
+        namespace: пространство имён (директория) файла
+        filename: имя файла
+        template: имя jinja-шаблона
+        context: переменные шаблона
+    """
+    namespace: Namespace
+    filename: str
+    template: str
+    context: dict[str, Any]
+
+    @property
+    def path(self) -> Path:
+        return self.namespace.path / self.filename
+
+    def render(self) -> str:
+        with timings.phase('templates'):
+            template = env.get_template(self.template)
+        return template.render(**self.context)
+
+    def inputs_hash(self) -> str:
+        """ :return: хэш входных данных рендеринга: шаблонов, имени шаблона и переменных (моделей сущностей) """
+        data = [manifest_version, templates_hash(), self.template, fingerprint(self.context)]
+        return hashlib.sha1(json.dumps(data, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def fingerprint(value: Any) -> Any:
+    """ :return: JSON-представление переменной шаблона: модели сущностей заменяются хэшами их входных данных """
+    if isinstance(value, NavigationEntity):
+        return ['navigation', value.factory_property.name, value.entity.fingerprint]
+    if isinstance(value, Entity):
+        return ['entity', value.fingerprint]
+    if isinstance(value, Namespace):
+        return value.name
+    if isinstance(value, dict):
+        return {str(key): fingerprint(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, ValuesView)):
+        return [fingerprint(item) for item in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return repr(value)
+
+
+@timings.timed('rendering')
+def render_files(tasks: list[RenderTask]) -> list[str]:
+    """
+    Отрендерить шаблоны запланированных файлов. Файлы одной сущности рендерятся последовательно:
+    параллельно генерируются сущности пакета (BatchExecutor)
+    :return: содержимое файлов в порядке tasks
+    """
+    return [task.render() for task in tasks]
 
 
 class Constructor:
     __abstract__ = True
     __required_fields__ = ()
 
-    def create_files(self) -> None:
+    def plan_files(self) -> list[RenderTask]:
+        """ Запланировать генерируемые файлы (без рендеринга шаблонов) """
         raise NotImplementedError()
 
+    def create_files(self) -> None:
+        self.executor.generate_files([self])
+
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
 
@@ -28,11 +99,3 @@ class Constructor:
             raise TypeError(f"Class {self.__class__.__name__} is abstract and cannot be instantiated")
         self.entity = executor.entity
         self.executor = executor
-
-    def _create_file_if_not_exists(self, namespace: Namespace, filename: str, content: str) -> None:
-        filepath = namespace.path / filename
-        if filepath.exists():
-            return
-        with open(filepath, "w", encoding='utf-8') as file:
-            file.write(content)
-            self.executor.log_directory(namespace)
@@ -4,8 +4,7 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from devnetgen.executors import CrudExecutor
 
-from devnetgen.config import env
-from devnetgen.constructors.base_crud_constructors import Constructor
+from devnetgen.constructors.constructor import Constructor, RenderTask
 
 
 class ControllerConstructor(Constructor):
@@ -21,13 +20,12 @@ class ControllerConstructor(Constructor):
         super().__init__(executor)
         self.legacy_controller = legacy_controller
 
-    def create_files(self) -> None:
-        """Сгенерировать и записать на диск файл контроллера"""
+    def plan_files(self) -> list[RenderTask]:
+        """Запланировать файл контроллера"""
         template_vars = self.executor.get_template_vars()
         template_type = self.legacy_controller_template if self.legacy_controller else self.controller_template
-        template = env.get_template(template_type)
 
-        content = template.render(
+        context = dict(
             file=self.entity,
             target_namespace=self.executor.webui_namespace.name,
             webui=template_vars['webui'],
@@ -37,5 +35,5 @@ class ControllerConstructor(Constructor):
             **self.executor.command_namespaces)
 
         filename = f'{self.entity.class_name}Controller.cs'
-        self._create_file_if_not_exists(self.executor.webui_namespace, filename, content)
         self.executor.add_to_git(self.executor.webui_namespace.path)
+        return [RenderTask(self.executor.webui_namespace, filename, template_type, context)]
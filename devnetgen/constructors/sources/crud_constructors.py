@@ -1,3 +1,5 @@
+from functools import cached_property
+
 from devnetgen.entities import Namespace
 from devnetgen.constructors.base_crud_constructors import CommandConstructor, QueryConstructor
 
@@ -41,7 +43,7 @@ class GetEntitiesConstructor(QueryConstructor):
     command_template = 'GetEntitiesQuery.cs.j2'
     namespace_identifier = 'get_list_namespace'
 
-    @property
+    @cached_property
     def namespace(self) -> Namespace:
         """Вернуть пространство имени для генерируемых файлов"""
         namespace_string = f'{self.executor.application_namespace.name}.{self.namespace_prefix}.{self.name}{self.entity.pluralized_class_name}'
@@ -53,7 +55,7 @@ class GetEntityGridConstructor(QueryConstructor):
     command_template = 'GetEntityGridQuery.cs.j2'
     namespace_identifier = 'get_grid_namespace'
 
-    @property
+    @cached_property
     def namespace(self) -> Namespace:
         """Вернуть пространство имени для генерируемых файлов"""
         namespace_string = f'{self.executor.application_namespace.name}.{self.namespace_prefix}.{self.name}{self.entity.class_name}Grid'
@@ -1,19 +1,43 @@
 from __future__ import annotations
 import re
-from dataclasses import field
+from contextlib import contextmanager
+from dataclasses import field, replace
+from functools import cached_property
+from itertools import chain
 from pathlib import Path
 from dataclasses import dataclass
-from typing import Optional
+from typing import Iterator, Optional
 from collections.abc import Set
 from typing import Union
 
+from devnetgen.index import SolutionIndex, load_index
 from devnetgen.pluralize import pluralize
+from devnetgen.scanner import ClassDeclaration, SourceFile, scan
+from devnetgen.staging import StagingArea, read_text
+from devnetgen.timings import timings
 
 system_namespace = 'System'
 generic_collections_namespace = 'System.Collections.Generic'
 default_properties = {'int', 'bool', 'float', 'string', 'decimal', 'long', 'short', 'double'}
 system_properties = {'DateTime', 'DateOnly', 'DateTimeOffset'}
 default_properties.update(system_properties)
+# Флаги в начале summary свойства сущности: '!' - исключить свойство из vm/dto, '@' - включить навигационное свойство
+property_flag_chars = ('!', '@')
+# Глубина раскрытия навигационных свойств: vm/dto и валидаторы генерируются только для прямых навигационных свойств
+default_navigation_depth = 1
+
+
+def find_sources_path(path: Union[str, Path], project: str) -> Path:
+    """
+    :param path: путь до файла внутри проекта решения
+    :param project: имя директории проекта ("Domain", "Application")
+    :return: директория исходников решения - родитель директории проекта (сравниваются части пути целиком,
+     поэтому директории вида DomainTools не принимаются за проект)
+    """
+    parts = Path(path).parts
+    if project not in parts[:-1]:
+        raise ValueError(f'Путь {path} не лежит в директории {project} решения')
+    return Path(*parts[:parts.index(project)])
 
 
 @dataclass
@@ -23,81 +47,90 @@ class File:
     content: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Property:
     """
-    Свойство сущности
+    Свойство сущности. Производные поля вычисляются один раз при разборе свойства (Property.parse)
 
     Attributes:
         name: имя свойства
-        _prop_type: тип свойства
-        _summary: описание свойства
-        required_namespace: объект Namespace, в котором содержится тип свойства
+        raw_type: тип свойства, как он объявлен в классе (пр. "List<Appeal>?")
+        _summary: описание свойства, как оно объявлено в классе (с флагами '!' и '@')
         file_class: ссылка на класс сущности
+        non_listed_prop_type: тип свойства, извлеченный из List<*>
+        prop_type: тип свойства без List<*> и признака nullable
+        is_list_generic: свойство - список List<*>
+        is_nullable: свойство допускает null
+        is_enum: тип свойства является перечислением
+        is_navigation: свойство является навигационным
+        to_validate: свойство проверяется валидатором
+        summary_4: описание свойства для файлов с отступом в 4 пробела
+        summary_8: описание свойства для файлов с отступом в 8 пробелов
+        required_namespace: объект Namespace, в котором содержится тип свойства
     """
     name: str
-    _prop_type: str
+    raw_type: str
     _summary: Optional[str]
     file_class: Entity
+    non_listed_prop_type: str
+    prop_type: str
+    is_list_generic: bool
+    is_nullable: bool
+    is_enum: bool
+    is_navigation: bool
+    to_validate: bool
+    summary_4: Optional[str]
+    summary_8: Optional[str]
     required_namespace: Optional[Namespace] = None
 
-    @property
-    def summary(self) -> Optional[str]:
-        summary = self._summary
+    @classmethod
+    def parse(cls, name: str, raw_type: str, summary: Optional[str], file_class: Entity) -> Property:
+        """
+        Разобрать объявление свойства
+        :param name: имя свойства
+        :param raw_type: тип свойства, как он объявлен в классе
+        :param summary: описание свойства
+        :param file_class: сущность, в которой объявлено свойство (enum_types и tabs должны быть вычислены)
+        """
+        is_list_generic = raw_type.startswith("List<")
+        non_listed_prop_type = re.search(r"List<(.*)>", raw_type).group(1) if is_list_generic else raw_type
+        prop_type = non_listed_prop_type.removesuffix('?')
+        is_nullable = raw_type.endswith('?') or non_listed_prop_type.endswith('?')
+        is_enum = prop_type in file_class.enum_types
+        is_navigation = not is_enum and prop_type not in default_properties
+        to_validate = (is_enum or prop_type == 'string'
+                       or (not is_nullable and prop_type == 'long' and name.endswith('Id')))
+
+        summary_4 = summary_8 = summary
         if summary:
-            if not self.file_class.vm or self.file_class.vm.tabs == 4:
-                summary = summary.replace(' '*8, ' '*4)
-            if self.file_class.vm and self.file_class.vm.tabs == 8 and self.file_class.tabs == 4:
-                summary = summary.replace(' '*4, ' '*8)
-        if self.is_navigation:
-            summary = summary.removeprefix('@\n    ').removeprefix('    ')
-            match = re.search(r"^/// (?:Навигационное свойство - )?(?:[с|С]ущность)?\s*(.*)", summary, re.S)
-            if match:
-                summary = match.group(1).capitalize()
-                if summary.startswith('"'):
-                    summary = summary.strip('"').capitalize()
-        return summary
+            summary_4 = summary.replace(' '*8, ' '*4)
+            if file_class.tabs == 4:
+                summary_8 = summary.replace(' '*4, ' '*8)
+        if is_navigation:
+            summary_4 = cls._normalize_navigation_summary(summary_4)
+            summary_8 = cls._normalize_navigation_summary(summary_8)
 
-    @property
-    def is_navigation(self) -> bool:
-        """ Проверка, является ли навигационным свойством """
-        return not self.is_enum and self.prop_type not in default_properties
-
-    @property
-    def prop_type(self) -> str:
-        return self.non_listed_prop_type.removesuffix('?')
+        return cls(name, raw_type, summary, file_class, non_listed_prop_type, prop_type, is_list_generic,
+                   is_nullable, is_enum, is_navigation, to_validate, summary_4, summary_8)
 
-    @property
-    def is_enum(self) -> bool:
-        """ Проверка, является ли тип свойства перечислением """
-        return any(self.prop_type in namespace.classes for namespace in self.file_class.enums_namespaces)
-
-    @property
-    def raw_type(self) -> str:
-        return self._prop_type
-
-    @property
-    def is_nullable(self) -> bool:
-        return self._prop_type.endswith('?') or self.non_listed_prop_type.endswith('?')
-
-    @property
-    def to_validate(self) -> bool:
-        return any([
-            self.is_enum,
-            self.prop_type == 'string',
-            all([not self.is_nullable, self.prop_type == 'long', self.name.endswith('Id')])
-        ])
-
-    @property
-    def is_list_generic(self) -> bool:
-        return self._prop_type.startswith("List<")
+    @staticmethod
+    def _normalize_navigation_summary(summary: Optional[str]) -> Optional[str]:
+        """ Убрать флаг '@' и префикс "Навигационное свойство - сущность" из описания навигационного свойства """
+        if summary is None:
+            return None
+        summary = summary.removeprefix('@\n    ').removeprefix('    ')
+        match = re.search(r"^/// (?:Навигационное свойство - )?(?:[с|С]ущность)?\s*(.*)", summary, re.S)
+        if match:
+            summary = match.group(1).capitalize()
+            if summary.startswith('"'):
+                summary = summary.strip('"').capitalize()
+        return summary
 
     @property
-    def non_listed_prop_type(self) -> Optional[str]:
-        """ Тип свойства, извлеченный из List<*> """
-        if self.is_list_generic:
-            return re.search(r"List<(.*)>", self._prop_type).group(1)
-        return self._prop_type
+    def summary(self) -> Optional[str]:
+        """ Описание свойства с отступами vm/dto, для которой разобрана сущность """
+        vm = self.file_class.vm
+        return self.summary_8 if vm and vm.tabs == 8 else self.summary_4
 
 
 @dataclass
@@ -121,10 +154,20 @@ class Namespace:
 
 
 class NamespaceCollection(Set):
-    """ Коллекция для пространств имён (множество) """
+    """
+    Коллекция для пространств имён (множество) с индексом классов по пространствам имён
+
+    Attributes:
+        namespaces: пространства имён коллекции в порядке добавления (порядок using в генерируемых файлах
+         не зависит от хэшей строк, поэтому повторная генерация даёт тот же текст)
+        class_namespaces: пространство имён по имени класса (при совпадении имён - первое добавленное)
+    """
+    namespaces: dict[Namespace, None]
+    class_namespaces: dict[str, Namespace]
+
     def __init__(self):
-        self.namespaces = set()
-        self._last_found = None
+        self.namespaces = {}
+        self.class_namespaces = {}
 
     def __iter__(self):
         return self.namespaces.__iter__()
@@ -132,22 +175,21 @@ class NamespaceCollection(Set):
     def __contains__(self, item: Union[str, Namespace]):
         if isinstance(item, Namespace):
             return item in self.namespaces
-
-        for namespace in self.namespaces:
-            if item in namespace.classes:
-                self._last_found = namespace
-                return True
-        return False
+        return item in self.class_namespaces
 
     def __len__(self):
         return len(self.namespaces)
 
     def add(self, namespace: Namespace):
-        self.namespaces.add(namespace)
+        if namespace in self.namespaces:
+            return
+        self.namespaces[namespace] = None
+        for class_name in sorted(namespace.classes):
+            self.class_namespaces.setdefault(class_name, namespace)
 
-    @property
-    def last_found(self) -> Namespace:
-        return self._last_found
+    def resolve(self, type_name: str) -> Optional[Namespace]:
+        """ :return: пространство имён, содержащее класс с данным именем, или None """
+        return self.class_namespaces.get(type_name)
 
 
 class BaseEntity:
@@ -158,29 +200,36 @@ class BaseEntity:
         tabs: отступы перед 'public ...'
         file_text: содержимое файла сущности
         file_lines: содержимое файла сущности построчно
+        source: объявления файла (пространство имён, using, классы и свойства), извлечённые за один проход
         file_path: абсолютный путь до файла сущности (объект Path)
         class_name: имя класса (пр. "Appeal")
         namespace: объект типа Namespace сущности
         enums_namespaces: объекты типа Namespace под енамы
+        enum_types: объекты типа Namespace енамов по имени типа енама
         solution_name: наименование решения (пр. "MinstroyGasDistributionNetworks")
         sources_path: абсолютный путь решения, объект Path (пр. "/home/alex/Documents/RiderProjects/MinstroyGasDistributionNetworks")
         used_entities_namespaces: использованные в коде сущности пространства имён, относящиеся к сущностям в Domain
         properties: список извлеченных из класса свойств типа Property
+        index: индекс классов решения
     """
     tabs: int = 8
     file_text: str
     file_lines: list[str]
+    source: SourceFile
     file_path: Path
     class_name: str
     namespace: Namespace
     enums_namespaces: set[Namespace]
+    enum_types: dict[str, Namespace]
     solution_name: str
     sources_path: Path
     used_entities_namespaces: NamespaceCollection
     properties: list[Property]
+    index: Optional[SolutionIndex]
 
-    def __init__(self, path: str | Path):
+    def __init__(self, path: str | Path, index: SolutionIndex = None):
         self.used_entities_namespaces = NamespaceCollection()
+        self.index = index
 
         self.file_path = Path(path)
         self.class_name = self.file_path.name.removesuffix('.cs')
@@ -189,37 +238,35 @@ class BaseEntity:
         self._extract_tabs()
 
     def _read_file(self):
-        with open(self.file_path, "r", encoding='utf-8') as file:
-            self.file_lines = file.readlines()
-            self.file_text = ''.join(self.file_lines)
+        self.file_text = read_text(self.file_path)
+        self.source = scan(self.file_text)
+        self.file_lines = self.source.lines
 
-    def _get_body_lines(self) -> list[str]:
-        """
-        :return: строки файла, начиная с тела класса сущности
-        """
-        start_line = 0
-        for i, line in enumerate(self.file_lines):
-            if line.find(f'public class {self.class_name}') != -1:
-                start_line = i + 1
-                break
-        return self.file_lines[start_line:]
+    @property
+    def class_declaration(self) -> Optional[ClassDeclaration]:
+        """ Объявление класса сущности (или первого класса файла) """
+        return self.source.find_class(self.class_name)
 
     def _index_self_namespace(self):
         """
         Определить наименование решения и вычислить Namespace сущности и файлов Enum
         """
-        regex = r"^namespace ([^;{]*)(?:;|\n)"
-        namespace = re.search(regex, self.file_text, re.MULTILINE).group(1)
+        namespace = self.source.namespace
+        if namespace is None:
+            raise ValueError(f'Не найдено пространство имён в файле {self.file_path}')
         namespace_parts = namespace.split('.')
         self.solution_name = self._find_sln_file(self.file_path) or namespace_parts[0]
+        self.index = self.index or load_index(self.sources_path, self.solution_name)
         self.namespace = self.get_namespace_obj(namespace)
-        self.enums_namespaces = self._index_enums_namespaces(f'{self.solution_name}.Domain.Enums')
+        self.enums_namespaces, self.enum_types = self._index_enums_namespaces(f'{self.solution_name}.Domain.Enums')
 
     @staticmethod
+    @timings.timed('discovery')
     def _find_sln_file(start_path: Path):
         current_path = start_path.resolve()
 
         while True:
+            timings.count('listdir')
             for file in current_path.glob('*.sln'):
                 return file.stem
             if current_path.parent == current_path:
@@ -228,26 +275,38 @@ class BaseEntity:
 
         return None
 
-    def _index_enums_namespaces(self, base_namespace: str) -> set[Namespace]:
+    @timings.timed('indexing')
+    def _index_enums_namespaces(self, base_namespace: str) -> tuple[set[Namespace], dict[str, Namespace]]:
         """
-        Сформировать набор объектов Namespace для Enum'ов
+        Сформировать набор объектов Namespace для Enum'ов. Вычисляется один раз для решения
+        и используется всеми его сущностями до изменения индекса
         :param base_namespace: пространство имен до корня директории с Enums
-        :return: множество объектов Namespace для Enum'ов
+        :return: множество объектов Namespace для Enum'ов и объекты Namespace по имени типа енама
         """
+        key = ('enums', base_namespace)
+        if (computed := self.index.computed.get(key)) is not None:
+            return computed
+
         namespaces: set[Namespace] = set()
+        enum_types: dict[str, Namespace] = {}
         base_enum_directory = Path(self.sources_path) / base_namespace.removeprefix(f'{self.solution_name}.').replace('.', '/')
-        enum_directories = [d for d in base_enum_directory.rglob('*') if d.is_dir()]
-        enum_directories.append(base_enum_directory)
+        enum_directories = list(self.index.walk(base_enum_directory))
+        if base_enum_directory not in enum_directories:
+            enum_directories.append(base_enum_directory)
         for directory in enum_directories:
             target_index = directory.parts.index('Enums')
             sub_namespace = '.'.join(directory.parts[target_index + 1:])
-            namespace = base_namespace + '.' + sub_namespace
-            namespaces.add(self.get_namespace_obj(namespace))
-        return namespaces
+            namespace = self.get_namespace_obj(base_namespace + '.' + sub_namespace)
+            namespaces.add(namespace)
+            for class_name in sorted(namespace.classes):
+                enum_types.setdefault(class_name, namespace)
+
+        computed = self.index.computed[key] = (namespaces, enum_types)
+        return computed
 
     def get_namespace_obj(self, namespace: str, for_tests: bool = False) -> Namespace:
         """
-        Сформировать объект Namespace, вычисляя абсолютный путь до директории и все лежащие в ней классы
+        Сформировать объект Namespace, вычисляя абсолютный путь до директории и все лежащие в ней классы по индексу решения
         :param namespace: строка namespace
         :param for_tests: вычисление для генерации тестов
         :return: Объект Namespace
@@ -257,10 +316,7 @@ class BaseEntity:
         if for_tests:
             end_dir = end_dir.replace("Application/IntegrationTests", "Application.IntegrationTests")
         directory = Path(root_dir) / end_dir
-        directory.mkdir(parents=True, exist_ok=True)
-        classes = (file.name.removesuffix('.cs') for file in directory.iterdir() if
-                   file.is_file() and file.name.endswith('.cs'))
-        return Namespace(name=namespace, classes=set(classes), path=directory)
+        return Namespace(name=namespace, classes=self.index.get_classes(directory), path=directory)
 
     @property
     def tests_path(self) -> Path:
@@ -273,19 +329,29 @@ class BaseEntity:
         """
         Вычислить объекты Namespace для использованных в коде сущности Namespace
         """
-        regex = re.compile(r"using (" + re.escape(self.solution_name) + r"\.Domain\..*);")
-        matches = regex.finditer(self.file_text)
-        for match in matches:
-            namespace = match.group(1)
+        prefix = f'{self.solution_name}.Domain.'
+        for namespace in self.source.usings:
+            if not namespace.startswith(prefix):
+                continue
             namespace_obj = self.get_namespace_obj(namespace)
             self.used_entities_namespaces.add(namespace_obj)
 
     def _extract_tabs(self):
         """ Определить отступы """
-        regex = r'^namespace ([^;{]*);'
-        file_scoped_namespace = re.search(regex, self.file_text, re.MULTILINE)
-        if file_scoped_namespace:
-            self.tabs = 4
+        self.tabs = self.source.tabs
+
+
+@dataclass(frozen=True)
+class VmDtoSummaries:
+    """
+    Summaries vm/dto, вычисленные по базовой сущности (для замены устаревших комментариев в dev-netgen watch)
+
+    Attributes:
+        properties: текст summary по имени свойства (пр. "/// Номер заказа")
+        class_description: описание класса или None
+    """
+    properties: dict[str, str] = field(default_factory=dict)
+    class_description: Optional[str] = None
 
 
 class VmDto(BaseEntity):
@@ -295,16 +361,27 @@ class VmDto(BaseEntity):
     Attributes:
         base_entity: сущность в которую/от которой маппится vm/dto
         substituted_file_text: замененный текст файла на содержащий summaries
+        staging: промежуточная файловая система, в которую записывается изменённый файл
     """
-    base_entity: Entity
+    base_entity: Optional[Entity]
     substituted_file_text: str
+    staging: StagingArea
 
-    def __init__(self, path: Union[str, Path]):
-        super().__init__(path)
+    @timings.timed('parsing')
+    def __init__(self, path: Union[str, Path], index: SolutionIndex = None, staging: StagingArea = None,
+                 registry: EntityRegistry = None):
+        """
+        :param path: абсолютный путь до файла vm/dto
+        :param index: индекс классов решения
+        :param staging: промежуточная файловая система, в которую записывается изменённый файл
+        :param registry: реестр разобранных сущностей, общий для нескольких vm/dto
+        """
+        super().__init__(path, index)
+        self.staging = staging or StagingArea()
+        self.registry = registry if registry is not None else EntityRegistry()
         self.substituted_file_text = self.file_text
 
-        str_path = str(path)
-        self.sources_path = Path(str_path[:str_path.index('Application')])
+        self.sources_path = find_sources_path(path, 'Application')
 
         self._index_self_namespace()
         self._index_used_namespaces()
@@ -312,72 +389,151 @@ class VmDto(BaseEntity):
 
     def _get_base_entity(self):
         """ Определить сущность в которую/от которой маппится vm/dto """
-        regex = r"IMap(?:From|To)<(.*)>"
+        self.base_entity = None
+        regex = r"IMap(?:From|To)<([^>]*)>"
         if match := re.search(regex, self.file_text, re.MULTILINE):
             entity_name = match.group(1)
         else:
             regex = r"profile\.CreateMap<(.*),(?:.*)>"
             entity_name = re.search(regex, self.file_text, re.MULTILINE).group(1).removesuffix('Dto').removesuffix('Vm')
 
-        if entity_name in self.used_entities_namespaces:
-            namespace = self.used_entities_namespaces.last_found
-            self.base_entity = Entity(namespace.path / f'{entity_name}.cs', filter_properties=False, vm=self)
+        if namespace := self.used_entities_namespaces.resolve(entity_name):
+            self.base_entity = self.registry.get(namespace.path / f'{entity_name}.cs', self.index,
+                                                 filter_properties=False)
+            self.base_entity.vm = self
 
-    def add_properties_summaries(self):
-        """ Внести комментарии к свойствам vm/dto из базовой сущности """
+    @timings.timed('rendering')
+    def add_summaries(self, previous: Optional[VmDtoSummaries] = None):
+        """
+        Внести комментарии к свойствам и классу vm/dto из базовой сущности. Вставки вычисляются за один проход
+        по объявлениям класса и применяются одной склейкой строк, файл записывается один раз
+        :param previous: summaries базовой сущности до её изменения (dev-netgen watch): комментарии vm/dto,
+         совпадающие с ними, заменяются текущими
+        """
         if not self.base_entity:
             return
 
-        class_body_lines = self._get_body_lines()
-        class_body_text = ''.join(class_body_lines)
-        regex = re.compile(r"(?:<summary>\s*(?P<summary>(?:.|\n)*?)\s*/// </summary>\s*)?(?P<attributes>(?:\[.+]\s*)+)?\s*public (?P<type>[^\s]+)\s(?P<name>[^\s]+)(?=\s\{ ?get;)")
-
-        matches = regex.finditer(class_body_text)
+        insertions: dict[int, str] = {}
+        dropped_lines: set[int] = set()
+        self._add_properties_summaries(insertions, dropped_lines, previous)
+        self._add_class_summary(insertions, dropped_lines, previous)
+        self._drop_blank_lines_after_braces(dropped_lines)
 
-        for match in matches:
-            if match.group('summary'):
-                continue
-            t = self.tabs
-            name = match.group('name')
-            prop: Optional[Property] = next(filter(lambda p: p.name == match.group('name'), self.base_entity.properties), None)
-            if prop and prop.summary or name == 'Id':
-                summary = prop.summary if prop else '/// Идентификатор'
-                added_summary = ' '*t + '/// <summary>\n' + ' '*t + summary + '\n' + ' '*t + '/// </summary>\n'
-                quantifier = f'{{{self.tabs}}}'
-                regex = rf"(?P<nl>}}\n)?(?P<emptylines>(?: {{,{self.tabs}}}\n)*)?(?: {quantifier})?(?P<attributes>(?:\[.+]\s*)+)?(?P<beginning> {quantifier}public [^\s]+\s)" + re.escape(name) + r'(?P<ending>.*)'
-                substituted = r'\g<nl>' + '\n' + added_summary + r'\g<beginning>' + name + r'\g<ending>'
-                if attrs := match.group('attributes'):
-                    attrs = attrs.strip()
-                    substituted = r'\g<nl>' + '\n' + added_summary + ' '*t + attrs + '\n' + r'\g<beginning>' + name + r'\g<ending>'
-                self.substituted_file_text = re.sub(regex, substituted, self.substituted_file_text)
-
-        self.substituted_file_text = re.sub(r'{\n\n', r'{\n', self.substituted_file_text)
+        lines = []
+        for i, line in enumerate(self.file_lines):
+            if i in insertions:
+                lines.append(insertions[i])
+            if i not in dropped_lines:
+                lines.append(line)
+        self.substituted_file_text = ''.join(lines)
         self._write_substituted_file()
 
-    def add_class_summary(self):
-        """ Добавить описание классу vm/dto """
-        if not self.base_entity:
+    def summaries(self) -> VmDtoSummaries:
+        """ :return: summaries свойств и класса vm/dto, вычисленные по базовой сущности """
+        declaration = self.class_declaration
+        if not self.base_entity or declaration is None:
+            return VmDtoSummaries()
+        properties = {declared.name: summary for declared in declaration.properties
+                      if (summary := self._property_summary(declared.name)) is not None}
+        return VmDtoSummaries(properties, self._class_description())
+
+    def _property_summary(self, name: str) -> Optional[str]:
+        """ :return: текст summary свойства vm/dto по свойству базовой сущности (пр. "/// Номер заказа") или None """
+        prop = self.base_entity.properties_by_name.get(name)
+        if prop and prop.summary:
+            return f'/// {prop.summary}' if prop.is_navigation else prop.summary
+        if name == 'Id':
+            return '/// Идентификатор'
+        return None
+
+    def _class_description(self) -> Optional[str]:
+        """ :return: описание класса vm/dto по summary базовой сущности или None """
+        summary = self.base_entity.class_summary
+        if not summary:
+            return None
+        if self.class_name.endswith('Vm'):
+            return f'Модель отображения сущности "{summary}"'
+        if self.class_name.endswith('Dto'):
+            return f'Объект передачи данных для сущности "{summary}"'
+        return None
+
+    def _replace_outdated_summary(self, first_line: int, outdated: str, summary: str, indent: str,
+                                  insertions: dict[int, str], dropped_lines: set[int]) -> bool:
+        """
+        Заменить комментарий перед строкой first_line, если он в точности совпадает со вставленным
+        по прежнему summary базовой сущности (комментарии, изменённые вручную, не заменяются)
+        :return: комментарий заменён
+        """
+        outdated_block = self._summary_block(outdated, indent)
+        count = outdated_block.count('\n')
+        if first_line < count or ''.join(self.file_lines[first_line - count:first_line]) != outdated_block:
+            return False
+        dropped_lines.update(range(first_line - count, first_line))
+        insertions[first_line] = self._summary_block(summary, indent)
+        return True
+
+    @staticmethod
+    def _summary_block(summary: str, indent: str) -> str:
+        return f'{indent}/// <summary>\n{indent}{summary}\n{indent}/// </summary>\n'
+
+    def _add_properties_summaries(self, insertions: dict[int, str], dropped_lines: set[int],
+                                  previous: Optional[VmDtoSummaries] = None):
+        """
+        Вычислить комментарии к свойствам vm/dto без summary. Комментарий вставляется перед атрибутами свойства,
+        пустые строки перед ним заменяются одной пустой строкой после '}' (или удаляются)
+        :param insertions: вставляемый текст по номеру строки, перед которой он вставляется
+        :param dropped_lines: номера удаляемых строк
+        :param previous: summaries до изменения базовой сущности
+        """
+        declaration = self.class_declaration
+        if declaration is None:
             return
 
-        regex = rf'(?<!/// </summary>\n){" "*(self.tabs-4)}public class '
-        if re.search(regex, self.file_text, re.MULTILINE):
-            if summary := self.base_entity.class_summary:
-                if self.class_name.endswith('Vm'):
-                    summary = (f'{" "*(self.tabs-4)}/// <summary>\n'
-                               f'{" "*(self.tabs-4)}/// Модель отображения сущности "{summary}"\n'
-                               f'{" "*(self.tabs-4)}/// </summary>\n')
-                elif self.class_name.endswith('Dto'):
-                    summary = (f'{" "*(self.tabs-4)}/// <summary>\n'
-                               f'{" "*(self.tabs-4)}/// Объект передачи данных для сущности "{summary}"\n'
-                               f'{" "*(self.tabs-4)}/// </summary>\n')
-                substituted = summary + f'{" "*(self.tabs-4)}public class '
-                self.substituted_file_text = re.sub(regex, substituted, self.substituted_file_text)
+        indent = ' '*self.tabs
+        for declared in declaration.properties:
+            summary = self._property_summary(declared.name)
+            if summary is None:
+                continue
+            first_line = declared.attributes_line if declared.attributes_line is not None else declared.line
+            if declared.summary is not None:
+                outdated = previous.properties.get(declared.name) if previous else None
+                if outdated is not None and outdated != summary and declared.summary == outdated:
+                    self._replace_outdated_summary(first_line, outdated, summary, indent, insertions, dropped_lines)
+                continue
+
+            previous_line = first_line - 1
+            while previous_line >= 0 and not self.file_lines[previous_line].strip():
+                dropped_lines.add(previous_line)
+                previous_line -= 1
+            separator = '\n' if previous_line >= 0 and self.file_lines[previous_line].endswith('}\n') else ''
+            insertions[first_line] = separator + self._summary_block(summary, indent)
+
+    def _add_class_summary(self, insertions: dict[int, str], dropped_lines: set[int],
+                           previous: Optional[VmDtoSummaries] = None):
+        """ Вычислить описание класса vm/dto, если оно отсутствует (или заменить устаревшее, см. previous) """
+        declaration = self.class_declaration
+        if declaration is None or (description := self._class_description()) is None:
+            return
 
-        self._write_substituted_file()
+        indent = ' '*(self.tabs-4)
+        first_line = declaration.attributes_line if declaration.attributes_line is not None else declaration.line
+        if declaration.summary is None:
+            insertions[first_line] = self._summary_block(f'/// {description}', indent)
+        elif previous and previous.class_description not in (None, description) \
+                and declaration.summary == f'/// {previous.class_description}':
+            self._replace_outdated_summary(first_line, f'/// {previous.class_description}', f'/// {description}',
+                                           indent, insertions, dropped_lines)
+
+    def _drop_blank_lines_after_braces(self, dropped_lines: set[int]):
+        """ Удалить по одной пустой строке после строк, оканчивающихся на '{' """
+        for i, line in enumerate(self.file_lines[:-1]):
+            if line.endswith('{\n') and self.file_lines[i + 1] == '\n':
+                dropped_lines.add(i + 1)
 
     def _write_substituted_file(self):
-        with open(self.file_path, mode='w', encoding='utf-8') as file:
-            file.write(self.substituted_file_text)
+        if self.substituted_file_text == self.file_text:
+            return
+        self.staging.write(self.file_path, self.substituted_file_text)
 
 
 class Entity(BaseEntity):
@@ -386,43 +542,54 @@ class Entity(BaseEntity):
 
     Attributes:
         class_summary: summary сущности
+        vm: vm/dto, для которой разобрана сущность (влияет на отступы в summaries)
+        registry: реестр разобранных сущностей запуска (общий для сущности и её навигационных свойств)
+        depth: глубина сущности в графе навигационных свойств (0 - исходная сущность)
         upper_namespaces: коллекция NamespaceCollection для выявления расположения файлов-навигационных свойств
          сущности, не расположенных непосредственно в директории сущности
         required_solution_namespaces: необходимые для декларирования в файлах vm/dto пространства имён
         required_system_namespaces: необходимые для декларирования в файлах vm/dto пространства имён (системные)
-        included_files: набор классов FileClass для vm/dto, которые должны быть созданы помимо vm/dto основной сущности
+        included_files: навигационные сущности, для которых должны быть созданы vm/dto помимо vm/dto основной сущности
+         (в порядке объявления навигационных свойств)
         pluralized_class_name: имя сущности в мн. числе (пр. "Appeals")
+        property_flags: действующие флаги свойств ('!', '@') по именам свойств: из summaries и сохранённые
+         в манифесте генерации
     """
     class_summary: str
-    factory_property: Property | None
     vm: VmDto | None
+    registry: EntityRegistry
+    depth: int
     upper_namespaces: NamespaceCollection
     used_entities_namespaces: NamespaceCollection
     required_solution_namespaces: NamespaceCollection
     required_system_namespaces: NamespaceCollection
-    included_files: set[Entity]
+    included_files: list[NavigationEntity]
     pluralized_class_name: str
+    property_flags: dict[str, str]
 
-    def __init__(self, path: Union[str, Path], factory_property: Property = None,
-                 filter_properties: bool = True, vm: VmDto = None):
+    @timings.timed('parsing')
+    def __init__(self, path: Union[str, Path], filter_properties: bool = True, vm: VmDto = None,
+                 index: SolutionIndex = None, registry: EntityRegistry = None, depth: int = 0):
         """
         :param path: абсолютный путь до файла сущности
-        :param factory_property: навигационное свойство сущности, на основе которого был инициализирован класс
         :param filter_properties: Отфильтровать свойства сущности в соответствии с флагами '!' и '@"
         :param vm: Обратная ссылка на vm/dto
+        :param index: индекс классов решения (общий для сущности и её навигационных свойств)
+        :param registry: реестр разобранных сущностей запуска (по умолчанию - новый реестр)
+        :param depth: глубина сущности в графе навигационных свойств
         """
-        super().__init__(path)
+        super().__init__(path, index)
         self.vm = vm
-        self.factory_property = factory_property
+        self.registry = registry if registry is not None else EntityRegistry()
+        self.depth = depth
         self.upper_namespaces = NamespaceCollection()
         self.used_entities_namespaces = NamespaceCollection()
         self.required_solution_namespaces = NamespaceCollection()
         self.required_system_namespaces = NamespaceCollection()
-        self.included_files: set[Entity] = set()
+        self.included_files: list[NavigationEntity] = []
 
         self.pluralized_class_name = pluralize(self.class_name)
-        str_path = str(path)
-        self.sources_path = Path(str_path[:str_path.index('Domain')])
+        self.sources_path = find_sources_path(path, 'Domain')
 
         self._get_class_summary()
         self._index_self_namespace()
@@ -430,7 +597,16 @@ class Entity(BaseEntity):
         self._index_used_namespaces()
         self._extract_properties(filter_properties)
         self._fill_required_namespaces()
-        self._calculate_included_files()
+        with self.registry.expanding(self, filter_properties):
+            self._calculate_included_files()
+
+    @cached_property
+    def properties_by_name(self) -> dict[str, Property]:
+        """ Свойства сущности по имени (при совпадении имён - первое объявленное) """
+        properties = {}
+        for prop in self.properties:
+            properties.setdefault(prop.name, prop)
+        return properties
 
     @property
     def validation_properties(self):
@@ -439,6 +615,26 @@ class Entity(BaseEntity):
     def __repr__(self):
         return f'{self.class_name}, {id(self)}'
 
+    def own_dependencies(self) -> set[Path]:
+        """
+        :return: файлы и директории, по которым вычислялась модель сущности
+        """
+        namespaces = chain((self.namespace,), self.upper_namespaces, self.used_entities_namespaces,
+                           self.enums_namespaces)
+        paths = {self.file_path}
+        paths.update(namespace.path for namespace in namespaces if namespace.path)
+        return paths
+
+    def dependencies(self) -> set[Path]:
+        """
+        :return: файлы и директории, по которым вычислялись модели сущности и всех разобранных вместе с ней
+         сущностей (для инвалидации кэша)
+        """
+        paths = set()
+        for entity in self.registry:
+            paths.update(entity.own_dependencies())
+        return paths
+
     def _index_upper_namespaces(self):
         namespace_parts = self.namespace.name.split('.')
         prev_part = self.solution_name
@@ -451,43 +647,41 @@ class Entity(BaseEntity):
         """
         Извлечь summary сущности
         """
-        regex = r"/// <summary>\s*/// (?P<summary>(?:.|\n)*?)\s*/// </summary>\s*(?P<tags>(?:///.+>\s*)+)?(?P<attributes>(?:\[.+]\s*)+)?\s*public class"
-        if match := re.search(regex, self.file_text, re.MULTILINE):
-            self.class_summary = match.group('summary')
+        declaration = self.class_declaration
+        self.class_summary = declaration.summary.removeprefix('/// ') if declaration and declaration.summary else ''
 
     def _extract_properties(self, filter_properties: bool = False):
         """
         Извлечь свойства сущности и относящуюся к ним информацию
         """
-        class_body_lines = self._get_body_lines()
-        class_body_text = ''.join(class_body_lines)
-        regex = re.compile(
-            r"(?:<summary>\s*(?P<summary>(?:.|\n)*?)\s*/// </summary>\s*)?(?P<attributes>(?:\[.+]\s*)+)?\s*public (?P<type>[^\s]+)\s(?P<name>[^\s]+)(?=\s\{ ?get;)", re.S)
-        matches = regex.finditer(class_body_text)
-
+        declaration = self.class_declaration
         self.properties = [
-            Property(name=match.group('name'), _prop_type=match.group('type'), _summary=match.group('summary'),
-                     file_class=self)
-            for match in matches
+            Property.parse(prop.name, prop.type, prop.summary, self)
+            for prop in (declaration.properties if declaration else ())
         ]
 
+        self.property_flags = dict(self.registry.property_flags.get(self.file_path.resolve(), {}))
+        self.property_flags.update((prop.name, prop._summary[0]) for prop in self.properties
+                                   if prop._summary and prop._summary[0] in property_flag_chars)
         if filter_properties:
-            self.properties = list(filter(self.filter_property, self.properties))
+            self.properties = [prop for prop in self.properties
+                               if self.filter_property(prop, self.property_flags.get(prop.name))]
 
     @staticmethod
-    def filter_property(prop: Property) -> bool:
+    def filter_property(prop: Property, flag: Optional[str] = None) -> bool:
+        """ :param flag: флаг свойства ('!' или '@'), по умолчанию - из summary свойства """
         summary = prop._summary
-        if summary:
-            if summary.startswith("!"):
-                return False
-            if summary.startswith("@"):
-                return True
+        flag = flag or (summary[0] if summary else None)
+        if flag == '!':
+            return False
+        if flag == '@':
+            return True
 
         return not prop.is_navigation
 
     def _fill_required_namespaces(self):
         """ Определить необходимые пространства имен для файлов vm/dto """
-        for prop in self.properties:
+        for i, prop in enumerate(self.properties):
             prop_type = prop.prop_type
 
             if prop.is_list_generic:
@@ -497,34 +691,156 @@ class Entity(BaseEntity):
                 self.required_system_namespaces.add(Namespace(system_namespace))
 
             if prop.is_navigation:
-                namespace = None
-
-                if prop_type in self.used_entities_namespaces:
-                    namespace = self.used_entities_namespaces.last_found
-                elif prop_type in self.upper_namespaces:
-                    namespace = self.upper_namespaces.last_found
-                elif prop_type in self.namespace.classes:
+                namespace = (self.used_entities_namespaces.resolve(prop_type)
+                             or self.upper_namespaces.resolve(prop_type))
+                if namespace is None and prop_type in self.namespace.classes:
                     namespace = self.namespace
 
                 if namespace:
-                    prop.required_namespace = namespace
+                    prop = self.properties[i] = replace(prop, required_namespace=namespace)
 
             if prop.is_enum:
-                required_enum_namespace = next(namespace for namespace in self.enums_namespaces if prop_type in namespace.classes)
-                self.required_solution_namespaces.add(required_enum_namespace)
+                self.required_solution_namespaces.add(self.enum_types[prop_type])
 
         self.required_solution_namespaces.add(self.namespace)
 
     def _calculate_included_files(self):
-        """ Сформировать объекты FileClass для каждого из навигационного свойства сущности """
+        """
+        Сформировать навигационные сущности для каждого из навигационных свойств сущности.
+        Модели файлов берутся из реестра запуска: каждый файл разбирается один раз, циклы не раскрываются повторно
+        """
+        self.included_files.clear()
+        if self.depth >= self.registry.max_depth:
+            return
         for prop in self.properties:
             if prop.is_navigation and prop.required_namespace:
                 if namespace_path := prop.required_namespace.path:
-                    file = Entity(namespace_path / f'{prop.prop_type}.cs', factory_property=prop)
-                    self.included_files.add(file)
+                    entity = self.registry.get(namespace_path / f'{prop.prop_type}.cs', self.index,
+                                               depth=self.depth + 1, parent=self)
+                    self.included_files.append(NavigationEntity(entity, prop))
 
-    def clear_summaries_flags(self):
+    @property
+    def cleaned_file_text(self) -> str:
+        """ Текст файла сущности без флагов '!' и '@' в summaries свойств """
+        return self.file_text.replace('<summary>!', '<summary>').replace('<summary>@', '<summary>')
+
+    @cached_property
+    def own_fingerprint(self) -> str:
+        """
+        Хэш входных данных модели сущности без навигационных сущностей: текст файла без флагов, действующие флаги
+        свойств и классы директорий пространств имён, по которым разрешались типы свойств
+        """
+        import hashlib
+
+        digest = hashlib.sha1(self.cleaned_file_text.encode('utf-8'))
+        digest.update(repr(sorted(self.property_flags.items())).encode('utf-8'))
+        for path in sorted(self.own_dependencies() - {self.file_path}):
+            relative_path = path.relative_to(self.sources_path) if path.is_relative_to(self.sources_path) else path
+            digest.update(f'{relative_path.as_posix()}:{sorted(self.index.get_classes(path))}'.encode('utf-8'))
+        return digest.hexdigest()
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """ Хэш входных данных модели сущности и её навигационных сущностей (для манифеста генерации) """
+        import hashlib
+
+        digest = hashlib.sha1(self.own_fingerprint.encode('utf-8'))
+        for file in self.included_files:
+            digest.update(f'{file.factory_property.name}:{file.entity.own_fingerprint}'.encode('utf-8'))
+        return digest.hexdigest()
+
+    def clear_summaries_flags(self, staging: StagingArea):
         """ Очистить '!' и '@' из summaries свойств сущности """
-        cleaned_text = self.file_text.replace('<summary>!', '<summary>').replace('<summary>@', '<summary>')
-        with open(self.file_path, 'w', encoding='utf-8') as file:
-            file.write(cleaned_text)
+        cleaned_text = self.cleaned_file_text
+        if cleaned_text != self.file_text:
+            staging.write(self.file_path, cleaned_text)
+
+
+class NavigationEntity:
+    """
+    Навигационная сущность: общая для запуска модель файла сущности и навигационное свойство,
+    через которое она включена. Остальные атрибуты берутся из модели сущности
+
+    Attributes:
+        entity: модель сущности из реестра
+        factory_property: навигационное свойство сущности, на основе которого был включён класс
+    """
+    entity: Entity
+    factory_property: Property
+
+    def __init__(self, entity: Entity, factory_property: Property):
+        self.entity = entity
+        self.factory_property = factory_property
+
+    def __getattr__(self, name: str):
+        return getattr(self.entity, name)
+
+    def __repr__(self):
+        return f'{self.class_name}.{self.factory_property.name}, {id(self)}'
+
+
+class EntityRegistry:
+    """
+    Реестр разобранных сущностей одного запуска: каждый файл сущности разбирается один раз
+    (отдельно для режимов с фильтрацией свойств и без), модели разделяются всеми ссылающимися на них сущностями
+
+    Attributes:
+        entities: модели сущностей по разрешённому пути файла и флагу фильтрации свойств
+        max_depth: максимальная глубина раскрытия навигационных свойств
+        cycles: обнаруженные циклические ссылки навигационных свойств (пути файлов ссылающейся и целевой сущностей)
+        property_flags: флаги свойств ('!', '@') по разрешённым путям файлов сущностей, сохранённые в манифесте
+         генерации (действуют, если в summary свойства нет флага)
+    """
+    entities: dict[tuple[Path, bool], Entity]
+    max_depth: int
+    cycles: list[tuple[Path, Path]]
+    property_flags: dict[Path, dict[str, str]]
+
+    def __init__(self, max_depth: int = default_navigation_depth, property_flags: dict[Path, dict[str, str]] = None):
+        self.entities = {}
+        self.max_depth = max_depth
+        self.cycles = []
+        self.property_flags = property_flags or {}
+        self._in_progress: set[tuple[Path, bool]] = set()
+
+    def __iter__(self):
+        return iter(self.entities.values())
+
+    def __len__(self):
+        return len(self.entities)
+
+    @contextmanager
+    def expanding(self, entity: Entity, filter_properties: bool) -> Iterator[None]:
+        """
+        Зарегистрировать сущность до раскрытия её навигационных свойств. Пока свойства раскрываются,
+        ссылка на сущность считается циклической (в т.ч. для корневой сущности, разобранной не через get)
+        """
+        key = (entity.file_path.resolve(), filter_properties)
+        self.entities.setdefault(key, entity)
+        self._in_progress.add(key)
+        try:
+            yield
+        finally:
+            self._in_progress.discard(key)
+
+    def get(self, path: Path, index: SolutionIndex, filter_properties: bool = True, depth: int = 0,
+            parent: Entity = None) -> Entity:
+        """
+        Получить модель сущности: из реестра или разобрав файл
+        :param path: путь до файла сущности
+        :param index: индекс классов решения
+        :param filter_properties: Отфильтровать свойства сущности в соответствии с флагами '!' и '@"
+        :param depth: глубина сущности в графе навигационных свойств
+        :param parent: сущность, ссылающаяся на запрашиваемую (для обнаружения циклов)
+        """
+        key = (Path(path).resolve(), filter_properties)
+        entity = self.entities.get(key)
+        if entity is None:
+            return Entity(path, filter_properties=filter_properties, index=index, registry=self, depth=depth)
+
+        if key in self._in_progress and parent is not None:
+            self.cycles.append((parent.file_path, entity.file_path))
+        elif depth < entity.depth:
+            entity.depth = depth
+            entity._calculate_included_files()
+        return entity
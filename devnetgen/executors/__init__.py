@@ -1,7 +1,45 @@
-from .solution_meta import SolutionMeta
-from .executor import Executor
-from .sourcegen_executor import SourceGeneratorExecutor
-from .crud_executor import CrudExecutor
-from .tests_executor import TestsExecutor
-from .summaries_executor import SummariesExecutor
+"""
+Исполнители команд. Модули исполнителей импортируются при первом обращении к их классам, чтобы команда
+загружала только нужные ей исполнители (summaries не импортирует конструкторы и jinja-шаблоны CRUD)
+"""
+from importlib import import_module
+from typing import TYPE_CHECKING
 
+from devnetgen.timings import timings
+
+if TYPE_CHECKING:
+    from .solution_meta import SolutionMeta
+    from .executor import Executor
+    from .generation_context import GenerationContext
+    from .sourcegen_executor import SourceGeneratorExecutor
+    from .crud_executor import CrudExecutor
+    from .tests_executor import TestsExecutor
+    from .summaries_executor import BaseSummariesExecutor, SummariesExecutor, SummariesSweepExecutor
+    from .batch_executor import BatchExecutor, expand_paths
+    from .watch_executor import WatchExecutor
+
+_exports = {
+    'SolutionMeta': '.solution_meta',
+    'Executor': '.executor',
+    'GenerationContext': '.generation_context',
+    'SourceGeneratorExecutor': '.sourcegen_executor',
+    'CrudExecutor': '.crud_executor',
+    'TestsExecutor': '.tests_executor',
+    'BaseSummariesExecutor': '.summaries_executor',
+    'SummariesExecutor': '.summaries_executor',
+    'SummariesSweepExecutor': '.summaries_executor',
+    'BatchExecutor': '.batch_executor',
+    'expand_paths': '.batch_executor',
+    'WatchExecutor': '.watch_executor',
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name: str):
+    if name not in _exports:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    with timings.phase('imports'):
+        value = getattr(import_module(_exports[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,233 @@
+from __future__ import annotations
+import glob
+import os
+import traceback
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import chain
+from pathlib import Path
+from typing import Optional
+
+from devnetgen.cache import load_entity
+from devnetgen.entities import Entity, find_sources_path
+from devnetgen.executors import CrudExecutor, Executor, GenerationContext, SummariesExecutor, TestsExecutor
+from devnetgen.executors.pool import create_pool, get_worker_index
+from devnetgen.git import stage_files
+from devnetgen.index import SolutionIndex
+from devnetgen.manifest import GenerationManifest
+from devnetgen.staging import StagingArea, overlays
+from devnetgen.timings import timings
+
+
+@dataclass
+class EntityResult:
+    """
+    Результат генерации для одной сущности пакета
+
+    Attributes:
+        path: путь до файла сущности
+        changed_files_num: число сгенерированных файлов
+        changed_directories: директории, в которых сгенерированы файлы
+        git_paths: записанные файлы, которые нужно добавить в git
+        description: описание запланированных изменений (--dry-run)
+        error: трассировка ошибки генерации
+        timings: замеры генерации сущности (для передачи из процесса пула)
+        manifest: изменения манифеста генерации (GenerationManifest.updates)
+        modified_files: файлы, не обновлённые из-за изменений после генерации (--update)
+        cleaned_files: содержимое файлов сущностей с очищенными '!' и '@' в summaries (записывается
+         BatchExecutor после генерации всех сущностей)
+    """
+    path: str
+    changed_files_num: int = 0
+    changed_directories: set[str] = field(default_factory=set)
+    git_paths: list[Path] = field(default_factory=list)
+    description: str = ''
+    error: Optional[str] = None
+    timings: dict = field(default_factory=dict)
+    manifest: dict = field(default_factory=dict)
+    modified_files: list[Path] = field(default_factory=list)
+    cleaned_files: dict[Path, str] = field(default_factory=dict)
+
+
+def _generate(command: str, options: dict, path: str, index: SolutionIndex = None) -> EntityResult:
+    """
+    Сгенерировать CRUD, тесты или всё вместе (CRUD, тесты и summaries Vm/Dto) для одной сущности.
+    Выполняется в процессе пула. Файлы сущностей не изменяются: их читают и другие процессы пула
+    (навигационные сущности), поэтому очищенные от флагов summaries тексты возвращаются в EntityResult
+    :param command: 'crud', 'tests' или 'all'
+    :param options: dry_run, diff, legacy_controller и update
+    :param index: индекс решения (в процессах пула передаётся при их инициализации)
+    """
+    started = timings.snapshot()
+    executors: list[Executor] = []
+    stagings: list[StagingArea] = []
+    cleanup = StagingArea()
+    try:
+        index = index or get_worker_index()
+        manifest = GenerationManifest.for_entity(path)
+        entity = manifest.parse_entity(path, index) if options['update'] else Entity(path, index=index)
+        context = GenerationContext(entity, persist=not options['dry_run'])
+        if command in ('crud', 'all'):
+            stagings.append(staging := StagingArea(options['dry_run'], options['diff']))
+            executor = CrudExecutor(entity, staging, use_git=False, update=options['update'], manifest=manifest,
+                                    context=context)
+            executor.create_crud(legacy_controller=options['legacy_controller'], output=False, clear_flags=False)
+            executor.clear_summaries_flags(cleanup)
+            executors.append(executor)
+        if command in ('tests', 'all'):
+            stagings.append(staging := StagingArea(options['dry_run'], options['diff']))
+            executor = TestsExecutor(entity, staging, use_git=False, update=options['update'], manifest=manifest,
+                                     context=context)
+            executor.create_tests(output=False)
+            executors.append(executor)
+        if command == 'all':
+            stagings.append(staging := StagingArea(options['dry_run'], options['diff']))
+            executor = SummariesExecutor(entity, staging, context=context)
+            executor.add_summaries(output=False)
+            executors.append(executor)
+    except Exception:
+        return EntityResult(path, error=traceback.format_exc(), timings=timings.since(started))
+
+    return EntityResult(
+        path,
+        changed_files_num=sum(executor.changed_files_num for executor in executors),
+        changed_directories={str(directory).removeprefix(executor.solution_name)
+                             for executor in executors for directory in executor.changed_directories},
+        git_paths=[file_path for executor in executors for file_path in executor.git_paths],
+        description=''.join(staging.describe() for staging in stagings if staging.dry_run),
+        timings=timings.since(started),
+        manifest=manifest.updates,
+        modified_files=[file_path for executor in executors for file_path in getattr(executor, 'modified_files', [])],
+        cleaned_files=cleanup.files,
+    )
+
+
+@timings.timed('discovery')
+def expand_paths(patterns: list[str]) -> list[str]:
+    """
+    Раскрыть glob-шаблоны путей (пр. "Domain/Entities/**/*.cs")
+    :return: пути без повторов в порядке перечисления
+    """
+    paths = {}
+    for pattern in patterns:
+        if any(char in pattern for char in '*?['):
+            paths.update(dict.fromkeys(sorted(glob.glob(pattern, recursive=True))))
+        else:
+            paths[pattern] = None
+    return list(paths)
+
+
+class BatchExecutor:
+    """
+    Генерация CRUD'а, тестов или всего вместе для нескольких сущностей: индекс решения строится один раз,
+    сущности обрабатываются в пуле процессов, результаты объединяются в один отчёт
+
+    Attributes:
+        paths: пути до файлов сущностей
+        jobs: число процессов пула
+        options: параметры генерации (dry_run, diff, legacy_controller, update)
+        use_git: добавить записанные файлы в git (одним вызовом git после генерации всех сущностей)
+        results: результаты генерации по сущностям
+        cleanup: файлы сущностей с очищенными флагами summaries, записываются после генерации всех сущностей
+    """
+    paths: list[str]
+    jobs: int
+    options: dict
+    use_git: bool
+    results: list[EntityResult]
+    cleanup: StagingArea
+
+    def __init__(self, patterns: list[str], jobs: Optional[int] = None, dry_run: bool = False,
+                 diff: bool = False, use_git: bool = True, update: bool = False):
+        """
+        :param patterns: пути или glob-шаблоны путей до файлов сущностей
+        :param jobs: число процессов пула (по умолчанию - по числу ядер)
+        :param update: перегенерировать существующие файлы, входные данные которых изменились
+        """
+        self.paths = expand_paths(patterns)
+        self.jobs = jobs or os.cpu_count() or 1
+        self.use_git = use_git
+        self.options = {'dry_run': dry_run, 'diff': diff, 'legacy_controller': False, 'update': update}
+        self.results = []
+        self.cleanup = StagingArea(dry_run, diff)
+
+    def create_crud(self, legacy_controller: bool = False):
+        self.options['legacy_controller'] = legacy_controller
+        self._run('crud')
+
+    def create_tests(self):
+        self._run('tests')
+
+    def create_all(self, legacy_controller: bool = False):
+        """ Сгенерировать CRUD, тесты и summaries Vm/Dto (общий контекст генерации на сущность) """
+        self.options['legacy_controller'] = legacy_controller
+        self._run('all')
+
+    def _run(self, command: str):
+        for index, paths in self._group_by_solution().items():
+            generate = partial(_generate, command, self.options)
+            jobs = min(self.jobs, len(paths))
+            # Буферы редактора (overlays) действуют только в текущем процессе
+            if jobs <= 1 or overlays:
+                results = [generate(path, index) for path in paths]
+            else:
+                with create_pool(jobs, index) as pool:
+                    results = list(pool.map(generate, paths))
+                for result in results:
+                    timings.merge(result.timings)
+            self._save_manifest(GenerationManifest.for_entity(paths[0]), results)
+            self.results.extend(results)
+
+        for result in self.results:
+            for path, content in result.cleaned_files.items():
+                self.cleanup.write(path, content)
+        self.cleanup.flush()
+        if self.use_git and not self.options['dry_run']:
+            stage_files(chain.from_iterable(result.git_paths for result in self.results))
+        self._output_data()
+
+    def _save_manifest(self, manifest: GenerationManifest, results: list[EntityResult]):
+        """ Сохранить изменения манифеста генерации, сделанные процессами пула, одной записью """
+        if self.options['dry_run']:
+            return
+        for result in results:
+            if result.manifest:
+                manifest.merge(result.manifest)
+        manifest.save()
+
+    def _group_by_solution(self) -> dict[SolutionIndex, list[str]]:
+        """
+        Сгруппировать сущности по директориям исходников решений. Индекс каждого решения строится по первой
+        его сущности. Сущности вне директории Domain решения сразу попадают в результаты с ошибкой
+        """
+        groups: dict[Path, list[str]] = {}
+        for path in self.paths:
+            try:
+                sources_path = find_sources_path(Path(path).absolute(), 'Domain')
+            except ValueError:
+                self.results.append(EntityResult(path, error=traceback.format_exc()))
+                continue
+            groups.setdefault(sources_path, []).append(path)
+        return {load_entity(paths[0]).index: paths for paths in groups.values()}
+
+    def _output_data(self):
+        failed = [result for result in self.results if result.error]
+        if self.options['dry_run']:
+            print(''.join(result.description for result in self.results) + self.cleanup.describe(), end='')
+        else:
+            changed_files_num = sum(result.changed_files_num for result in self.results)
+            print(f'Сгенерировано {changed_files_num} файлов для {len(self.results) - len(failed)} сущностей '
+                  f'в директориях:')
+            for directory in sorted(set().union(*(result.changed_directories for result in self.results))):
+                print(directory)
+
+        modified_files = [path for result in self.results for path in result.modified_files]
+        if modified_files:
+            print(f'Не обновлено {len(modified_files)} файлов, изменённых после генерации:')
+            for path in modified_files:
+                print(path)
+
+        for result in failed:
+            print(f'Ошибка генерации для {result.path}:\n{result.error}')
+        if failed:
+            raise RuntimeError(f'Не удалось сгенерировать файлы для {len(failed)} сущностей')
@@ -3,16 +3,21 @@ from typing import TYPE_CHECKING
 
 from devnetgen.executors import SourceGeneratorExecutor
 from devnetgen.constructors import *
+from devnetgen.timings import timings
 
 if TYPE_CHECKING:
     from devnetgen.entities import Namespace, Entity
+    from devnetgen.executors import GenerationContext
+    from devnetgen.manifest import GenerationManifest
+    from devnetgen.staging import StagingArea
 
 
 class CrudExecutor(SourceGeneratorExecutor):
     """ Класс с методами для создания CRUD'а и файла контроллера сущности """
 
-    def __init__(self, entity: Entity):
-        super().__init__(entity)
+    def __init__(self, entity: Entity, staging: StagingArea = None, use_git: bool = True, update: bool = False,
+                 manifest: GenerationManifest = None, context: GenerationContext = None):
+        super().__init__(entity, staging, use_git, update, manifest, context)
 
         self.constructors: list[CRUDConstructor] = [
             CreateConstructor(executor=self),
@@ -23,30 +28,33 @@ class CrudExecutor(SourceGeneratorExecutor):
             GetEntityGridConstructor(executor=self),
         ]
 
-    def create_crud(self, legacy_controller: bool = False):
+    def create_crud(self, legacy_controller: bool = False, output: bool = True, clear_flags: bool = True):
         """
         Сгенерировать и записать на диск CRUD, файл контроллера и вывести результат в stdout
         :param legacy_controller: флаг для генерации файла контроллера в legacy проектах
+        :param output: вывести результат в stdout
+        :param clear_flags: очистить '!' и '@' из summaries задействованных сущностей (в пакетном режиме
+         их очищает BatchExecutor после генерации всех сущностей)
         """
         self._create_crud_files(legacy_controller)
-        self._cleanup_files()
-        self._output_data()
+        if clear_flags:
+            self.clear_summaries_flags(self.staging)
+        self.write_files()
+        if output:
+            self._output_data()
 
     def calculate_namespaces(self) -> dict[str, Namespace]:
+        """ Вычислить пространства имён команд и запросов (сохраняются в общем контексте генерации) """
         for constructor in self.constructors:
             key = constructor.namespace_identifier
             self.command_namespaces[key] = constructor.namespace
         return self.command_namespaces
 
     def _create_crud_files(self, legacy_controller: bool):
-        """ Сгенерировать и записать на диск CRUD сущности и файл контроллера """
-        for constructor in self.constructors:
-            constructor.create_files()
-
+        """ Сгенерировать CRUD сущности и файл контроллера """
         self.calculate_namespaces()
-
         controller = ControllerConstructor(self, legacy_controller)
-        controller.create_files()
+        self.generate_files([*self.constructors, controller])
 
     def get_template_vars(self):
         mediator_data = {
@@ -58,8 +66,9 @@ class CrudExecutor(SourceGeneratorExecutor):
             'webui': 'WebApi' if self.meta.webapi else 'WebUI'
         }
 
-    def _cleanup_files(self):
-        """ Очистить '!' и '@' из summaries свойств всех задействованных сущностей """
-        self.entity.clear_summaries_flags()
+    @timings.timed('cleanup')
+    def clear_summaries_flags(self, staging: StagingArea):
+        """ Запланировать в staging очистку '!' и '@' из summaries свойств всех задействованных сущностей """
+        self.entity.clear_summaries_flags(staging)
         for file in self.entity.included_files:
-            file.clear_summaries_flags()
+            file.clear_summaries_flags(staging)
@@ -1,8 +1,13 @@
-import os
-import subprocess
+from __future__ import annotations
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
 from devnetgen.executors import SolutionMeta
+from devnetgen.git import stage_files
+from devnetgen.staging import StagingArea
+
+if TYPE_CHECKING:
+    from devnetgen.index import SolutionIndex
 
 
 class Executor:
@@ -13,37 +18,58 @@ class Executor:
         changed_files_num: число сгенерированных файлов
         solution_name: наименование решения (пр. "MinstroyGasDistributionNetworks")
         solution_path: абсолютный путь решения, объект Path (пр. "/home/alex/Documents/RiderProjects/MinstroyGasDistributionNetworks")
+        index: индекс классов решения
+        staging: запланированные к записи файлы
+        git_directories: директории, записанные в которые файлы добавляются в git
+        git_paths: записанные файлы, добавляемые в git
+        use_git: добавлять записанные файлы в git
     """
     meta: SolutionMeta
     changed_directories: set[Path | str]
     changed_files_num: int
     solution_name: str
     solution_path: Path
+    index: Optional[SolutionIndex]
+    staging: StagingArea
+    git_directories: set[Path]
+    git_paths: list[Path]
+    use_git: bool
 
-    def __init__(self, solution_path: Path, solution_name: str):
+    def __init__(self, solution_path: Path, solution_name: str, index: SolutionIndex = None,
+                 staging: StagingArea = None, use_git: bool = True):
         self.meta = SolutionMeta()
+        self.index = index
+        self.staging = staging or StagingArea()
+        self.git_directories = set()
+        self.git_paths = []
+        self.use_git = use_git
         self.changed_directories = set()
         self.changed_files_num = 0
         self.solution_name = solution_name
         self.solution_path = solution_path
 
-    def _extract_meta(self):
-        """ Извлечь мета-информацию, необходимую для генерации """
-        self.meta.webapi = (self.solution_path / 'WebApi').exists()
-        self.meta.sieve = (self.solution_path / 'Application' / 'Common' / 'Services' / 'SieveService.cs').exists()
-
-        with open(self.solution_path / 'Application' / 'Application.csproj', "r", encoding='utf-8') as file:
-            text = file.read()
-            self.meta.mediator = 'MediatR' not in text
+    def write_files(self) -> list[Path]:
+        """
+        Записать запланированные файлы на диск и добавить записанные в директории git_directories файлы в git
+        :return: записанные файлы
+        """
+        if self.staging.dry_run:
+            return []
+        written = self.staging.flush()
+        self.git_paths = [path for path in written
+                          if any(path.is_relative_to(directory) for directory in self.git_directories)]
+        if self.use_git:
+            stage_files(self.git_paths)
+        return written
 
     def _output_data(self):
+        if self.staging.dry_run:
+            print(self.staging.describe(), end='')
+            return
         print(f'Сгенерировано {self.changed_files_num} файлов в директориях:')
         for directory in self.changed_directories:
             print(str(directory).removeprefix(self.solution_name))
 
-    @staticmethod
-    def add_to_git(directory_path: Path):
-        """ Добавить все файлы директории в git """
-        directory_str = str(directory_path)
-        os.chdir(directory_str)
-        subprocess.run(["git", "add", '.'])
+    def add_to_git(self, directory_path: Path):
+        """ Запланировать добавление записанных в директорию файлов в git """
+        self.git_directories.add(directory_path)
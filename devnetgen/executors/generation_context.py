@@ -0,0 +1,86 @@
+from __future__ import annotations
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from devnetgen.executors import SolutionMeta
+from devnetgen.index import load_index
+
+if TYPE_CHECKING:
+    from devnetgen.entities import Entity, Namespace
+    from devnetgen.index import SolutionIndex
+
+
+class GenerationContext:
+    """
+    Данные генерации для сущности, общие для исполнителей CRUD'а, тестов и summaries: вычисляются один раз
+    и передаются всем исполнителям одного запуска (dev-netgen all)
+
+    Attributes:
+        entity: сущность, для которой создаются элементы
+        solution_name: наименование решения
+        solution_path: директория исходников решения
+        index: индекс классов решения
+        meta: мета-информация о проекте
+        application_namespace: неполный (базовый) объект Namespace /Application/Work/..
+        webui_namespace: неполный (базовый) объект Namespace /WebApi(WebUI)/Controllers/Work/..
+        tests_namespace: имя базового пространства имён тестов /Application.IntegrationTests/Tests/Work/..
+        command_namespaces: пространства имён команд и запросов по namespace_identifier конструкторов CRUD
+         (заполняется CrudExecutor.calculate_namespaces)
+    """
+    entity: Entity
+    solution_name: str
+    solution_path: Path
+    index: SolutionIndex
+    meta: SolutionMeta
+    application_namespace: Namespace
+    webui_namespace: Namespace
+    tests_namespace: str
+    command_namespaces: dict[str, Namespace]
+
+    def __init__(self, entity: Entity, persist: Optional[bool] = None):
+        """ :param persist: сохранить изменившийся индекс решения на диск (False для --dry-run) """
+        self.entity = entity
+        self.solution_name = entity.solution_name
+        self.solution_path = entity.sources_path
+        self.index = entity.index or load_index(entity.sources_path, entity.solution_name, persist)
+        # Мета-информация вычисляется и хранится индексом решения
+        self.meta = self.index.meta
+        self.command_namespaces = {}
+        self._calculate_namespaces()
+        self.tests_namespace = self.application_namespace.name.replace('Application',
+                                                                       'Application.IntegrationTests.Tests')
+
+    def _calculate_namespaces(self):
+        """ Определить базовые директории генерации файлов и соответствующие неполные неймспейсы """
+        controller_path = self.index.find_directories('Controllers')[0]
+
+        if match := re.search("^.*References?(.*)", self.entity.namespace.name):
+            target = match.group(1)
+            application_path, webui_path = self._calculate_paths_references(controller_path, target)
+        else:
+            target = re.search("^.*Entities(.*)", self.entity.namespace.name).group(1)
+            application_path = self.solution_path / 'Application' / 'Work' / target.removeprefix('.').replace('.', '/')
+            webui_path = controller_path / 'Work' / target.removeprefix('.').replace('.', '/')
+
+        application_posix = application_path.as_posix()
+        namespace_name = self.solution_name + application_posix[application_posix.index('/Application'):].replace('/', '.')
+        self.application_namespace = self.entity.get_namespace_obj(namespace_name + f'.{self.entity.pluralized_class_name}')
+
+        webui_posix = webui_path.as_posix()
+        prefix = '/WebApi' if self.meta.webapi else '/WebUI'
+        namespace_name = self.solution_name + webui_posix[webui_posix.index(prefix):].replace('/', '.')
+        self.webui_namespace = self.entity.get_namespace_obj(namespace_name)
+
+    def _calculate_paths_references(self, controller_path: Path, namespace_target: str) -> tuple[Path, Path]:
+        index = self.index
+        application_root = self.solution_path / 'Application'
+        application_path_results = index.find_directories('References', under=application_root)
+        if len(application_path_results) == 0:
+            application_path_results = index.find_directories('Reference', under=application_root)
+        application_path = application_path_results[0] / namespace_target.removeprefix('.').replace('.', '/')
+        webui_path_results = index.find_directories('References', under=controller_path)
+        if len(application_path_results) == 0:
+            webui_path_results = index.find_directories('Reference', under=controller_path)
+        webui_path = webui_path_results[0] / namespace_target.removeprefix('.').replace('.', '/')
+        return application_path, webui_path
@@ -0,0 +1,28 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+    from devnetgen.index import SolutionIndex
+
+_worker_index: Optional[SolutionIndex] = None
+
+
+def _init_worker(index: SolutionIndex):
+    global _worker_index
+    _worker_index = index
+
+
+def get_worker_index() -> Optional[SolutionIndex]:
+    """ :return: индекс решения, переданный процессу пула при его инициализации """
+    return _worker_index
+
+
+def create_pool(jobs: int, index: SolutionIndex) -> ProcessPoolExecutor:
+    """
+    Создать пул процессов, каждому из которых индекс решения передаётся один раз при инициализации
+    :param jobs: число процессов
+    :param index: индекс решения
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    return ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(index,))
@@ -1,8 +1,11 @@
-import re
 from pathlib import Path
+from typing import Optional
 
+from devnetgen.constructors.constructor import Constructor, RenderTask, render_files
 from devnetgen.entities import Entity, Namespace
-from devnetgen.executors import Executor
+from devnetgen.executors import Executor, GenerationContext
+from devnetgen.manifest import GenerationManifest, ManifestEntry, hash_text
+from devnetgen.staging import StagingArea
 
 
 class SourceGeneratorExecutor(Executor):
@@ -11,55 +14,118 @@ class SourceGeneratorExecutor(Executor):
 
     Attributes:
         entity: сущность для которой создаются элементы
+        context: общие для исполнителей данные генерации сущности (мета-информация, пространства имён)
         application_namespace: неполный (базовый) объект Namespace /Application/Work/..
         webui_namespace: неполный (базовый) объект Namespace /Application/Work/..
-        command_namespaces: пространства имен команд и запросов
+        command_namespaces: пространства имен команд и запросов (общие для исполнителей контекста)
+        update: перегенерировать существующие файлы, входные данные которых изменились
+        manifest: манифест генерации решения
+        save_manifest: сохранить манифест после записи файлов
+        modified_files: файлы, не обновлённые из-за изменений после генерации
+        unmanaged_files: существующие файлы, отсутствующие в манифесте (не обновляются)
     """
     entity: Entity
+    context: GenerationContext
     application_namespace: Namespace
     webui_namespace: Namespace
     command_namespaces: dict[str, Namespace]
+    update: bool
+    manifest: Optional[GenerationManifest]
+    save_manifest: bool
+    modified_files: list[Path]
+    unmanaged_files: list[Path]
 
-    def __init__(self, entity: Entity):
-        super().__init__(entity.sources_path, entity.solution_name)
+    def __init__(self, entity: Entity, staging: StagingArea = None, use_git: bool = True, update: bool = False,
+                 manifest: GenerationManifest = None, context: GenerationContext = None):
+        """
+        :param update: перегенерировать существующие файлы, входные данные которых изменились (--update)
+        :param manifest: манифест генерации (передаётся в пакетном режиме, иначе читается и сохраняется исполнителем)
+        :param context: данные генерации сущности, вычисленные другим исполнителем (иначе вычисляются заново)
+        """
+        context = context or GenerationContext(entity, persist=staging is None or not staging.dry_run)
+        super().__init__(context.solution_path, context.solution_name, context.index, staging, use_git)
 
         self.entity = entity
-        self.command_namespaces = {}
+        self.context = context
+        self.meta = context.meta
+        self.application_namespace = context.application_namespace
+        self.webui_namespace = context.webui_namespace
+        self.command_namespaces = context.command_namespaces
+        self.update = update
+        self.manifest = manifest
+        self.save_manifest = manifest is None
+        self.modified_files = []
+        self.unmanaged_files = []
 
-        self._extract_meta()
-        self._calculate_namespaces()
+    def generate_files(self, constructors: list[Constructor]):
+        """
+        Сгенерировать файлы конструкторов: сначала планируются все файлы (существующие и повторно запланированные
+        пропускаются без рендеринга), затем шаблоны рендерятся независимо друг от друга и результаты
+        записываются в staging в порядке плана. В режиме update существующие файлы из манифеста генерации
+        перерендериваются, если изменились их входные данные, и перезаписываются, если они не изменены после генерации
+        """
+        manifest = self._load_manifest()
+        tasks: dict[Path, tuple[RenderTask, str, Optional[ManifestEntry]]] = {}
+        for constructor in constructors:
+            for task in constructor.plan_files():
+                if task.path in tasks:
+                    continue
+                exists = self.staging.exists(task.path)
+                if exists and not self.update:
+                    continue
+                inputs = task.inputs_hash()
+                entry = manifest.get(task.path) if exists else None
+                if exists and not self._is_outdated(task.path, inputs, entry):
+                    continue
+                tasks[task.path] = (task, inputs, entry)
 
-    def _calculate_namespaces(self):
-        """ Определить базовые директории генерации файлов и соответствующие неполные неймспейсы """
-        controller_path = next(self.entity.sources_path.glob('**/Controllers'))
+        planned = [task for task, _, _ in tasks.values()]
+        for (task, inputs, entry), content in zip(tasks.values(), render_files(planned)):
+            manifest.record(task.path, inputs, content)
+            if entry is not None and entry.content == hash_text(content):
+                continue
+            self.staging.write(task.path, content)
+            self.log_directory(task.namespace)
 
-        if match := re.search("^.*References?(.*)", self.entity.namespace.name):
-            target = match.group(1)
-            application_path, webui_path = self._calculate_paths_references(controller_path, target)
-        else:
-            target = re.search("^.*Entities(.*)", self.entity.namespace.name).group(1)
-            application_path = self.entity.sources_path / 'Application' / 'Work' / target.removeprefix('.').replace('.', '/')
-            webui_path = controller_path / 'Work' / target.removeprefix('.').replace('.', '/')
+        for entity in (self.entity, *(file.entity for file in self.entity.included_files)):
+            manifest.record_property_flags(entity)
 
-        application_posix = application_path.as_posix()
-        namespace_name = self.entity.solution_name + application_posix[application_posix.index('/Application'):].replace('/', '.')
-        self.application_namespace = self.entity.get_namespace_obj(namespace_name + f'.{self.entity.pluralized_class_name}')
+    def _is_outdated(self, path: Path, inputs: str, entry: Optional[ManifestEntry]) -> bool:
+        """
+        :return: существующий файл нужно перерендерить: он есть в манифесте, его входные данные изменились
+         и содержимое не изменено после генерации (изменённые файлы запоминаются для отчёта)
+        """
+        if entry is None:
+            self.unmanaged_files.append(path)
+            return False
+        if entry.inputs == inputs:
+            return False
+        original, _ = self.staging.read_original(path)
+        if original is None or hash_text(original) != entry.content:
+            self.modified_files.append(path)
+            return False
+        return True
 
-        webui_posix = webui_path.as_posix()
-        prefix = '/WebApi' if self.meta.webapi else '/WebUI'
-        namespace_name = self.entity.solution_name + webui_posix[webui_posix.index(prefix):].replace('/', '.')
-        self.webui_namespace = self.entity.get_namespace_obj(namespace_name)
+    def _load_manifest(self) -> GenerationManifest:
+        if self.manifest is None:
+            self.manifest = GenerationManifest.load(self.solution_path)
+        return self.manifest
 
-    def _calculate_paths_references(self, controller_path: Path, namespace_target: str) -> tuple[Path, Path]:
-        application_path_results = tuple((self.entity.sources_path / 'Application').glob('**/References'))
-        if len(application_path_results) == 0:
-            application_path_results = tuple((self.entity.sources_path / 'Application').glob('**/Reference'))
-        application_path = application_path_results[0] / namespace_target.removeprefix('.').replace('.', '/')
-        webui_path_results = tuple(controller_path.glob('**/References'))
-        if len(application_path_results) == 0:
-            webui_path_results = tuple(controller_path.glob('**/Reference'))
-        webui_path = webui_path_results[0] / namespace_target.removeprefix('.').replace('.', '/')
-        return application_path, webui_path
+    def write_files(self) -> list[Path]:
+        """ Записать файлы и сохранить манифест генерации (в пакетном режиме его сохраняет BatchExecutor) """
+        written = super().write_files()
+        if self.save_manifest and self.manifest is not None and not self.staging.dry_run:
+            self.manifest.save()
+        return written
+
+    def _output_data(self):
+        super()._output_data()
+        if self.modified_files:
+            print(f'Не обновлено {len(self.modified_files)} файлов, изменённых после генерации:')
+            for path in self.modified_files:
+                print(path.as_posix().removeprefix(self.solution_path.as_posix()))
+        if self.unmanaged_files:
+            print(f'Не обновлено {len(self.unmanaged_files)} файлов, отсутствующих в манифесте генерации')
 
     def log_directory(self, namespace: Namespace):
         self.changed_files_num += 1
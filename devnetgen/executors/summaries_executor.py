@@ -1,28 +1,26 @@
-from itertools import chain
+from __future__ import annotations
+import os
+import traceback
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
-from devnetgen.entities import Entity, VmDto
+from devnetgen.entities import BaseEntity, Entity, EntityRegistry, VmDto
 from devnetgen.executors import Executor
+from devnetgen.executors.pool import create_pool, get_worker_index
+from devnetgen.index import SolutionIndex, load_index
+from devnetgen.staging import StagingArea, overlays
+from devnetgen.timings import timings
 
+if TYPE_CHECKING:
+    from devnetgen.executors import GenerationContext
 
-class SummariesExecutor(Executor):
-    def __init__(self, entity: Entity):
-        super().__init__(entity.sources_path, entity.solution_name)
-        self.entity = entity
+vm_dto_suffixes = ('Vm', 'Dto')
 
-    def add_summaries(self):
-        application_path = self.solution_path / 'Application'
-        vm_files = application_path.rglob(f'{self.entity.class_name}Vm.cs')
-        dto_files = application_path.rglob(f'{self.entity.class_name}Dto.cs')
-
-        for file_path in chain(vm_files, dto_files):
-            file = VmDto(file_path)
-            file.add_properties_summaries()
-            file.add_class_summary()
-            if file.substituted_file_text != file.file_text:
-                self._log_file(file_path)
 
-        self._output_data()
+class BaseSummariesExecutor(Executor):
+    """ Общая часть исполнителей, обновляющих summaries в vm/dto: учёт изменённых файлов и вывод результата """
 
     def _log_file(self, path: Path):
         posix_dir = path.as_posix()
@@ -31,6 +29,192 @@ class SummariesExecutor(Executor):
         self.changed_directories.add(path)
 
     def _output_data(self):
+        if self.staging.dry_run:
+            print(self.staging.describe(), end='')
+            return
         print(f'Изменено {self.changed_files_num} файлов:')
         for directory in self.changed_directories:
-            print(str(directory).removeprefix(self.solution_name))
\ No newline at end of file
+            print(str(directory).removeprefix(self.solution_name))
+
+
+class SummariesExecutor(BaseSummariesExecutor):
+    def __init__(self, entity: Entity, staging: StagingArea = None, context: GenerationContext = None):
+        """ :param context: данные генерации сущности, вычисленные исполнителем CRUD'а или тестов (dev-netgen all) """
+        index = context.index if context is not None else entity.index
+        super().__init__(entity.sources_path, entity.solution_name, index, staging)
+        self.entity = entity
+
+    def add_summaries(self, output: bool = True):
+        """
+        Добавить summaries в Vm/Dto сущности
+        :param output: вывести результат в stdout
+        """
+        application_path = self.solution_path / 'Application'
+        registry = EntityRegistry()
+
+        for suffix in vm_dto_suffixes:
+            for file_path in find_vm_dto_files(self.index, application_path, f'{self.entity.class_name}{suffix}'):
+                file = VmDto(file_path, self.index, self.staging, registry)
+                file.add_summaries()
+                if file.substituted_file_text != file.file_text:
+                    self._log_file(file_path)
+
+        self.write_files()
+        if output:
+            self._output_data()
+
+
+def find_vm_dto_files(index: SolutionIndex, application_path: Path, class_name: str) -> list[Path]:
+    """ :return: файлы класса vm/dto в Application (по индексу решения, вместо rglob) """
+    return [directory / f'{class_name}.cs' for directory in index.find_class(class_name)
+            if directory.is_relative_to(application_path)]
+
+
+def find_solution(path: Optional[str] = None) -> tuple[Path, str]:
+    """
+    Найти решение, содержащее путь: ближайшую директорию с поддиректориями Domain и Application
+    :param path: файл или директория внутри решения (по умолчанию - текущая директория)
+    :return: директория исходников решения и наименование решения
+    """
+    start_path = Path(path or os.getcwd()).absolute()
+    for directory in (start_path, *start_path.parents):
+        if (directory / 'Domain').is_dir() and (directory / 'Application').is_dir():
+            solution_name = BaseEntity._find_sln_file(directory)
+            if solution_name is None:
+                raise FileNotFoundError(f'Не найден .sln файл решения для {directory}')
+            return directory, solution_name
+    raise FileNotFoundError(f'Не найдена директория решения с Domain и Application для {start_path}')
+
+
+@dataclass
+class SweepResult:
+    """
+    Результат обновления summaries в vm/dto одной сущности
+
+    Attributes:
+        changed_files: изменённые файлы
+        description: описание запланированных изменений (--dry-run)
+        errors: трассировки ошибок по путям файлов
+        timings: замеры обработки сущности (для передачи из процесса пула)
+    """
+    changed_files: list[Path] = field(default_factory=list)
+    description: str = ''
+    errors: dict[Path, str] = field(default_factory=dict)
+    timings: dict = field(default_factory=dict)
+
+
+def _add_entity_summaries(options: dict, files: list[Path], index: SolutionIndex = None) -> SweepResult:
+    """
+    Обновить summaries во всех vm/dto одной сущности. Базовая сущность разбирается один раз
+    и используется всеми её vm/dto. Выполняется в процессе пула
+    :param options: dry_run и diff
+    :param files: файлы vm/dto сущности
+    :param index: индекс решения (в процессах пула передаётся при их инициализации)
+    """
+    started = timings.snapshot()
+    index = index or get_worker_index()
+    staging = StagingArea(options['dry_run'], options['diff'])
+    registry = EntityRegistry()
+    result = SweepResult()
+
+    for file_path in files:
+        try:
+            file = VmDto(file_path, index, staging, registry)
+            file.add_summaries()
+        except Exception:
+            result.errors[file_path] = traceback.format_exc()
+            continue
+        if file.substituted_file_text != file.file_text:
+            result.changed_files.append(file_path)
+
+    if staging.dry_run:
+        result.description = staging.describe()
+    staging.flush()
+    result.timings = timings.since(started)
+    return result
+
+
+class SummariesSweepExecutor(BaseSummariesExecutor):
+    """
+    Обновление summaries во всех vm/dto решения: файлы находятся по индексу решения за один проход,
+    группируются по базовой сущности и обрабатываются в пуле процессов
+
+    Attributes:
+        jobs: число процессов пула
+        errors: трассировки ошибок по путям файлов
+    """
+    jobs: int
+    errors: dict[Path, str]
+
+    def __init__(self, solution_path: Path, solution_name: str, staging: StagingArea = None,
+                 jobs: Optional[int] = None):
+        """
+        :param solution_path: директория исходников решения (содержит Domain и Application)
+        :param solution_name: наименование решения
+        :param jobs: число процессов пула (по умолчанию - по числу ядер)
+        """
+        staging = staging or StagingArea()
+        index = load_index(solution_path, solution_name, persist=not staging.dry_run)
+        super().__init__(solution_path, solution_name, index, staging)
+        self.jobs = jobs or os.cpu_count() or 1
+        self.errors = {}
+
+    @classmethod
+    def from_path(cls, path: Optional[str] = None, staging: StagingArea = None,
+                  jobs: Optional[int] = None) -> SummariesSweepExecutor:
+        """
+        :param path: файл или директория внутри решения (по умолчанию - текущая директория)
+        """
+        return cls(*find_solution(path), staging, jobs)
+
+    def add_summaries(self):
+        groups = list(self._group_by_entity().values())
+        options = {'dry_run': self.staging.dry_run, 'diff': self.staging.diff}
+        add_entity_summaries = partial(_add_entity_summaries, options)
+        jobs = min(self.jobs, len(groups))
+
+        # Буферы редактора (overlays) действуют только в текущем процессе
+        if jobs <= 1 or overlays:
+            results = [add_entity_summaries(files, self.index) for files in groups]
+        else:
+            with create_pool(jobs, self.index) as pool:
+                results = list(pool.map(add_entity_summaries, groups))
+            for result in results:
+                timings.merge(result.timings)
+
+        descriptions = []
+        for result in results:
+            for file_path in result.changed_files:
+                self._log_file(file_path)
+            descriptions.append(result.description)
+            self.errors.update(result.errors)
+
+        if self.staging.dry_run:
+            print(''.join(descriptions), end='')
+        else:
+            self._output_data()
+        for file_path, error in self.errors.items():
+            print(f'Ошибка обработки {file_path}:\n{error}')
+        if self.errors:
+            raise RuntimeError(f'Не удалось обновить summaries в {len(self.errors)} файлах')
+
+    def _group_by_entity(self) -> dict[str, list[Path]]:
+        """
+        Найти все vm/dto в Application, для которых в Domain есть сущность с тем же именем,
+        и сгруппировать их по имени сущности
+        """
+        application_path = self.solution_path / 'Application'
+        domain_path = self.solution_path / 'Domain'
+        groups: dict[str, list[Path]] = {}
+
+        for directory in self.index.walk(application_path):
+            for class_name in sorted(self.index.directories[directory]):
+                suffix = next((suffix for suffix in vm_dto_suffixes if class_name.endswith(suffix)), None)
+                if suffix is None:
+                    continue
+                entity_name = class_name.removesuffix(suffix)
+                if not any(path.is_relative_to(domain_path) for path in self.index.find_class(entity_name)):
+                    continue
+                groups.setdefault(entity_name, []).append(directory / f'{class_name}.cs')
+
+        return groups
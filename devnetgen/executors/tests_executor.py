@@ -6,9 +6,14 @@ from devnetgen.executors import SourceGeneratorExecutor
 class TestsExecutor(SourceGeneratorExecutor):
     """ Класс с методами для создания тестов под CRUD-команды и запросы сущности """
 
-    def create_tests(self):
-        crud_executor = CrudExecutor(self.entity)
-        self.command_namespaces = crud_executor.calculate_namespaces()
+    def create_tests(self, output: bool = True):
+        """
+        Сгенерировать и записать на диск тесты CRUD'а сущности
+        :param output: вывести результат в stdout
+        """
+        if not self.command_namespaces:
+            # Пространства имён команд не вычислены исполнителем CRUD'а этого контекста
+            CrudExecutor(self.entity, context=self.context).calculate_namespaces()
 
         constructors: list[TestsConstructor] = [
             CreateEntityTestsConstructor(executor=self),
@@ -19,7 +24,8 @@ class TestsExecutor(SourceGeneratorExecutor):
             GetEntityGridTestsConstructor(executor=self),
         ]
 
-        for constructor in constructors:
-            constructor.create_files()
+        self.generate_files(constructors)
 
-        self._output_data()
+        self.write_files()
+        if output:
+            self._output_data()
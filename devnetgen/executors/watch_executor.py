@@ -0,0 +1,128 @@
+from __future__ import annotations
+import time
+import traceback
+from pathlib import Path
+from typing import Optional
+
+from devnetgen.entities import EntityRegistry, VmDto, VmDtoSummaries
+from devnetgen.executors.summaries_executor import SummariesSweepExecutor, find_vm_dto_files, vm_dto_suffixes
+from devnetgen.scanner import scan
+from devnetgen.staging import StagingArea, read_text
+from devnetgen.watcher import FileWatcher
+
+# Объявленные summaries сущности: описание класса и тип и описание каждого свойства
+EntityState = tuple[Optional[str], tuple[tuple[str, str, Optional[str]], ...]]
+
+
+def read_entity_state(path: Path) -> Optional[EntityState]:
+    """
+    :return: объявленные summaries сущности или None, если файл не существует или не содержит класса
+     (файл читается так же, как генераторами: без BOM, с переводами строк '\\n', из буфера редактора при overlays)
+    """
+    try:
+        text = read_text(path)
+    except (OSError, UnicodeDecodeError):
+        return None
+    declaration = scan(text).find_class(path.name.removesuffix('.cs'))
+    if declaration is None:
+        return None
+    return declaration.summary, tuple((prop.name, prop.type, prop.summary) for prop in declaration.properties)
+
+
+class WatchExecutor(SummariesSweepExecutor):
+    """
+    Инкрементальное обновление summaries vm/dto при изменении сущностей (dev-netgen watch). Индекс решения,
+    объявленные summaries сущностей и вычисленные по ним summaries vm/dto хранятся в памяти между изменениями:
+    изменённая сущность сравнивается с предыдущим разбором, и vm/dto обновляются только у сущностей,
+    summaries (или типы свойств) которых изменились
+
+    Attributes:
+        entities: объявленные summaries сущностей Domain по путям файлов
+        summaries: summaries vm/dto по путям файлов, вычисленные при последнем обновлении (для замены устаревших)
+    """
+    entities: dict[Path, Optional[EntityState]]
+    summaries: dict[Path, VmDtoSummaries]
+
+    def __init__(self, solution_path: Path, solution_name: str, staging: StagingArea = None,
+                 jobs: Optional[int] = None):
+        super().__init__(solution_path, solution_name, staging, jobs)
+        self.domain_path = solution_path / 'Domain'
+        self.entities = {}
+        self.summaries = {}
+
+    def load(self):
+        """ Разобрать сущности и vm/dto решения (один реестр разобранных сущностей на весь разбор) """
+        registry = EntityRegistry()
+        for entity_name, files in self._group_by_entity().items():
+            for path in self.index.find_class(entity_name):
+                if path.is_relative_to(self.domain_path):
+                    file_path = path / f'{entity_name}.cs'
+                    self.entities[file_path] = read_entity_state(file_path)
+            for file_path in files:
+                try:
+                    self.summaries[file_path] = VmDto(file_path, self.index, registry=registry).summaries()
+                except Exception:
+                    print(f'Ошибка разбора {file_path}:\n{traceback.format_exc()}')
+
+    def watch(self, watcher: FileWatcher):
+        """ Обрабатывать изменения сущностей до прерывания (Ctrl+C) """
+        self.load()
+        print(f'Отслеживаются изменения сущностей в {self.domain_path} (vm/dto: {len(self.summaries)}), '
+              f'Ctrl+C - завершить', flush=True)
+        try:
+            while True:
+                changed = watcher.wait()
+                if changed:
+                    self.process(changed)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watcher.close()
+
+    def process(self, changed: set[Path]) -> list[Path]:
+        """
+        Обновить summaries vm/dto изменённых сущностей
+        :param changed: изменённые .cs файлы
+        :return: изменённые файлы vm/dto
+        """
+        started = time.perf_counter()
+        affected = []
+        for path in sorted(changed):
+            if not path.is_relative_to(self.domain_path):
+                continue
+            state = read_entity_state(path)
+            if self.entities.get(path) == state and path in self.entities:
+                continue
+            self.entities[path] = state
+            if state is not None:
+                affected.append(path.name.removesuffix('.cs'))
+        if not affected:
+            return []
+
+        self.index.refresh()
+        application_path = self.solution_path / 'Application'
+        registry = EntityRegistry()
+        written = []
+        for entity_name in affected:
+            for suffix in vm_dto_suffixes:
+                for file_path in find_vm_dto_files(self.index, application_path, f'{entity_name}{suffix}'):
+                    try:
+                        file = VmDto(file_path, self.index, self.staging, registry)
+                        file.add_summaries(self.summaries.get(file_path))
+                        self.summaries[file_path] = file.summaries()
+                    except Exception:
+                        print(f'Ошибка обработки {file_path}:\n{traceback.format_exc()}')
+                        continue
+                    if file.substituted_file_text != file.file_text:
+                        written.append(file_path)
+
+        if self.staging.dry_run:
+            print(self.staging.describe(), end='')
+            self.staging.files.clear()
+        self.staging.flush()
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f'{", ".join(affected)}: изменено {len(written)} файлов vm/dto за {elapsed:.1f} мс')
+        for file_path in written:
+            posix_path = file_path.as_posix()
+            print(posix_path[posix_path.index('/Application'):])
+        return written
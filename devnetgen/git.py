@@ -0,0 +1,40 @@
+from __future__ import annotations
+import sys
+from pathlib import Path
+from typing import Iterable, Optional
+
+from devnetgen.timings import timings
+
+
+def find_repository_root(path: Path) -> Optional[Path]:
+    """ :return: корень git-репозитория (директория с .git), содержащего путь, или None """
+    for directory in (path, *path.parents):
+        timings.count('stat')
+        if (directory / '.git').exists():
+            return directory
+    return None
+
+
+@timings.timed('git')
+def stage_files(paths: Iterable[Path]) -> None:
+    """
+    Добавить файлы в индекс git: один вызов `git add --pathspec-from-file` на репозиторий,
+    из корня репозитория (рабочая директория процесса не меняется). Файлы вне git-репозиториев пропускаются.
+    Ошибки git (пр. файлы, исключённые в .gitignore) выводятся в stderr предупреждением: остальные файлы
+    при этом добавляются
+    :param paths: абсолютные пути до файлов
+    """
+    import subprocess
+
+    repositories: dict[Path, list[str]] = {}
+    for path in paths:
+        if root := find_repository_root(path.parent):
+            repositories.setdefault(root, []).append(path.relative_to(root).as_posix())
+
+    for root, relative_paths in repositories.items():
+        timings.count('subprocesses')
+        result = subprocess.run(['git', 'add', '--pathspec-from-file=-', '--pathspec-file-nul'], cwd=root,
+                                input='\0'.join(sorted(relative_paths)).encode('utf-8'), capture_output=True)
+        if result.returncode != 0:
+            error = result.stderr.decode('utf-8', errors='replace').strip()
+            print(f'Не все файлы добавлены в git ({root}, код {result.returncode}):\n{error}', file=sys.stderr)
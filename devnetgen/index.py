@@ -0,0 +1,339 @@
+from __future__ import annotations
+import json
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, Optional
+
+from devnetgen.cache import get_mtime, list_classes
+from devnetgen.timings import timings
+
+if TYPE_CHECKING:
+    from devnetgen.executors import SolutionMeta
+    from devnetgen.walker import IgnoreRules
+
+cache_directory_name = '.devnetgen'
+cache_version = 2
+# Директории, изменённые менее чем за это время до сканирования, пересканируются при следующем обновлении:
+# изменение в пределах того же тика часов не меняет mtime директории
+racy_mtime_window_ns = 2 * 10**9
+
+
+def prepare_cache_directory(root: Path) -> Path:
+    """
+    Создать директорию кэша {root}/.devnetgen, исключённую из git
+    :raise OSError: директорию не удалось создать
+    """
+    cache_dir = root / cache_directory_name
+    cache_dir.mkdir(exist_ok=True)
+    gitignore = cache_dir / '.gitignore'
+    if not gitignore.exists():
+        gitignore.write_text('*\n', encoding='utf-8')
+    return cache_dir
+
+
+@dataclass
+class IndexedDirectory:
+    """
+    Проиндексированная директория
+
+    Attributes:
+        mtime: время изменения директории на момент сканирования (None - пересканировать при следующем обновлении)
+        classes: имена классов (.cs файлов) директории
+        subdirectories: имена поддиректорий (без пропускаемых при обходе)
+        ignore_mtime: время изменения .gitignore директории или None, если его нет
+    """
+    mtime: Optional[int]
+    classes: set[str] = field(default_factory=set)
+    subdirectories: list[str] = field(default_factory=list)
+    ignore_mtime: Optional[int] = None
+
+
+class SolutionIndex:
+    """
+    Индекс c#-классов решения, построенный за один проход по дереву исходников.
+    Сохраняется в {root}/.devnetgen/index и при следующих запусках обновляется инкрементально:
+    пересканируются только директории, время изменения которых отличается от сохранённого.
+    Обход не спускается в выходные директории сборки и служебные директории (bin, obj, .git, node_modules, wwwroot, ...)
+    и пропускает исключённые в .gitignore пути
+
+    Attributes:
+        root: корневая директория исходников решения
+        solution_name: наименование решения (пр. "MinstroyGasDistributionNetworks")
+        entries: проиндексированные директории дерева
+        directories: имена классов (.cs файлов) каждой директории дерева
+        class_directories: директории, содержащие класс с данным именем
+        directory_names: директории дерева по их имени (пр. "Controllers")
+        meta: мета-информация о проекте
+        csproj_mtime: время изменения Application.csproj, по которому вычислена meta.mediator
+        ignore_files: времена изменения файлов .gitignore выше корня (до корня git-репозитория)
+        changed: индекс отличается от сохранённого на диске
+        computed: вычисленные по индексу значения, общие для всех сущностей решения (сбрасываются при изменении индекса)
+    """
+    root: Path
+    solution_name: str
+    entries: dict[Path, IndexedDirectory]
+    directories: dict[Path, set[str]]
+    class_directories: dict[str, list[Path]]
+    directory_names: dict[str, list[Path]]
+    meta: SolutionMeta
+    csproj_mtime: Optional[int]
+    ignore_files: dict[str, Optional[int]]
+    changed: bool
+    computed: dict
+
+    def __init__(self, root: Path, solution_name: str, entries: dict[Path, IndexedDirectory] = None,
+                 meta: SolutionMeta = None, csproj_mtime: Optional[int] = None,
+                 ignore_files: dict[str, Optional[int]] = None):
+        """
+        :param entries: ранее сохранённые директории, сверяемые при первом обновлении
+        """
+        from devnetgen.executors import SolutionMeta
+
+        self.root = Path(root)
+        self.solution_name = solution_name
+        self.entries = entries or {}
+        self.meta = meta or SolutionMeta()
+        self.csproj_mtime = csproj_mtime
+        self.ignore_files = ignore_files or {}
+        self.computed = {}
+        self.refresh()
+
+    @property
+    def cache_path(self) -> Path:
+        return self.root / cache_directory_name / 'index'
+
+    def refresh(self):
+        """
+        Обновить индекс: пройти по дереву, сверяя время изменения директорий с сохранённым,
+        и пересканировать только изменившиеся директории. При изменении .gitignore директории
+        её поддерево пересканируется целиком, при изменении .gitignore выше корня - всё дерево
+        """
+        from devnetgen.git import find_repository_root
+        from devnetgen.walker import IgnoreRules, ignore_file_name, read_ignore_file
+
+        previous = self.entries
+        self.entries = {}
+        self.changed = False
+        now = time.time_ns()
+
+        root_rules, ignore_files = IgnoreRules.for_ancestors(self.root, find_repository_root(self.root))
+        if ignore_files != self.ignore_files:
+            previous = {}
+            self.ignore_files = ignore_files
+
+        stack = [(self.root, root_rules, False)]
+        while stack:
+            directory, rules, rescan = stack.pop()
+            mtime = get_mtime(directory)
+            if mtime is None:
+                continue
+
+            entry = previous.get(directory)
+            if entry is not None and entry.ignore_mtime is not None:
+                rescan = rescan or read_ignore_file(directory / ignore_file_name)[0] != entry.ignore_mtime
+            if rescan or entry is None or entry.mtime is None or entry.mtime != mtime:
+                previous_entry = entry
+                entry = self._scan_directory(directory, mtime, rules)
+                if entry is None:
+                    continue
+                if now - mtime < racy_mtime_window_ns:
+                    entry.mtime = None
+                rescan = rescan or (previous_entry is not None and previous_entry.ignore_mtime != entry.ignore_mtime)
+                self.changed = True
+
+            if entry.ignore_mtime is not None:
+                rules = rules.extend(read_ignore_file(directory / ignore_file_name)[1])
+            self.entries[directory] = entry
+            stack.extend((directory / name, rules, rescan) for name in reversed(entry.subdirectories))
+
+        if previous.keys() - self.entries.keys():
+            self.changed = True
+        if self.changed:
+            self.computed.clear()
+        self._build_lookups()
+        self._refresh_meta()
+
+    @staticmethod
+    def _scan_directory(directory: Path, mtime: int, rules: IgnoreRules) -> Optional[IndexedDirectory]:
+        """
+        Прочитать директорию через общий обход дерева (walker.read_directory)
+        :param rules: правила .gitignore родительских директорий
+        """
+        from devnetgen.walker import read_directory
+
+        try:
+            items, _, ignore_mtime = read_directory(directory, rules)
+            entry = IndexedDirectory(mtime, ignore_mtime=ignore_mtime)
+            for item in items:
+                if item.is_dir(follow_symlinks=False):
+                    entry.subdirectories.append(item.name)
+                elif item.name.endswith('.cs') and item.is_file():
+                    entry.classes.add(item.name.removesuffix('.cs'))
+        except OSError:
+            return None
+        return entry
+
+    def _build_lookups(self):
+        """ Построить словари поиска по классам и именам директорий (в прямом порядке обхода, как glob('**/...')) """
+        self.directories = {}
+        self.class_directories = {}
+        self.directory_names = {}
+        for directory, entry in self.entries.items():
+            self.directories[directory] = entry.classes
+            for class_name in entry.classes:
+                self.class_directories.setdefault(class_name, []).append(directory)
+            for name in entry.subdirectories:
+                self.directory_names.setdefault(name, []).append(directory / name)
+
+    def _refresh_meta(self):
+        """ Вычислить мета-информацию о проекте. Application.csproj читается только при его изменении """
+        application_path = self.root / 'Application'
+        self.meta.webapi = (self.root / 'WebApi') in self.entries
+        self.meta.sieve = 'SieveService' in self.get_classes(application_path / 'Common' / 'Services')
+
+        csproj_path = application_path / 'Application.csproj'
+        csproj_mtime = get_mtime(csproj_path)
+        if csproj_mtime is None:
+            self.meta.mediator = None
+        elif csproj_mtime != self.csproj_mtime or self.meta.mediator is None:
+            with open(csproj_path, "r", encoding='utf-8') as file:
+                text = file.read()
+                self.meta.mediator = 'MediatR' not in text
+        if csproj_mtime != self.csproj_mtime:
+            self.csproj_mtime = csproj_mtime
+            self.changed = True
+
+    def get_classes(self, directory: Path) -> set[str]:
+        """
+        :return: имена классов директории. Директории вне индексируемого дерева читаются с диска,
+         несуществующие директории не содержат классов
+        """
+        if (classes := self.directories.get(directory)) is not None:
+            return set(classes)
+        if not directory.is_relative_to(self.root) and directory.is_dir():
+            return list_classes(directory)
+        return set()
+
+    def get_namespace_name(self, directory: Path) -> str:
+        """ :return: пространство имён, соответствующее директории дерева """
+        return '.'.join((self.solution_name, *directory.relative_to(self.root).parts))
+
+    def find_class(self, class_name: str) -> list[Path]:
+        """ :return: директории, в которых объявлен класс с данным именем """
+        return list(self.class_directories.get(class_name, ()))
+
+    def find_directories(self, name: str, under: Optional[Path] = None) -> list[Path]:
+        """
+        Аналог glob('**/{name}') по индексу
+        :param name: имя директории
+        :param under: ограничить поиск поддеревом
+        """
+        directories = self.directory_names.get(name, ())
+        if under is None:
+            return list(directories)
+        return [directory for directory in directories if directory.is_relative_to(under)]
+
+    def walk(self, under: Path) -> Iterator[Path]:
+        """ :return: директория и все её поддиректории из индекса """
+        for directory in self.directories:
+            if directory.is_relative_to(under):
+                yield directory
+
+    @timings.timed('index')
+    def save(self):
+        """ Сохранить индекс в {root}/.devnetgen/index. Ошибки записи игнорируются - кэш необязателен """
+        data = {
+            'version': cache_version,
+            'solution_name': self.solution_name,
+            'csproj_mtime': self.csproj_mtime,
+            'meta': asdict(self.meta),
+            'ignore_files': self.ignore_files,
+            'directories': {
+                directory.relative_to(self.root).as_posix(): {
+                    'mtime': entry.mtime,
+                    'classes': sorted(entry.classes),
+                    'subdirectories': entry.subdirectories,
+                    'ignore_mtime': entry.ignore_mtime,
+                }
+                for directory, entry in self.entries.items()
+            },
+        }
+        temp_path = self.cache_path.with_name(f'index.{os.getpid()}.tmp')
+        try:
+            prepare_cache_directory(self.root)
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(data, file, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_path, self.cache_path)
+        except OSError:
+            temp_path.unlink(missing_ok=True)
+            return
+        self.changed = False
+
+    @classmethod
+    def load(cls, root: Path, solution_name: str) -> SolutionIndex:
+        """
+        Прочитать сохранённый индекс и обновить его инкрементально. При отсутствии или несовместимости
+        сохранённого индекса дерево сканируется полностью
+        """
+        from devnetgen.executors import SolutionMeta
+
+        root = Path(root)
+        with timings.phase('index'):
+            try:
+                with open(root / cache_directory_name / 'index', 'r', encoding='utf-8') as file:
+                    data = json.load(file)
+            except (OSError, ValueError):
+                data = None
+            if not data or data.get('version') != cache_version or data.get('solution_name') != solution_name:
+                data = None
+            else:
+                entries = {
+                    root / relative_path: IndexedDirectory(entry['mtime'], set(entry['classes']),
+                                                           entry['subdirectories'], entry['ignore_mtime'])
+                    for relative_path, entry in data['directories'].items()
+                }
+        if data is None:
+            return cls(root, solution_name)
+        return cls(root, solution_name, entries, SolutionMeta(**data['meta']), data['csproj_mtime'],
+                   data['ignore_files'])
+
+
+indexes: dict[tuple[str, str], SolutionIndex] = {}
+# Сохранять изменившиеся индексы на диск по умолчанию (отключается на время --dry-run команд, см. persistence)
+persist_indexes = True
+
+
+@contextmanager
+def persistence(enabled: bool) -> Iterator[None]:
+    """
+    Сохранять ли изменившиеся индексы на диск на время выполнения команды. С --dry-run команда не создаёт
+    .devnetgen в решении: индекс остаётся в памяти процесса (изменённым) и сохраняется следующей командой
+    """
+    global persist_indexes
+    previous, persist_indexes = persist_indexes, enabled
+    try:
+        yield
+    finally:
+        persist_indexes = previous
+
+
+@timings.timed('indexing')
+def load_index(root: Path, solution_name: str, persist: Optional[bool] = None) -> SolutionIndex:
+    """
+    Получить актуальный индекс решения: из памяти процесса (демон) или с диска, обновив его инкрементально.
+    Изменившийся индекс сохраняется на диск
+    :param root: корневая директория исходников решения
+    :param solution_name: наименование решения
+    :param persist: сохранить изменившийся индекс на диск (по умолчанию - persist_indexes)
+    """
+    key = (str(Path(root)), solution_name)
+    if index := indexes.get(key):
+        index.refresh()
+    else:
+        index = indexes[key] = SolutionIndex.load(root, solution_name)
+    if index.changed and (persist_indexes if persist is None else persist):
+        index.save()
+    return index
@@ -1,32 +1,115 @@
+from typing import Optional
+
 import typer
 
-from devnetgen.entities import Entity, VmDto
-from devnetgen.executors import CrudExecutor, SummariesExecutor, TestsExecutor
+from devnetgen import commands
+from devnetgen.client import read_overlays, write_overlays
+from devnetgen.commands import UsageError
 
 app = typer.Typer()
 
+dry_run_option = typer.Option(False, '--dry-run', help='Вывести запланированные файлы, не изменяя их на диске')
+diff_option = typer.Option(False, '--diff', help='Вместе с --dry-run: вывести изменения в формате unified diff')
+paths_argument = typer.Argument(..., help='Пути или glob-шаблоны путей до файлов сущностей (пр. "Domain/Entities/**/*.cs")')
+jobs_option = typer.Option(None, '--jobs', '-j', help='Число процессов для генерации нескольких сущностей')
+no_git_option = typer.Option(False, '--no-git', help='Не добавлять сгенерированные файлы в git')
+update_option = typer.Option(False, '--update', help='Перегенерировать существующие файлы, входные данные которых '
+                                                      'изменились, если они не изменены после генерации')
+timings_option = typer.Option(False, '--timings', help='Вывести в stderr время фаз выполнения и счётчики операций')
+timings_json_option = typer.Option(False, '--timings-json', help='Вывести замеры --timings в формате JSON')
+stdin_option = typer.Option(False, '--stdin', help='Читать содержимое файла (единственного пути) из stdin '
+                                                   'вместо файла на диске')
+overlays_option = typer.Option(None, '--overlays', help='Файл JSON {путь: содержимое} с несохранёнными буферами '
+                                                        'редактора, читаемыми вместо файлов на диске (- - stdin)')
+overlays_out_option = typer.Option(None, '--overlays-out', help='Записать новое содержимое изменённых буферов '
+                                                                '(--stdin, --overlays) в файл JSON')
+
+
+def _run(command, timings: bool = False, timings_json: bool = False, stdin_path: Optional[str] = None,
+         overlays: Optional[str] = None, overlays_out: Optional[str] = None, **arguments):
+    """ :param stdin_path: путь файла, содержимое которого передано в stdin (--stdin) """
+    try:
+        files = read_overlays(overlays, stdin_path)
+    except ValueError as error:
+        raise typer.BadParameter(str(error))
+    try:
+        results = command(**arguments, overlays=files,
+                          timings='json' if timings_json else 'text' if timings else None)
+    except UsageError as error:
+        raise typer.BadParameter(str(error))
+    if overlays_out:
+        write_overlays(overlays_out, results)
+
+
+def _stdin_path(stdin: bool, paths: list[Optional[str]]) -> Optional[str]:
+    if not stdin:
+        return None
+    if len(paths) != 1 or paths[0] is None:
+        raise typer.BadParameter('--stdin: нужен ровно один путь файла, содержимое которого передано в stdin')
+    return paths[0]
+
 
 @app.command(name='crud')
-def create_crud(path: str, legacy_controller: bool = False):
-    entity = Entity(path)
-    executor = CrudExecutor(entity)
-    executor.create_crud(legacy_controller=legacy_controller)
+def create_crud(paths: list[str] = paths_argument, legacy_controller: bool = False, jobs: int = jobs_option,
+                dry_run: bool = dry_run_option, diff: bool = diff_option, no_git: bool = no_git_option,
+                update: bool = update_option, timings: bool = timings_option,
+                timings_json: bool = timings_json_option, stdin: bool = stdin_option,
+                overlays: str = overlays_option, overlays_out: str = overlays_out_option):
+    _run(commands.create_crud, paths=paths, legacy_controller=legacy_controller, jobs=jobs, dry_run=dry_run,
+         diff=diff, no_git=no_git, update=update, timings=timings, timings_json=timings_json,
+         stdin_path=_stdin_path(stdin, paths), overlays=overlays, overlays_out=overlays_out)
 
 
 @app.command(name='tests')
-def create_tests(path: str):
-    entity = Entity(path)
-    executor = TestsExecutor(entity)
-    executor.create_tests()
+def create_tests(paths: list[str] = paths_argument, jobs: int = jobs_option, dry_run: bool = dry_run_option,
+                 diff: bool = diff_option, no_git: bool = no_git_option, update: bool = update_option,
+                 timings: bool = timings_option, timings_json: bool = timings_json_option,
+                 stdin: bool = stdin_option, overlays: str = overlays_option,
+                 overlays_out: str = overlays_out_option):
+    _run(commands.create_tests, paths=paths, jobs=jobs, dry_run=dry_run, diff=diff, no_git=no_git, update=update,
+         timings=timings, timings_json=timings_json, stdin_path=_stdin_path(stdin, paths), overlays=overlays,
+         overlays_out=overlays_out)
 
 
 @app.command(name='summary')
-def add_summaries(path: str):
-    if path.endswith('Vm.cs') or path.endswith('Dto.cs'):
-        entity = VmDto(path)
-        entity.add_properties_summaries()
-        entity.add_class_summary()
-    else:
-        entity = Entity(path)
-        executor = SummariesExecutor(entity)
-        executor.add_summaries()
+def add_summaries(path: Optional[str] = typer.Argument(None),
+                  all_files: bool = typer.Option(False, '--all', help='Обновить summaries во всех Vm/Dto решения, '
+                                                                      'содержащего путь (по умолчанию - текущую директорию)'),
+                  jobs: int = jobs_option, dry_run: bool = dry_run_option, diff: bool = diff_option,
+                  timings: bool = timings_option, timings_json: bool = timings_json_option,
+                  stdin: bool = stdin_option, overlays: str = overlays_option,
+                  overlays_out: str = overlays_out_option):
+    _run(commands.add_summaries, path=path, all_files=all_files, jobs=jobs, dry_run=dry_run, diff=diff,
+         timings=timings, timings_json=timings_json, stdin_path=_stdin_path(stdin, [path]), overlays=overlays,
+         overlays_out=overlays_out)
+
+
+@app.command(name='all')
+def create_all(paths: list[str] = paths_argument, legacy_controller: bool = False, jobs: int = jobs_option,
+               dry_run: bool = dry_run_option, diff: bool = diff_option, no_git: bool = no_git_option,
+               update: bool = update_option, timings: bool = timings_option,
+               timings_json: bool = timings_json_option, stdin: bool = stdin_option,
+               overlays: str = overlays_option, overlays_out: str = overlays_out_option):
+    """ Сгенерировать CRUD, тесты и summaries Vm/Dto за один запуск """
+    _run(commands.create_all, paths=paths, legacy_controller=legacy_controller, jobs=jobs, dry_run=dry_run,
+         diff=diff, no_git=no_git, update=update, timings=timings, timings_json=timings_json,
+         stdin_path=_stdin_path(stdin, paths), overlays=overlays, overlays_out=overlays_out)
+
+
+@app.command(name='watch')
+def watch(path: Optional[str] = typer.Argument(None, help='Путь внутри решения (по умолчанию - текущая директория)'),
+          polling: bool = typer.Option(False, '--poll', help='Отслеживать изменения опросом вместо inotify'),
+          interval: float = typer.Option(0.5, '--interval', help='Интервал опроса, с'),
+          dry_run: bool = dry_run_option, diff: bool = diff_option):
+    """ Обновлять summaries Vm/Dto при изменении сущностей Domain """
+    try:
+        commands.watch(path, polling, interval, dry_run, diff)
+    except UsageError as error:
+        raise typer.BadParameter(str(error))
+
+
+@app.command(name='serve')
+def serve(socket: str = typer.Option(None, help='Путь до unix-сокета демона')):
+    """ Запустить демон, хранящий модель решения между запросами IDE """
+    from devnetgen.server import run_server
+    run_server(socket)
@@ -0,0 +1,151 @@
+"""
+Манифест генерации: для каждого сгенерированного файла - хэш входных данных (модели сущности и шаблонов),
+по которым он отрендерен, и хэш записанного содержимого. По манифесту `crud --update` и `tests --update`
+перерендеривают только файлы с изменившимися входными данными и перезаписывают только файлы,
+не изменённые пользователем после генерации
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Union
+
+from devnetgen.index import cache_directory_name, prepare_cache_directory
+
+if TYPE_CHECKING:
+    from devnetgen.entities import Entity
+    from devnetgen.index import SolutionIndex
+
+# Версия манифеста входит в хэши входных данных: увеличивается при изменениях генератора, меняющих результат рендеринга
+manifest_version = 1
+manifest_name = 'manifest'
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class ManifestEntry:
+    """
+    Сгенерированный файл
+
+    Attributes:
+        inputs: хэш входных данных рендеринга (RenderTask.inputs_hash)
+        content: хэш записанного содержимого (с переводами строк '\\n')
+    """
+    inputs: str
+    content: str
+
+
+class GenerationManifest:
+    """
+    Манифест генерации решения, хранится в {root}/.devnetgen/manifest
+
+    Attributes:
+        root: директория исходников решения
+        files: сгенерированные файлы по путям относительно root
+        property_flags: флаги свойств ('!', '@') сущностей по путям относительно root на момент генерации
+         (флаги удаляются из summaries сущности после генерации, а --update рендерит файлы с ними)
+        updates: изменения относительно прочитанного манифеста (передаются из процессов пула в основной процесс)
+    """
+    root: Path
+    files: dict[str, ManifestEntry]
+    property_flags: dict[str, dict[str, str]]
+    updates: dict
+
+    def __init__(self, root: Path, files: dict[str, ManifestEntry] = None,
+                 property_flags: dict[str, dict[str, str]] = None):
+        self.root = Path(root).absolute()
+        self.files = files or {}
+        self.property_flags = property_flags or {}
+        self.updates = {'files': {}, 'property_flags': {}}
+
+    @classmethod
+    def for_entity(cls, path: Union[str, Path]) -> GenerationManifest:
+        """ :return: манифест решения, содержащего сущность (директория исходников - родитель Domain) """
+        from devnetgen.entities import find_sources_path
+        return cls.load(find_sources_path(Path(path).absolute(), 'Domain'))
+
+    @property
+    def path(self) -> Path:
+        return self.root / cache_directory_name / manifest_name
+
+    def _key(self, path: Path) -> str:
+        """ :return: путь относительно root (тесты генерируются вне директории исходников - через '..') """
+        return Path(os.path.relpath(Path(path).absolute(), self.root)).as_posix()
+
+    def get(self, path: Path) -> Optional[ManifestEntry]:
+        return self.files.get(self._key(path))
+
+    def record(self, path: Path, inputs: str, content: str):
+        """ Записать в манифест сгенерированный файл и его содержимое """
+        entry = ManifestEntry(inputs, hash_text(content))
+        self.files[self._key(path)] = entry
+        self.updates['files'][self._key(path)] = entry
+
+    def record_property_flags(self, entity: Entity):
+        """ Добавить действующие флаги свойств сущности к сохранённым (флаги удаляются из файла после генерации) """
+        key = self._key(entity.file_path)
+        flags = {**self.property_flags.get(key, {}), **entity.property_flags}
+        if flags != self.property_flags.get(key, {}):
+            self.property_flags[key] = self.updates['property_flags'][key] = flags
+
+    def parse_entity(self, path: Union[str, Path], index: SolutionIndex = None) -> Entity:
+        """ Разобрать сущность с флагами свойств, сохранёнными при предыдущих генерациях (для --update) """
+        from devnetgen.entities import Entity, EntityRegistry
+
+        registry = EntityRegistry(property_flags={(self.root / key).resolve(): flags
+                                                  for key, flags in self.property_flags.items()})
+        return Entity(path, index=index, registry=registry)
+
+    def merge(self, updates: dict):
+        """ Добавить изменения манифеста, сделанные в процессе пула """
+        self.files.update(updates['files'])
+        self.property_flags.update(updates['property_flags'])
+        self.updates['files'].update(updates['files'])
+        self.updates['property_flags'].update(updates['property_flags'])
+
+    def save(self):
+        """
+        Сохранить манифест. Перед записью манифест перечитывается и изменения этого запуска применяются поверх,
+        чтобы не потерять записи параллельных запусков для других сущностей
+        """
+        if not self.updates['files'] and not self.updates['property_flags']:
+            return
+        current = GenerationManifest.load(self.root)
+        current.merge(self.updates)
+        data = {
+            'version': manifest_version,
+            'files': {key: [entry.inputs, entry.content] for key, entry in sorted(current.files.items())},
+            'property_flags': dict(sorted(current.property_flags.items())),
+        }
+        temp_path = self.path.with_name(f'{manifest_name}.{os.getpid()}.tmp')
+        try:
+            prepare_cache_directory(self.root)
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(data, file, ensure_ascii=False, indent=1)
+            os.replace(temp_path, self.path)
+        except OSError as error:
+            temp_path.unlink(missing_ok=True)
+            print(f'Не удалось сохранить манифест генерации {self.path}: {error}', file=sys.stderr)
+            return
+        self.updates = {'files': {}, 'property_flags': {}}
+
+    @classmethod
+    def load(cls, root: Path) -> GenerationManifest:
+        """ Прочитать манифест. Отсутствующий или несовместимый манифест читается как пустой """
+        manifest = cls(root)
+        try:
+            with open(manifest.path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return manifest
+        if data.get('version') != manifest_version:
+            return manifest
+        manifest.files = {key: ManifestEntry(*entry) for key, entry in data['files'].items()}
+        manifest.property_flags = data['property_flags']
+        return manifest
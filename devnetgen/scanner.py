@@ -0,0 +1,435 @@
+from __future__ import annotations
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+class_modifiers = {'public', 'internal', 'private', 'protected', 'partial', 'sealed', 'abstract', 'static', 'file',
+                   'new'}
+property_modifiers = {'public', 'virtual', 'override', 'required', 'new', 'sealed'}
+# Символы, с которых начинаются скобки, литералы и комментарии (остальной текст строки пропускается целиком)
+special_chars = re.compile(r'[{}"\'/@$]')
+
+
+@dataclass
+class PropertyDeclaration:
+    """
+    Объявление автосвойства класса (пр. "public List<Order> Orders { get; set; }")
+
+    Attributes:
+        name: имя свойства
+        type: тип свойства, как он объявлен в классе (пр. "Dictionary<string, int>?")
+        summary: текст между <summary> и </summary> без крайних пробелов (пр. "/// Номер заказа") или None
+        attributes: атрибуты свойства (пр. ["[Required]"])
+        start_line: номер первой строки объявления, включая документирующий комментарий и атрибуты
+        attributes_line: номер первой строки атрибутов или None
+        line: номер строки с объявлением свойства
+    """
+    name: str
+    type: str
+    summary: Optional[str]
+    attributes: list[str]
+    start_line: int
+    attributes_line: Optional[int]
+    line: int
+
+
+@dataclass
+class ClassDeclaration:
+    """
+    Объявление класса
+
+    Attributes:
+        name: имя класса без параметров типа
+        summary: текст между <summary> и </summary> без крайних пробелов или None
+        attributes: атрибуты класса
+        attributes_line: номер первой строки атрибутов или None
+        line: номер строки с объявлением класса
+        properties: объявленные в теле класса автосвойства
+    """
+    name: str
+    summary: Optional[str]
+    attributes: list[str]
+    attributes_line: Optional[int]
+    line: int
+    properties: list[PropertyDeclaration] = field(default_factory=list)
+    _body_depth: Optional[int] = field(default=None, repr=False)
+
+
+@dataclass
+class SourceFile:
+    """
+    Объявления c#-файла, извлечённые за один проход
+
+    Attributes:
+        lines: строки файла (с символами перевода строки)
+        namespace: пространство имён файла или None
+        file_scoped_namespace: пространство имён объявлено для файла ("namespace X;")
+        usings: пространства имён директив using
+        classes: объявленные классы (включая вложенные) в порядке объявления
+    """
+    lines: list[str]
+    namespace: Optional[str] = None
+    file_scoped_namespace: bool = False
+    usings: list[str] = field(default_factory=list)
+    classes: list[ClassDeclaration] = field(default_factory=list)
+
+    @property
+    def tabs(self) -> int:
+        """ Отступ перед объявлениями членов класса """
+        return 4 if self.file_scoped_namespace else 8
+
+    def find_class(self, name: str) -> Optional[ClassDeclaration]:
+        """ :return: класс с данным именем или первый объявленный класс файла """
+        for declaration in self.classes:
+            if declaration.name == name:
+                return declaration
+        return self.classes[0] if self.classes else None
+
+
+def split_lines(text: str) -> list[str]:
+    """ Разбить текст на строки с символами перевода строки (только по '\\n', как file.readlines()) """
+    lines = text.split('\n')
+    last = lines.pop()
+    lines = [line + '\n' for line in lines]
+    if last:
+        lines.append(last)
+    return lines
+
+
+def scan(text: str) -> SourceFile:
+    """
+    Разобрать c#-файл: пространство имён, директивы using, классы, их документирующие комментарии,
+    атрибуты и автосвойства. Каждый символ файла просматривается константное число раз
+    :param text: содержимое файла
+    """
+    return _Scanner(text).scan()
+
+
+def _summary(doc_lines: list[str]) -> Optional[str]:
+    """ :return: текст между <summary> и </summary> документирующего комментария без крайних пробелов """
+    doc = ''.join(doc_lines)
+    start = doc.find('<summary>')
+    if start == -1:
+        return None
+    end = doc.find('</summary>', start)
+    if end == -1:
+        return None
+    return doc[start + len('<summary>'):end].rstrip().removesuffix('///').strip()
+
+
+def _skip_literal(text: str, i: int) -> int:
+    """ :return: позиция после строкового или символьного литерала, начинающегося в позиции i """
+    quote = text[i]
+    i += 1
+    while i < len(text):
+        if text[i] == '\\':
+            i += 2
+            continue
+        if text[i] == quote:
+            return i + 1
+        i += 1
+    return i
+
+
+def _skip_balanced(text: str, i: int, opening: str, closing: str) -> int:
+    """ :return: позиция после скобки, закрывающей открытую в позиции i (вне литералов), или -1 """
+    depth = 0
+    while i < len(text):
+        char = text[i]
+        if char in '"\'':
+            i = _skip_literal(text, i)
+            continue
+        if char == opening:
+            depth += 1
+        elif char == closing:
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return -1
+
+
+def _skip_spaces(text: str, i: int) -> int:
+    while i < len(text) and text[i].isspace():
+        i += 1
+    return i
+
+
+def _read_identifier(text: str, i: int) -> tuple[str, int]:
+    start = i
+    while i < len(text) and (text[i].isalnum() or text[i] in '_@'):
+        i += 1
+    return text[start:i], i
+
+
+def _read_type(text: str, i: int) -> tuple[str, int]:
+    """ Прочитать тип (пр. "Dictionary<string, List<int>>?", "int[]", "(int, string)") с позиции i """
+    start = i
+    if i < len(text) and text[i] == '(':
+        i = _skip_balanced(text, i, '(', ')')
+        if i == -1:
+            return '', start
+    else:
+        while i < len(text) and (text[i].isalnum() or text[i] in '_.@:'):
+            i += 1
+        if i == start:
+            return '', start
+        if i < len(text) and text[i] == '<':
+            i = _skip_balanced(text, i, '<', '>')
+            if i == -1:
+                return '', start
+    while i < len(text):
+        if text[i] == '?':
+            i += 1
+        elif text[i] == '[':
+            end = _skip_balanced(text, i, '[', ']')
+            if end == -1 or text[i + 1:end - 1].strip(' ,'):
+                break
+            i = end
+        else:
+            break
+    return text[start:i], i
+
+
+def _parse_property(code: str) -> Optional[tuple[str, str]]:
+    """
+    Разобрать объявление автосвойства с get-аксессором
+    :return: тип и имя свойства или None, если строка не является объявлением автосвойства
+    """
+    i = 0
+    words = 0
+    while True:
+        word, end = _read_identifier(code, i)
+        if word not in property_modifiers or end >= len(code) or not code[end].isspace():
+            break
+        if word == 'public':
+            words += 1
+        i = _skip_spaces(code, end)
+    if not words:
+        return None
+
+    prop_type, i = _read_type(code, i)
+    if not prop_type:
+        return None
+    i = _skip_spaces(code, i)
+    name, i = _read_identifier(code, i)
+    if not name:
+        return None
+    i = _skip_spaces(code, i)
+    if i >= len(code) or code[i] != '{':
+        return None
+    accessor, i = _read_identifier(code, _skip_spaces(code, i + 1))
+    i = _skip_spaces(code, i)
+    if accessor != 'get' or i >= len(code) or code[i] != ';':
+        return None
+    return prop_type, name
+
+
+def _parse_class(code: str) -> Optional[str]:
+    """ :return: имя объявляемого в строке класса или None """
+    i = 0
+    while True:
+        word, end = _read_identifier(code, i)
+        if not word:
+            return None
+        if word == 'class':
+            name, _ = _read_identifier(code, _skip_spaces(code, end))
+            return name or None
+        if word not in class_modifiers:
+            return None
+        i = _skip_spaces(code, end)
+
+
+class _Scanner:
+    """ Построчный разбор c#-файла с учётом вложенности скобок, строковых литералов и комментариев """
+
+    def __init__(self, text: str):
+        self.source = SourceFile(split_lines(text))
+        self.depth = 0
+        self.class_stack: list[ClassDeclaration] = []
+        self.pending_class: Optional[ClassDeclaration] = None
+        self.in_block_comment = False
+        self.in_verbatim_string = False
+        self._reset_pending()
+
+    def _reset_pending(self):
+        self.doc_lines: list[str] = []
+        self.doc_line: Optional[int] = None
+        self.attributes: list[str] = []
+        self.attributes_line: Optional[int] = None
+        # Строки незакрытого атрибута, глубина квадратных скобок и кавычка незакрытого литерала в нём
+        self.open_attribute: list[str] = []
+        self.attribute_depth = 0
+        self.attribute_quote: Optional[str] = None
+
+    def scan(self) -> SourceFile:
+        for number, line in enumerate(self.source.lines):
+            starts_in_code = not (self.in_block_comment or self.in_verbatim_string)
+            depth = self.depth
+            code = self._track_braces(line)
+            if starts_in_code:
+                self._process_line(number, line, code.strip(), depth)
+        return self.source
+
+    def _process_line(self, number: int, line: str, code: str, depth: int):
+        stripped = line.strip()
+        if stripped.startswith('///'):
+            if self.doc_line is None:
+                self.doc_line = number
+            self.doc_lines.append(line)
+            return
+        if not code:
+            return
+
+        if self.open_attribute or code.startswith('['):
+            code = self._read_attributes(code, number)
+            if not code:
+                return
+
+        code = code.removeprefix('global ')
+        if code.startswith('using ') and code.endswith(';') and '=' not in code:
+            self.source.usings.append(code.removeprefix('using ').removesuffix(';').strip())
+        elif code.startswith('namespace ') and self.source.namespace is None:
+            namespace = code.removeprefix('namespace ')
+            self.source.file_scoped_namespace = namespace.rstrip().endswith(';')
+            self.source.namespace = namespace.split(';')[0].split('{')[0].strip()
+        elif class_name := _parse_class(code):
+            declaration = ClassDeclaration(class_name, _summary(self.doc_lines), self.attributes,
+                                           self.attributes_line, number)
+            self.source.classes.append(declaration)
+            self.pending_class = declaration
+            if '{' in code:
+                if self.depth > depth:
+                    self._open_pending_class(depth + 1)
+                else:
+                    self.pending_class = None
+        elif self.class_stack and depth == self.class_stack[-1]._body_depth:
+            if parsed := _parse_property(code):
+                start_line = min(line for line in (self.doc_line, self.attributes_line, number) if line is not None)
+                self.class_stack[-1].properties.append(PropertyDeclaration(
+                    name=parsed[1], type=parsed[0], summary=_summary(self.doc_lines), attributes=self.attributes,
+                    start_line=start_line, attributes_line=self.attributes_line, line=number))
+        self._reset_pending()
+
+    def _read_attributes(self, code: str, number: int) -> str:
+        """
+        Накопить атрибуты (в т.ч. многострочные) в начале строки. Разбор незакрытого атрибута продолжается
+        с начала следующей строки: уже просмотренные строки повторно не сканируются
+        :return: оставшийся после атрибутов код строки
+        """
+        if self.attributes_line is None:
+            self.attributes_line = number
+        if self.open_attribute:
+            end = self._scan_attribute(code)
+            if end == -1:
+                self.open_attribute.append(code)
+                return ''
+            self.attributes.append('\n'.join([*self.open_attribute, code[:end]]))
+            self.open_attribute = []
+            code = code[end:].lstrip()
+        while code.startswith('['):
+            self.attribute_depth, self.attribute_quote = 0, None
+            end = self._scan_attribute(code)
+            if end == -1:
+                self.open_attribute = [code]
+                return ''
+            self.attributes.append(code[:end])
+            code = code[end:].lstrip()
+        return code
+
+    def _scan_attribute(self, code: str) -> int:
+        """
+        Продолжить разбор атрибута с начала code: глубина скобок и незакрытый литерал сохраняются между строками
+        :return: позиция после ']', закрывающей атрибут, или -1, если атрибут продолжается на следующей строке
+        """
+        i = 0
+        while i < len(code):
+            char = code[i]
+            if self.attribute_quote:
+                if char == '\\':
+                    i += 2
+                    continue
+                if char == self.attribute_quote:
+                    self.attribute_quote = None
+            elif char in '"\'':
+                self.attribute_quote = char
+            elif char == '[':
+                self.attribute_depth += 1
+            elif char == ']':
+                self.attribute_depth -= 1
+                if self.attribute_depth == 0:
+                    return i + 1
+            i += 1
+        return -1
+
+    def _open_pending_class(self, body_depth: int):
+        self.pending_class._body_depth = body_depth
+        self.class_stack.append(self.pending_class)
+        self.pending_class = None
+
+    def _track_braces(self, line: str) -> str:
+        """
+        Учесть фигурные скобки строки вне литералов и комментариев
+        :return: код строки без комментариев
+        """
+        code = []
+        i = 0
+        length = len(line)
+        while i < length:
+            if self.in_block_comment:
+                end = line.find('*/', i)
+                if end == -1:
+                    return ''.join(code)
+                self.in_block_comment = False
+                i = end + 2
+                continue
+            if self.in_verbatim_string:
+                end = line.find('"', i)
+                if end == -1:
+                    code.append(line[i:])
+                    return ''.join(code)
+                if line.startswith('""', end):
+                    code.append(line[i:end + 2])
+                    i = end + 2
+                    continue
+                self.in_verbatim_string = False
+                code.append(line[i:end + 1])
+                i = end + 1
+                continue
+
+            match = special_chars.search(line, i)
+            if match is None:
+                code.append(line[i:])
+                break
+            code.append(line[i:match.start()])
+            i = match.start()
+            char = line[i]
+            if char == '/' and line.startswith('//', i):
+                break
+            if char == '/' and line.startswith('/*', i):
+                self.in_block_comment = True
+                i += 2
+                continue
+            if char in '@$' and line.startswith(('@"', '$@"', '@$"'), i):
+                self.in_verbatim_string = True
+                prefix = 2 if line[i + 1] == '"' else 3
+                code.append(line[i:i + prefix])
+                i += prefix
+                continue
+            if char in '"\'':
+                end = _skip_literal(line, i)
+                code.append(line[i:end])
+                i = end
+                continue
+
+            if char == '{':
+                self.depth += 1
+                if self.pending_class is not None:
+                    self._open_pending_class(self.depth)
+            elif char == '}':
+                if self.class_stack and self.depth == self.class_stack[-1]._body_depth:
+                    self.class_stack.pop()
+                self.depth -= 1
+            code.append(char)
+            i += 1
+        return ''.join(code)
@@ -0,0 +1,89 @@
+"""
+Демон dev-netgen: держит разобранные сущности, мета-информацию решений, листинги пространств имён
+и скомпилированные шаблоны в памяти между запросами IDE.
+
+Протокол: клиент подключается к unix-сокету, отправляет одну строку JSON
+    {"command": "crud" | "tests" | "summary" | "all" | "ping" | "shutdown", "arguments": {...}}
+и получает одну строку JSON
+    {"ok": bool, "output": str, "stderr": str, "error": str | null, "overlays": {путь: содержимое}}
+где overlays - новое содержимое изменённых командой буферов редактора (аргумент overlays запроса)
+"""
+from __future__ import annotations
+import io
+import json
+import os
+import socketserver
+import threading
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Any, Optional
+
+from devnetgen.client import get_socket_path, is_running
+from devnetgen.commands import commands
+
+
+def handle_request(request: dict[str, Any]) -> dict[str, Any]:
+    """
+    Выполнить команду запроса, перехватив её вывод в stdout и stderr
+    :param request: словарь с ключами command и arguments
+    :return: словарь ответа
+    """
+    command = request.get('command')
+    if command == 'ping':
+        return {'ok': True, 'output': '', 'error': None}
+    if command not in commands:
+        return {'ok': False, 'output': '', 'error': f'Неизвестная команда: {command}'}
+
+    output = io.StringIO()
+    stderr = io.StringIO()
+    try:
+        with redirect_stdout(output), redirect_stderr(stderr):
+            results = commands[command](**request.get('arguments', {}))
+    except Exception:
+        return {'ok': False, 'output': output.getvalue(), 'stderr': stderr.getvalue(), 'error': traceback.format_exc()}
+    return {'ok': True, 'output': output.getvalue(), 'stderr': stderr.getvalue(), 'error': None, 'overlays': results}
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        try:
+            request = json.loads(line)
+        except ValueError:
+            response = {'ok': False, 'output': '', 'error': 'Некорректный JSON запроса'}
+        else:
+            if request.get('command') == 'shutdown':
+                response = {'ok': True, 'output': '', 'error': None}
+                threading.Thread(target=self.server.shutdown).start()
+            else:
+                response = handle_request(request)
+        self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+
+
+class Server(socketserver.UnixStreamServer):
+    """
+    Запросы обрабатываются последовательно: вывод команды перехватывается подменой sys.stdout и sys.stderr,
+    общих для всех потоков процесса
+    """
+
+
+def run_server(socket_path: Optional[str] = None):
+    """
+    Запустить демон на unix-сокете. Оставшийся от прошлого запуска файл сокета удаляется
+    :param socket_path: путь до сокета
+    """
+    path = get_socket_path(socket_path)
+    if is_running(path):
+        print(f'dev-netgen уже запущен на {path}')
+        return
+    path.unlink(missing_ok=True)
+
+    with Server(str(path), RequestHandler) as server:
+        os.chmod(path, 0o600)
+        print(f'dev-netgen слушает {path}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            path.unlink(missing_ok=True)
@@ -0,0 +1,215 @@
+from __future__ import annotations
+import codecs
+import os
+import shutil
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+from devnetgen.timings import timings
+
+boms = (
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
+
+
+@dataclass(frozen=True)
+class TextFormat:
+    """
+    Формат текстового файла на диске. Текст в памяти хранится без BOM и с переводами строк '\\n'
+
+    Attributes:
+        encoding: кодировка
+        bom: маркер порядка байтов в начале файла
+        newline: перевод строки
+    """
+    encoding: str = 'utf-8'
+    bom: bytes = b''
+    newline: str = '\n'
+
+    @classmethod
+    def detect(cls, data: bytes) -> TextFormat:
+        """ Определить кодировку, BOM и преобладающий перевод строки по содержимому файла """
+        encoding, bom = 'utf-8', b''
+        for candidate_bom, candidate_encoding in boms:
+            if data.startswith(candidate_bom):
+                encoding, bom = candidate_encoding, candidate_bom
+                break
+        text = data[len(bom):].decode(encoding)
+        newline = '\r\n' if text.count('\r\n') * 2 > text.count('\n') else '\n'
+        return cls(encoding, bom, newline)
+
+    def decode(self, data: bytes) -> str:
+        return data[len(self.bom):].decode(self.encoding).replace('\r\n', '\n')
+
+    def encode(self, text: str) -> bytes:
+        if self.newline != '\n':
+            text = text.replace('\n', self.newline)
+        return self.bom + text.encode(self.encoding)
+
+
+# Содержимое несохранённых буферов редактора по абсолютным путям: читается вместо файлов на диске,
+# а изменения этих файлов не записываются на диск, а накапливаются в overlay_results
+overlays: dict[Path, str] = {}
+overlay_results: dict[Path, str] = {}
+
+
+@contextmanager
+def use_overlays(files: dict[str, str]) -> Iterator[dict[Path, str]]:
+    """
+    Читать файлы из буферов редактора вместо диска на время выполнения команды
+    :param files: содержимое буферов по путям файлов
+    :return: новое содержимое буферов, изменённых командой (заполняется к выходу из контекста)
+    """
+    overlays.clear()
+    overlay_results.clear()
+    overlays.update({Path(path).absolute(): text.removeprefix('\ufeff').replace('\r\n', '\n')
+                     for path, text in files.items()})
+    results = {}
+    try:
+        yield results
+    finally:
+        results.update(overlay_results)
+        overlays.clear()
+        overlay_results.clear()
+
+
+def get_overlay(path: Path | str) -> Optional[str]:
+    """ :return: содержимое буфера редактора файла или None, если файл не открыт в редакторе """
+    return overlays.get(Path(path).absolute()) if overlays else None
+
+
+def read_text(path: Path | str) -> str:
+    """ Прочитать текстовый файл без BOM, с переводами строк '\\n' (или содержимое его буфера редактора) """
+    if (text := get_overlay(path)) is not None:
+        return text
+    timings.count('files_read')
+    with open(path, 'rb') as file:
+        data = file.read()
+    return TextFormat.detect(data).decode(data)
+
+
+class StagingArea:
+    """
+    Промежуточная файловая система: запланированные к записи файлы накапливаются в памяти
+    и записываются на диск одной операцией flush(). Файлы, содержимое которых не изменилось, не перезаписываются,
+    изменённые файлы сохраняют кодировку, BOM и переводы строк
+
+    Attributes:
+        files: содержимое запланированных к записи файлов по их путям
+        dry_run: не изменять файлы на диске, только описать запланированные изменения
+        diff: описывать изменения в формате unified diff
+    """
+    files: dict[Path, str]
+    dry_run: bool
+    diff: bool
+
+    def __init__(self, dry_run: bool = False, diff: bool = False):
+        self.files = {}
+        self.dry_run = dry_run
+        self.diff = diff
+
+    def exists(self, path: Path) -> bool:
+        """ Проверка, существует ли файл на диске или запланирован к записи """
+        if path in self.files:
+            return True
+        timings.count('stat')
+        return path.exists()
+
+    def write(self, path: Path, content: str) -> None:
+        """ Запланировать запись файла (директории создаются при записи на диск) """
+        self.files[Path(path)] = content
+
+    def read_original(self, path: Path) -> tuple[Optional[str], TextFormat]:
+        """ :return: текущее содержимое файла на диске (None - файл не существует) и его формат """
+        if (text := get_overlay(path)) is not None:
+            return text, TextFormat()
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+        except FileNotFoundError:
+            return None, TextFormat()
+        text_format = TextFormat.detect(data)
+        return text_format.decode(data), text_format
+
+    def changed_files(self) -> dict[Path, tuple[Optional[str], TextFormat]]:
+        """ :return: запланированные файлы, содержимое которых отличается от файлов на диске, с исходным содержимым """
+        changed = {}
+        for path, content in self.files.items():
+            original, text_format = self.read_original(path)
+            if original != content:
+                changed[path] = (original, text_format)
+        return changed
+
+    @timings.timed('writing')
+    def flush(self) -> list[Path]:
+        """
+        Записать изменённые файлы на диск: сначала во временные файлы рядом с целевыми, затем переименовать.
+        При ошибке записи временные файлы и созданные директории удаляются, целевые файлы не изменяются.
+        Файлы, открытые в редакторе (overlays), не записываются: их содержимое передаётся в overlay_results
+        :return: записанные файлы
+        """
+        if self.dry_run:
+            return []
+
+        created_directories: list[Path] = []
+        temp_paths: dict[Path, Path] = {}
+        try:
+            for path, (original, text_format) in self.changed_files().items():
+                if get_overlay(path) is not None:
+                    overlay_results[path.absolute()] = self.files[path]
+                    continue
+                self._make_parents(path, created_directories)
+                temp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+                temp_paths[path] = temp_path
+                with open(temp_path, 'wb') as file:
+                    file.write(text_format.encode(self.files[path]))
+                if original is not None:
+                    shutil.copymode(path, temp_path)
+        except BaseException:
+            for temp_path in temp_paths.values():
+                temp_path.unlink(missing_ok=True)
+            for directory in reversed(created_directories):
+                directory.rmdir()
+            raise
+
+        for path, temp_path in temp_paths.items():
+            os.replace(temp_path, path)
+
+        written = list(temp_paths)
+        timings.count('files_written', len(written))
+        self.files.clear()
+        return written
+
+    @staticmethod
+    def _make_parents(path: Path, created_directories: list[Path]) -> None:
+        missing = []
+        directory = path.parent
+        while not directory.exists():
+            missing.append(directory)
+            directory = directory.parent
+        for directory in reversed(missing):
+            directory.mkdir()
+            created_directories.append(directory)
+
+    def describe(self) -> str:
+        """ :return: описание запланированных изменений (список файлов или unified diff) """
+        lines = []
+        for path, (old_content, _) in self.changed_files().items():
+            content = self.files[path]
+            if not self.diff:
+                status = 'создан' if old_content is None else 'изменён'
+                lines.append(f'{status}: {path}')
+                continue
+            import difflib
+            lines.extend(difflib.unified_diff(
+                (old_content or '').splitlines(keepends=True),
+                content.splitlines(keepends=True),
+                fromfile=str(path) if old_content is not None else '/dev/null',
+                tofile=str(path)))
+            if lines and not lines[-1].endswith('\n'):
+                lines[-1] += '\n'
+        return ''.join(line if self.diff else line + '\n' for line in lines)
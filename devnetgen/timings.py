@@ -0,0 +1,131 @@
+"""
+Замеры времени фаз команды и счётчики файловых операций (флаг --timings).
+Замеры собираются всегда (их стоимость - пара вызовов perf_counter на фазу), выводятся только с флагом
+"""
+from __future__ import annotations
+import json
+import sys
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Iterator, TypeVar
+
+F = TypeVar('F', bound=Callable)
+
+output_formats = ('text', 'json')
+
+
+class Timings:
+    """
+    Собственное время фаз (время вложенной фазы не входит во время внешней) и счётчики операций
+
+    Attributes:
+        phases: время фаз в секундах в порядке первого входа в фазу
+        counters: значения счётчиков
+        started: время начала замеров (time.perf_counter)
+    """
+    phases: dict[str, float]
+    counters: dict[str, int]
+    started: float
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.phases = {}
+        self.counters = {}
+        self.started = time.perf_counter()
+        self._stack: list[list] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """ Замерить фазу. Время внешней фазы приостанавливается на время вложенной """
+        now = time.perf_counter()
+        if self._stack:
+            parent = self._stack[-1]
+            self.phases[parent[0]] += now - parent[1]
+        self.phases.setdefault(name, 0.0)
+        self._stack.append([name, now])
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            name, start = self._stack.pop()
+            self.phases[name] += now - start
+            if self._stack:
+                self._stack[-1][1] = now
+
+    def timed(self, name: str) -> Callable[[F], F]:
+        """ Декоратор: замерить вызовы функции как фазу name """
+        def decorator(function: F) -> F:
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.phase(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name: str, value: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self) -> dict:
+        """ :return: текущие значения замеров для since() """
+        return {'phases': dict(self.phases), 'counters': dict(self.counters)}
+
+    def since(self, snapshot: dict) -> dict:
+        """ :return: замеры, накопленные после snapshot (для передачи из процесса пула в основной процесс) """
+        return {
+            'phases': {name: value - snapshot['phases'].get(name, 0.0) for name, value in self.phases.items()},
+            'counters': {name: value - snapshot['counters'].get(name, 0) for name, value in self.counters.items()},
+        }
+
+    def merge(self, measurements: dict):
+        """ Добавить замеры процесса пула """
+        for name, value in measurements['phases'].items():
+            self.phases[name] = self.phases.get(name, 0.0) + value
+        for name, value in measurements['counters'].items():
+            self.count(name, value)
+
+    def as_dict(self) -> dict:
+        total = time.perf_counter() - self.started
+        return {
+            'total': total,
+            'phases': dict(self.phases),
+            'other': max(total - sum(self.phases.values()), 0.0),
+            'counters': dict(self.counters),
+        }
+
+    def format(self, output_format: str = 'text') -> str:
+        """
+        :param output_format: 'text' или 'json'
+        :return: отчёт о замерах
+        """
+        data = self.as_dict()
+        if output_format == 'json':
+            return json.dumps(data, ensure_ascii=False)
+
+        total = data['total'] or 1e-9
+        lines = [f'Время выполнения: {data["total"] * 1000:.1f} мс']
+        for name, value in (*data['phases'].items(), ('other', data['other'])):
+            lines.append(f'  {name:<14}{value * 1000:9.1f} мс {value / total:6.1%}')
+        if data['counters']:
+            lines.append('Счётчики:')
+            lines.extend(f'  {name:<14}{value:9d}' for name, value in data['counters'].items())
+        return '\n'.join(lines)
+
+
+timings = Timings()
+
+
+@contextmanager
+def report(output_format: str | None) -> Iterator[Timings]:
+    """
+    Замерить команду с нуля и вывести отчёт в stderr
+    :param output_format: 'text', 'json' или None (не выводить отчёт)
+    """
+    timings.reset()
+    try:
+        yield timings
+    finally:
+        if output_format:
+            print(timings.format(output_format), file=sys.stderr)
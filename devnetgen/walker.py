@@ -0,0 +1,221 @@
+"""
+Правила обхода дерева исходников: пропуск выходных директорий сборки и служебных директорий (bin, obj, .git, ...)
+и путей, исключённых в .gitignore
+"""
+from __future__ import annotations
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+from devnetgen.cache import get_mtime
+from devnetgen.timings import timings
+
+# Директории, в которые обход никогда не спускается: результаты сборки, VCS, IDE, фронтенд, кэш индекса
+ignored_directory_names = frozenset({'bin', 'obj', '.git', '.vs', '.idea', 'node_modules', 'wwwroot', '.devnetgen'})
+ignore_file_name = '.gitignore'
+
+
+def _translate_segment(segment: str) -> str:
+    """ :return: регулярное выражение части шаблона между '/': '*', '?' и '[...]' не совпадают с '/' """
+    regex = []
+    index = 0
+    while index < len(segment):
+        char = segment[index]
+        index += 1
+        if char == '*':
+            regex.append('[^/]*')
+        elif char == '?':
+            regex.append('[^/]')
+        elif char == '\\' and index < len(segment):
+            regex.append(re.escape(segment[index]))
+            index += 1
+        elif char == '[' and (end := segment.find(']', index + 1)) >= 0:
+            content = segment[index:end]
+            negated = content[0] in '!^'
+            content = content[1:] if negated else content
+            content = content.replace('\\', '\\\\').replace('[', '\\[')
+            regex.append(f'[^/{content}]' if negated else f'[{content}]')
+            index = end + 1
+        else:
+            regex.append(re.escape(char))
+    return ''.join(regex)
+
+
+def _translate_pattern(pattern: str) -> str:
+    """
+    :return: регулярное выражение шаблона .gitignore, сопоставляемое с путём целиком:
+     '*' и '?' не пересекают границу директории, '**' совпадает с любым числом директорий
+    """
+    segments = pattern.split('/')
+    regex = []
+    for index, segment in enumerate(segments):
+        last = index == len(segments) - 1
+        if segment == '**':
+            regex.append('.*' if last else '(?:.*/)?')
+        else:
+            regex.append(_translate_segment(segment) if last else _translate_segment(segment) + '/')
+    return ''.join(regex) + r'\Z'
+
+
+@dataclass(frozen=True)
+class IgnorePattern:
+    """
+    Шаблон .gitignore
+
+    Attributes:
+        base: директория файла .gitignore
+        regex: скомпилированный шаблон (по имени или по пути относительно base)
+        negated: шаблон возвращает путь ('!pattern')
+        directory_only: шаблон относится только к директориям ('pattern/')
+        anchored: шаблон сопоставляется с путём относительно base, а не с именем
+    """
+    base: Path
+    regex: re.Pattern
+    negated: bool
+    directory_only: bool
+    anchored: bool
+
+    @classmethod
+    def parse(cls, base: Path, line: str) -> Optional[IgnorePattern]:
+        """ :return: шаблон строки .gitignore или None для пустых строк и комментариев """
+        line = line.rstrip('\n').rstrip()
+        if not line or line.startswith('#'):
+            return None
+        negated = line.startswith('!')
+        line = line.removeprefix('!').removeprefix('\\')
+        directory_only = line.endswith('/')
+        line = line.rstrip('/')
+        if line.startswith('**/') and '/' not in line.removeprefix('**/'):
+            line = line.removeprefix('**/')
+        anchored = '/' in line
+        line = line.removeprefix('/')
+        if not line:
+            return None
+        return cls(base, re.compile(_translate_pattern(line), re.DOTALL), negated, directory_only, anchored)
+
+    def matches(self, path: Path, is_dir: bool) -> bool:
+        if self.directory_only and not is_dir:
+            return False
+        if self.anchored:
+            return self.regex.match(path.relative_to(self.base).as_posix()) is not None
+        return self.regex.match(path.name) is not None
+
+
+_ignore_files: dict[Path, tuple[Optional[int], tuple[IgnorePattern, ...]]] = {}
+
+
+def read_ignore_file(path: Path) -> tuple[Optional[int], tuple[IgnorePattern, ...]]:
+    """
+    Прочитать .gitignore (с кэшем по времени изменения)
+    :return: время изменения файла (None, если файла нет) и его шаблоны
+    """
+    mtime = get_mtime(path)
+    cached = _ignore_files.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached
+    patterns = ()
+    if mtime is not None:
+        timings.count('files_read')
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as file:
+                patterns = tuple(pattern for line in file if (pattern := IgnorePattern.parse(path.parent, line)))
+        except OSError:
+            patterns = ()
+    _ignore_files[path] = (mtime, patterns)
+    return mtime, patterns
+
+
+class IgnoreRules:
+    """
+    Шаблоны .gitignore, действующие в директории: из самой директории и её родителей
+    (более глубокие и более поздние шаблоны важнее)
+
+    Attributes:
+        patterns: шаблоны в порядке применения
+    """
+    patterns: tuple[IgnorePattern, ...]
+
+    def __init__(self, patterns: tuple[IgnorePattern, ...] = ()):
+        self.patterns = patterns
+
+    @classmethod
+    def for_ancestors(cls, root: Path, top: Optional[Path]) -> tuple[IgnoreRules, dict[str, Optional[int]]]:
+        """
+        Правила для корня обхода из файлов .gitignore его родителей до top (корня git-репозитория) включительно
+        :return: правила и времена изменения учтённых файлов .gitignore
+        """
+        rules = cls()
+        mtimes = {}
+        if top is None:
+            return rules, mtimes
+        directories = [directory for directory in root.parents if directory.is_relative_to(top)]
+        for directory in reversed(directories):
+            path = directory / ignore_file_name
+            mtime, patterns = read_ignore_file(path)
+            mtimes[str(path)] = mtime
+            rules = rules.extend(patterns)
+        return rules, mtimes
+
+    def extend(self, patterns: tuple[IgnorePattern, ...]) -> IgnoreRules:
+        return IgnoreRules(self.patterns + patterns) if patterns else self
+
+    def is_ignored(self, path: Path, is_dir: bool) -> bool:
+        if is_dir and path.name in ignored_directory_names:
+            return True
+        ignored = False
+        for pattern in self.patterns:
+            if pattern.negated == ignored and pattern.matches(path, is_dir):
+                ignored = not pattern.negated
+        return ignored
+
+
+def read_directory(directory: Path, rules: IgnoreRules) -> tuple[list[os.DirEntry], IgnoreRules, Optional[int]]:
+    """
+    Прочитать директорию, пропуская служебные директории и исключённые правилами (в т.ч. .gitignore
+    самой директории) пути
+    :param rules: правила .gitignore родительских директорий
+    :return: оставленные элементы, правила для поддиректорий и время изменения .gitignore директории
+     (None, если его нет)
+    :raise OSError: директорию не удалось прочитать
+    """
+    timings.count('listdir')
+    with os.scandir(directory) as iterator:
+        items = list(iterator)
+    ignore_mtime = None
+    if any(item.name == ignore_file_name for item in items):
+        ignore_mtime, patterns = read_ignore_file(directory / ignore_file_name)
+        rules = rules.extend(patterns)
+    entries = []
+    for item in items:
+        is_dir = item.is_dir(follow_symlinks=False)
+        if is_dir and item.name in ignored_directory_names:
+            continue
+        if rules.patterns and rules.is_ignored(directory / item.name, is_dir):
+            continue
+        entries.append(item)
+    return entries, rules, ignore_mtime
+
+
+def walk(root: Path, rules: IgnoreRules) -> Iterator[os.DirEntry]:
+    """
+    Обойти дерево в глубину, пропуская служебные директории и исключённые .gitignore пути.
+    Директории читаются по мере обхода: прерванный обход не читает оставшуюся часть дерева
+    :param root: корень обхода (сам не выдаётся)
+    :param rules: правила .gitignore родителей root (см. IgnoreRules.for_ancestors)
+    :return: файлы и директории дерева; директория выдаётся перед своим содержимым
+    """
+    stack = [(root, rules)]
+    while stack:
+        directory, rules = stack.pop()
+        try:
+            entries, rules, _ = read_directory(directory, rules)
+        except OSError:
+            continue
+        subdirectories = []
+        for entry in entries:
+            yield entry
+            if entry.is_dir(follow_symlinks=False):
+                subdirectories.append((Path(entry.path), rules))
+        stack.extend(reversed(subdirectories))
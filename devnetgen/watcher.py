@@ -0,0 +1,247 @@
+"""
+Отслеживание изменений .cs файлов в дереве директорий (dev-netgen watch): inotify на Linux
+(через ctypes, без дополнительных зависимостей) и опрос времён изменения файлов на остальных платформах
+"""
+from __future__ import annotations
+import ctypes
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterator, Optional
+
+from devnetgen.walker import IgnoreRules, ignore_file_name, read_ignore_file, walk
+
+watched_suffix = '.cs'
+# Время ожидания следующих событий после первого: сохранение файла IDE порождает серию событий
+debounce_interval = 0.05
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0o2000000)
+watch_mask = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+event_header = struct.Struct('iIII')
+
+
+def walk_tree(root: Path, rules: IgnoreRules) -> Iterator[tuple[Path, bool]]:
+    """
+    Обойти дерево общим обходом (walker.walk), пропуская выходные директории сборки, служебные директории
+    и исключённые .gitignore пути
+    :return: root, его поддиректории и .cs файлы - пары (путь, является директорией)
+    """
+    yield root, True
+    for entry in walk(root, rules):
+        if entry.is_dir(follow_symlinks=False):
+            yield Path(entry.path), True
+        elif entry.name.endswith(watched_suffix):
+            yield Path(entry.path), False
+
+
+class FileWatcher(ABC):
+    """
+    Источник изменений .cs файлов дерева директорий
+
+    Attributes:
+        root: корень отслеживаемого дерева
+        rules: правила .gitignore родителей корня до корня git-репозитория (как у индекса решения)
+    """
+    root: Path
+    rules: IgnoreRules
+
+    def __init__(self, root: Path):
+        from devnetgen.git import find_repository_root
+
+        self.root = root
+        self.rules, _ = IgnoreRules.for_ancestors(root, find_repository_root(root))
+
+    def rules_for(self, path: Path) -> IgnoreRules:
+        """ :return: правила .gitignore родителей пути: выше корня и в директориях дерева """
+        rules = self.rules
+        for directory in reversed(path.parents):
+            if directory.is_relative_to(self.root):
+                rules = rules.extend(read_ignore_file(directory / ignore_file_name)[1])
+        return rules
+
+    def is_ignored(self, path: Path, is_dir: bool) -> bool:
+        return self.rules_for(path).is_ignored(path, is_dir)
+
+    @abstractmethod
+    def wait(self, timeout: Optional[float] = None) -> set[Path]:
+        """
+        Дождаться изменений
+        :param timeout: максимальное время ожидания, с (None - без ограничения)
+        :return: созданные, изменённые и удалённые .cs файлы (пустое множество по истечении timeout)
+        """
+
+    def close(self):
+        pass
+
+    def __enter__(self) -> FileWatcher:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class InotifyWatcher(FileWatcher):
+    """
+    Отслеживание изменений через inotify: по дескриптору наблюдения на директорию дерева,
+    директории, созданные во время работы, добавляются к наблюдению
+
+    Attributes:
+        directories: отслеживаемые директории по дескрипторам наблюдения
+    """
+    directories: dict[int, Path]
+
+    def __init__(self, root: Path):
+        """ :raise OSError: inotify недоступен или превышен лимит наблюдений (fs.inotify.max_user_watches) """
+        super().__init__(root)
+        if not sys.platform.startswith('linux'):
+            raise OSError(errno.ENOSYS, 'inotify доступен только в Linux')
+        try:
+            self._libc = ctypes.CDLL(None, use_errno=True)
+            self._add_watch = self._libc.inotify_add_watch
+        except (OSError, AttributeError) as error:
+            raise OSError(errno.ENOSYS, f'inotify недоступен: {error}')
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise self._error('inotify_init1')
+        self.directories = {}
+        try:
+            for path, is_dir in walk_tree(root, self.rules):
+                if is_dir:
+                    self._watch(path)
+        except OSError:
+            self.close()
+            raise
+
+    def _error(self, function: str) -> OSError:
+        code = ctypes.get_errno()
+        return OSError(code, f'{function}: {os.strerror(code)}')
+
+    def _watch(self, directory: Path):
+        descriptor = self._add_watch(self._fd, os.fsencode(directory), watch_mask)
+        if descriptor < 0:
+            code = ctypes.get_errno()
+            if code in (errno.ENOENT, errno.ENOTDIR):
+                return
+            raise OSError(code, f'inotify_add_watch: {os.strerror(code)} ({directory})')
+        self.directories[descriptor] = directory
+
+    def _watch_tree(self, root: Path, changed: set[Path]):
+        """ Добавить к наблюдению созданную директорию (файлы, появившиеся до этого, считаются изменёнными) """
+        for path, is_dir in walk_tree(root, self.rules_for(root)):
+            if is_dir:
+                self._watch(path)
+            else:
+                changed.add(path)
+
+    def wait(self, timeout: Optional[float] = None) -> set[Path]:
+        changed: set[Path] = set()
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return changed
+        while select.select([self._fd], [], [], debounce_interval)[0]:
+            self._read_events(changed)
+        return changed
+
+    def _read_events(self, changed: set[Path]):
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            descriptor, mask, _, length = event_header.unpack_from(data, offset)
+            offset += event_header.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # Очередь событий переполнена: считать изменёнными все файлы дерева
+                changed.update(path for path, is_dir in walk_tree(self.root, self.rules) if not is_dir)
+                continue
+            directory = self.directories.get(descriptor)
+            if mask & IN_IGNORED:
+                self.directories.pop(descriptor, None)
+                continue
+            if directory is None or not name:
+                continue
+            path = directory / name
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and not self.is_ignored(path, True):
+                    self._watch_tree(path, changed)
+            elif name.endswith(watched_suffix) and not self.is_ignored(path, False):
+                changed.add(path)
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher(FileWatcher):
+    """
+    Отслеживание изменений опросом времён изменения файлов дерева
+
+    Attributes:
+        interval: интервал опроса, с
+        files: времена изменения .cs файлов дерева на момент последнего опроса
+    """
+    interval: float
+    files: dict[Path, int]
+
+    def __init__(self, root: Path, interval: float = 0.5):
+        super().__init__(root)
+        self.interval = interval
+        self.files = self._scan()
+
+    def _scan(self) -> dict[Path, int]:
+        files = {}
+        for entry in walk(self.root, self.rules):
+            if entry.name.endswith(watched_suffix) and not entry.is_dir(follow_symlinks=False):
+                try:
+                    files[Path(entry.path)] = entry.stat().st_mtime_ns
+                except OSError:
+                    continue
+        return files
+
+    def wait(self, timeout: Optional[float] = None) -> set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            files = self._scan()
+            changed = {path for path in files.keys() | self.files.keys() if files.get(path) != self.files.get(path)}
+            self.files = files
+            if changed:
+                return changed
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return changed
+            time.sleep(self.interval if remaining is None else min(self.interval, remaining))
+
+
+def create_watcher(root: Path, polling: bool = False, interval: float = 0.5) -> FileWatcher:
+    """
+    :param root: корень отслеживаемого дерева
+    :param polling: использовать опрос вместо inotify
+    :param interval: интервал опроса, с
+    :return: inotify-наблюдатель, если он доступен, иначе - опрос
+    """
+    if not polling:
+        try:
+            return InotifyWatcher(root)
+        except OSError as error:
+            print(f'inotify недоступен ({error}), изменения отслеживаются опросом', file=sys.stderr)
+    return PollingWatcher(root, interval)
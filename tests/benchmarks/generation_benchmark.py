@@ -0,0 +1,216 @@
+"""
+Бенчмарк генерации на синтетическом решении (tests.benchmarks.solution_generator): время разбора сущностей
+(Entity), CrudExecutor.create_crud, TestsExecutor.create_tests и SummariesExecutor.add_summaries по корневым
+сущностям решения, а также пакетной генерации всех (BatchExecutor, 'all') в одном процессе и в пуле из jobs процессов.
+Результаты сравниваются с сохранённым в JSON базовым замером того же профиля.
+
+Запуск: python -m tests.benchmarks.generation_benchmark [--profile default] [--jobs 4] [--save] [--threshold 1.3]
+Код возврата 1, если медианное время одной из фаз превышает базовое более чем в threshold раз, базового замера
+профиля нет (базовые замеры профилей хранятся в tests/benchmarks/baselines, сохраняются флагом --save) или пакетная
+генерация в пуле процессов планирует не те же изменения, что в одном процессе
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, fields, replace
+from pathlib import Path
+from typing import Callable
+
+from devnetgen.entities import Entity
+from devnetgen.executors.batch_executor import BatchExecutor
+from devnetgen.executors.crud_executor import CrudExecutor
+from devnetgen.executors.summaries_executor import SummariesExecutor
+from devnetgen.executors.tests_executor import TestsExecutor
+from devnetgen.staging import StagingArea
+from tests.benchmarks.solution_generator import GeneratedSolution, SolutionParameters, generate_solution
+
+baselines_path = Path(__file__).parent / 'baselines'
+
+profiles: dict[str, SolutionParameters] = {
+    'small': SolutionParameters(entities=10, properties=8, navigation_depth=1, fan_out=2, enums=2, namespace_depth=1),
+    'default': SolutionParameters(),
+    'wide': SolutionParameters(entities=40, properties=40, navigation_depth=1, fan_out=12, enums=10),
+    'deep': SolutionParameters(entities=60, properties=10, navigation_depth=4, fan_out=2, namespace_depth=4,
+                               webapi=False, sieve=False, mediatr=True),
+}
+
+phases = ('parse', 'crud', 'tests', 'batch', 'batch_parallel', 'summaries')
+summary_pattern = re.compile(r'^[ \t]*/// <summary>\n(?:[ \t]*///.*\n)*?[ \t]*/// </summary>\n', re.MULTILINE)
+
+
+class Benchmark:
+    """
+    Замеры фаз генерации на одном синтетическом решении
+
+    Attributes:
+        solution: сгенерированное решение
+        index: индекс решения (общий для всех замеров, чтобы разбор не включал обход директорий)
+        jobs: число процессов пула пакетной генерации (фаза batch_parallel)
+    """
+
+    def __init__(self, solution: GeneratedSolution, jobs: int):
+        self.solution = solution
+        self.index = Entity(solution.root_paths[0]).index
+        self.jobs = jobs
+
+    def parse(self) -> list[Entity]:
+        return [Entity(path, index=self.index) for path in self.solution.root_paths]
+
+    def run_phase(self, phase: str, repeat: int, warmup: int) -> list[float]:
+        """ :return: время фазы по всем корневым сущностям за каждый из repeat прогонов, с """
+        setup, run = self._phase(phase)
+        results = []
+        for number in range(warmup + repeat):
+            state = setup()
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                run(state)
+                elapsed = time.perf_counter() - start
+            if number >= warmup:
+                results.append(elapsed)
+        return results
+
+    def _phase(self, phase: str) -> tuple[Callable[[], object], Callable[[object], None]]:
+        """ :return: подготовка фазы (не замеряется) и сама фаза """
+        if phase == 'parse':
+            return lambda: None, lambda _: self.parse()
+        if phase == 'crud':
+            return self.parse, lambda entities: [
+                CrudExecutor(entity, StagingArea(dry_run=True), use_git=False).create_crud(output=False)
+                for entity in entities]
+        if phase == 'tests':
+            return self.parse, lambda entities: [
+                TestsExecutor(entity, StagingArea(dry_run=True), use_git=False).create_tests(output=False)
+                for entity in entities]
+        if phase == 'summaries':
+            return self.parse, lambda entities: [
+                SummariesExecutor(entity, StagingArea(dry_run=True)).add_summaries() for entity in entities]
+        if phase == 'batch':
+            return lambda: None, lambda _: self.run_batch(1)
+        if phase == 'batch_parallel':
+            return lambda: None, lambda _: self.run_batch(self.jobs)
+        raise ValueError(f'Неизвестная фаза: {phase}')
+
+    def run_batch(self, jobs: int) -> str:
+        """ :return: описание изменений, запланированных пакетной генерацией всего для корневых сущностей (--dry-run) """
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            BatchExecutor([str(path) for path in self.solution.root_paths], jobs, dry_run=True,
+                          use_git=False).create_all()
+        return output.getvalue()
+
+    def prepare_summaries(self):
+        """ Сгенерировать CRUD корневых сущностей на диск и удалить из их vm/dto summaries """
+        for entity in self.parse():
+            CrudExecutor(entity, StagingArea(), use_git=False).create_crud(output=False)
+        for path in (self.solution.root / 'Application').rglob('*.cs'):
+            if path.name.endswith(('Vm.cs', 'Dto.cs')):
+                path.write_text(summary_pattern.sub('', path.read_text(encoding='utf-8')), encoding='utf-8')
+        self.index.refresh()
+
+
+def run_benchmark(parameters: SolutionParameters, repeat: int, warmup: int, jobs: int) -> dict:
+    """
+    :return: результаты замеров: параметры решения, версия python, время фаз (медиана и минимум), с,
+     и совпадение изменений пакетной генерации в пуле процессов и в одном процессе (batch_consistent)
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        benchmark = Benchmark(generate_solution(Path(directory), parameters), jobs)
+        results = {}
+        for phase in phases:
+            if phase == 'summaries':
+                benchmark.prepare_summaries()
+            timings = benchmark.run_phase(phase, repeat, warmup)
+            results[phase] = {'median': statistics.median(timings), 'min': min(timings)}
+            if phase == 'batch_parallel':
+                batch_consistent = benchmark.run_batch(jobs) == benchmark.run_batch(1)
+    return {'parameters': asdict(parameters), 'python': platform.python_version(), 'jobs': jobs,
+            'phases': results, 'batch_consistent': batch_consistent}
+
+
+def compare(result: dict, baseline: dict, threshold: float, min_delta: float) -> list[str]:
+    """ :return: описания фаз, медианное время которых превышает базовое более чем в threshold раз """
+    regressions = []
+    for phase, timings in result['phases'].items():
+        if phase not in baseline['phases']:
+            continue
+        current, base = timings['median'], baseline['phases'][phase]['median']
+        if current > base * threshold and current - base > min_delta:
+            regressions.append(f'{phase}: {current * 1000:.1f} мс против {base * 1000:.1f} мс '
+                               f'(x{current / base:.2f}, порог x{threshold})')
+    return regressions
+
+
+def parse_parameters(args: argparse.Namespace) -> SolutionParameters:
+    overrides = {item.name: getattr(args, item.name) for item in fields(SolutionParameters)
+                 if getattr(args, item.name) is not None}
+    return replace(profiles[args.profile], **overrides)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profile', choices=profiles, default='default', help='набор параметров решения')
+    for item in fields(SolutionParameters):
+        option = '--' + item.name.replace('_', '-')
+        if item.type == 'bool':
+            parser.add_argument(option, action=argparse.BooleanOptionalAction, default=None)
+        else:
+            parser.add_argument(option, type=int, default=None)
+    parser.add_argument('--repeat', type=int, default=5, help='число замеров каждой фазы')
+    parser.add_argument('--warmup', type=int, default=1, help='число прогревочных прогонов каждой фазы')
+    parser.add_argument('--jobs', type=int, default=max(os.cpu_count() or 1, 2),
+                        help='число процессов пула пакетной генерации (фаза batch_parallel)')
+    parser.add_argument('--baseline', type=Path, help='файл базового замера '
+                                                      '(по умолчанию - tests/benchmarks/baselines/<профиль>.json)')
+    parser.add_argument('--save', action='store_true', help='сохранить результат как базовый замер')
+    parser.add_argument('--threshold', type=float, default=1.3, help='допустимое отношение к базовому времени фазы')
+    parser.add_argument('--min-delta', type=float, default=0.005,
+                        help='минимальное замедление фазы, считающееся регрессией, с')
+    parser.add_argument('--json', action='store_true', help='вывести результат в формате JSON')
+    args = parser.parse_args()
+
+    parameters = parse_parameters(args)
+    result = run_benchmark(parameters, args.repeat, args.warmup, args.jobs)
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print(f'== {args.profile}: {asdict(parameters)}')
+        for phase, timings in result['phases'].items():
+            print(f'  {phase}: медиана {timings["median"] * 1000:.1f} мс, минимум {timings["min"] * 1000:.1f} мс')
+    if not result['batch_consistent']:
+        print(f'Пакетная генерация в пуле из {args.jobs} процессов запланировала не те же изменения, '
+              f'что в одном процессе', file=sys.stderr)
+        return 1
+
+    baseline_path = args.baseline or baselines_path / f'{args.profile}.json'
+    if args.save:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(result, ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+        print(f'Базовый замер сохранён в {baseline_path}', file=sys.stderr)
+        return 0
+    if not baseline_path.exists():
+        print(f'Нет базового замера {baseline_path} (сохраняется флагом --save)', file=sys.stderr)
+        return 1
+
+    baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+    if baseline['parameters'] != result['parameters']:
+        print(f'Базовый замер {baseline_path} снят с другими параметрами решения: {baseline["parameters"]}',
+              file=sys.stderr)
+        return 1
+    regressions = compare(result, baseline, args.threshold, args.min_delta)
+    for regression in regressions:
+        print(f'Регрессия {regression}', file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Бенчмарк разбора c#-файлов на патологических входных данных: сравнение прежних регулярных выражений
+entities.py с однопроходным сканером (devnetgen.scanner) и проверка линейности времени работы сканера.
+
+Запуск: python -m tests.benchmarks.scanner_benchmark [--max-ratio 3.0]
+Код возврата 1, если время разбора сканером растёт быстрее линейного (с допуском --max-ratio)
+"""
+from __future__ import annotations
+import argparse
+import re
+import sys
+import time
+from typing import Callable
+
+from devnetgen.scanner import scan
+
+# Регулярные выражения, которыми Entity разбирала файл до появления сканера
+legacy_patterns = [
+    re.compile(r"^namespace ([^;{]*)(?:;|\n)", re.MULTILINE),
+    re.compile(r"/// <summary>\s*/// (?P<summary>(?:.|\n)*?)\s*/// </summary>\s*(?P<tags>(?:///.+>\s*)+)?"
+               r"(?P<attributes>(?:\[.+]\s*)+)?\s*public class", re.MULTILINE),
+    re.compile(r"using (Sample\.Domain\..*);"),
+    re.compile(r"(?:<summary>\s*(?P<summary>(?:.|\n)*?)\s*/// </summary>\s*)?(?P<attributes>(?:\[.+]\s*)+)?"
+               r"\s*public (?P<type>[^\s]+)\s(?P<name>[^\s]+)(?=\s\{ ?get;)", re.S),
+]
+
+
+def entity_file(members: str) -> str:
+    return ('using Sample.Domain.Common;\n\nnamespace Sample.Domain.Entities;\n\n'
+            '/// <summary>\n/// Сущность\n/// </summary>\npublic class Sample : BaseEntity\n{\n' + members + '}\n')
+
+
+def regular_properties(n: int) -> str:
+    """ Обычная сущность: n документированных свойств с атрибутами """
+    return entity_file(''.join(f'    /// <summary>\n    /// Свойство {i}\n    /// </summary>\n    [Required]\n'
+                               f'    public string Property{i} {{ get; set; }}\n\n' for i in range(n)))
+
+
+def unclosed_summaries(n: int) -> str:
+    """ n незакрытых <summary>: ленивый (?:.|\\n)*? перебирает все способы разбить текст до конца файла """
+    return entity_file(''.join(f'    /// <summary>\n    /// Свойство {i}\n    public string Property{i} {{ get; set; }}\n'
+                               for i in range(n)))
+
+
+def long_doc_comment(n: int) -> str:
+    """ Документирующий комментарий класса из n строк без </summary> """
+    return ('namespace Sample.Domain.Entities;\n\n/// <summary>\n' + '/// Строка описания\n' * n
+            + 'public class Sample\n{\n}\n')
+
+
+def attributed_methods(n: int) -> str:
+    """ n методов с атрибутами: жадный \\[.+] с re.S захватывает текст до последней ']' файла """
+    return entity_file(''.join(f'    [Attribute({i}, Name = "[{i}]")]\n    public int Method{i}() => {i};\n'
+                               for i in range(n)))
+
+
+def multiline_attribute(n: int) -> str:
+    """ Атрибут свойства из n строк: незакрытый атрибут накапливается построчно до закрывающей ']' """
+    return entity_file('    [Description(\n' + ''.join(f'        "Строка {i} [{i}]" +\n' for i in range(n))
+                       + '        "")]\n    public string Property { get; set; }\n')
+
+
+cases: dict[str, Callable[[int], str]] = {
+    'regular_properties': regular_properties,
+    'unclosed_summaries': unclosed_summaries,
+    'long_doc_comment': long_doc_comment,
+    'attributed_methods': attributed_methods,
+    'multiline_attribute': multiline_attribute,
+}
+
+
+def legacy_parse(text: str):
+    for pattern in legacy_patterns:
+        list(pattern.finditer(text))
+
+
+def measure(function: Callable[[str], object], text: str, repeat: int = 3) -> float:
+    """ :return: лучшее из repeat время выполнения в секундах """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def legacy_growth(generator: Callable[[int], str], budget: float) -> list[tuple[int, float]]:
+    """
+    Время прежнего разбора на растущих входных данных, пока один запуск (в т.ч. прогнозируемый следующий
+    по темпу роста) не превысит budget секунд
+    """
+    results = []
+    n = 2
+    previous = None
+    while n <= 1000:
+        elapsed = measure(legacy_parse, generator(n), repeat=1)
+        results.append((n, elapsed))
+        growth = elapsed / previous if previous else 1
+        if elapsed > budget or elapsed * growth > budget * 2:
+            break
+        previous = elapsed
+        n = max(n + 2, n * 3 // 2)
+    return results
+
+
+def scanner_growth(generator: Callable[[int], str], sizes: list[int]) -> list[tuple[int, int, float]]:
+    """ :return: размер, число строк и время разбора сканером """
+    results = []
+    for n in sizes:
+        text = generator(n)
+        results.append((n, text.count('\n'), measure(scan, text)))
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 2000, 4000, 8000],
+                        help='число членов класса для замеров сканера')
+    parser.add_argument('--legacy-budget', type=float, default=0.5,
+                        help='максимальное время одного прогона прежних регулярных выражений, с')
+    parser.add_argument('--max-ratio', type=float, default=3.0,
+                        help='допустимое отношение времени на строку на наибольшем и наименьшем размере')
+    args = parser.parse_args()
+
+    failed = False
+    for name, generator in cases.items():
+        print(f'== {name}')
+        legacy = legacy_growth(generator, args.legacy_budget)
+        print('  регулярные выражения: ' + ', '.join(f'n={n}: {elapsed * 1000:.2f} мс' for n, elapsed in legacy))
+
+        results = scanner_growth(generator, args.sizes)
+        for n, lines, elapsed in results:
+            print(f'  сканер: n={n} ({lines} строк): {elapsed * 1000:.2f} мс, {elapsed / lines * 1e6:.2f} мкс/строка')
+
+        (_, first_lines, first), (_, last_lines, last) = results[0], results[-1]
+        ratio = (last / last_lines) / (first / first_lines)
+        status = 'OK' if ratio <= args.max_ratio else 'НЕЛИНЕЙНО'
+        print(f'  отношение времени на строку: {ratio:.2f} ({status})')
+        failed |= ratio > args.max_ratio
+
+    text = regular_properties(args.sizes[0])
+    declaration = scan(text).find_class('Sample')
+    if len(declaration.properties) != args.sizes[0]:
+        print(f'Сканер нашёл {len(declaration.properties)} свойств из {args.sizes[0]}')
+        failed = True
+
+    text = multiline_attribute(args.sizes[0])
+    properties = scan(text).find_class('Sample').properties
+    expected = '\n'.join(line.strip() for line in text[text.index('[Description'):text.index(')]') + 2].splitlines())
+    if len(properties) != 1 or properties[0].attributes != [expected]:
+        print('Сканер не разобрал многострочный атрибут свойства')
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""
+Генератор синтетических c#-решений для бенчмарков: сущности Domain с документированными свойствами,
+енамами и деревьями навигационных свойств, структура Application/WebApi(WebUI) и признаки Sieve/MediatR.
+Одинаковые параметры дают одинаковое решение
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from pathlib import Path
+
+solution_name = 'Bench'
+property_types = ('string', 'int', 'long?', 'DateTime', 'bool', 'decimal', 'Guid', 'double?')
+
+
+@dataclass(frozen=True)
+class SolutionParameters:
+    """
+    Параметры синтетического решения
+
+    Attributes:
+        entities: число сущностей
+        properties: число скалярных свойств сущности (кроме навигационных и енамов)
+        navigation_depth: глубина дерева навигационных свойств от корневой сущности
+        fan_out: число навигационных свойств-потомков сущности
+        enums: число енамов (сущность i использует енам i % enums)
+        namespace_depth: число частей пространства имён сущности после Domain.Entities
+        webapi: контроллеры в WebApi (иначе - в WebUI)
+        sieve: в Application есть SieveService
+        mediatr: Application.csproj ссылается на MediatR (иначе - Mediator)
+    """
+    entities: int = 30
+    properties: int = 10
+    navigation_depth: int = 2
+    fan_out: int = 2
+    enums: int = 5
+    namespace_depth: int = 2
+    webapi: bool = True
+    sieve: bool = True
+    mediatr: bool = False
+
+
+@dataclass
+class GeneratedEntity:
+    """
+    Attributes:
+        name: имя класса сущности
+        namespace_parts: части пространства имён после Domain.Entities
+        parent: родительская сущность в дереве навигационных свойств или None для корневой
+        children: дочерние сущности в дереве навигационных свойств
+        depth: глубина сущности в дереве
+    """
+    name: str
+    namespace_parts: tuple[str, ...]
+    parent: GeneratedEntity | None = None
+    children: list[GeneratedEntity] = field(default_factory=list)
+    depth: int = 0
+
+    @property
+    def namespace(self) -> str:
+        return '.'.join((solution_name, 'Domain', 'Entities', *self.namespace_parts))
+
+
+@dataclass
+class GeneratedSolution:
+    """
+    Attributes:
+        root: директория исходников решения (содержит Domain и Application)
+        entities: пути до файлов сущностей по именам
+        roots: имена корневых сущностей деревьев навигационных свойств
+    """
+    root: Path
+    entities: dict[str, Path]
+    roots: list[str]
+
+    @property
+    def root_paths(self) -> list[Path]:
+        return [self.entities[name] for name in self.roots]
+
+
+def plan_entities(parameters: SolutionParameters) -> list[GeneratedEntity]:
+    """ Разбить сущности на деревья навигационных свойств (обход в ширину), по дереву на модуль """
+    entities = []
+    tree = 0
+    while len(entities) < parameters.entities:
+        parts = (f'Module{tree}', *(f'Part{level}' for level in range(1, parameters.namespace_depth)))
+        root = GeneratedEntity(f'Entity{len(entities)}', parts)
+        entities.append(root)
+        level = [root]
+        for depth in range(1, parameters.navigation_depth + 1):
+            next_level = []
+            for parent in level:
+                for _ in range(parameters.fan_out):
+                    if len(entities) >= parameters.entities:
+                        break
+                    child = GeneratedEntity(f'Entity{len(entities)}', parts, parent, depth=depth)
+                    parent.children.append(child)
+                    entities.append(child)
+                    next_level.append(child)
+            level = next_level
+        tree += 1
+    return entities
+
+
+def _summary(text: str, flag: str = '') -> str:
+    return f'    /// <summary>{flag}\n    /// {text}\n    /// </summary>\n'
+
+
+def entity_source(entity: GeneratedEntity, index: int, parameters: SolutionParameters) -> str:
+    usings = [f'using {solution_name}.Domain.Common;']
+    members = []
+    for number in range(parameters.properties):
+        prop_type = property_types[(index + number) % len(property_types)]
+        attributes = '    [Required]\n' if number % 3 == 0 else ''
+        members.append(f'{_summary(f"Свойство {number}")}{attributes}    public {prop_type} Property{number} {{ get; set; }}\n')
+
+    if parameters.enums:
+        enum = index % parameters.enums
+        usings.append(f'using {solution_name}.Domain.Enums.Module{enum};')
+        members.append(f'{_summary("Статус")}    public Status{enum} Status {{ get; set; }}\n')
+
+    if entity.parent is not None:
+        members.append(f'{_summary("Идентификатор родителя")}    public long {entity.parent.name}Id {{ get; set; }}\n')
+        members.append(f'{_summary("Родитель")}    public {entity.parent.name} {entity.parent.name} {{ get; set; }}\n')
+
+    for number, child in enumerate(entity.children):
+        if number % 2:
+            members.append(f'{_summary(f"Навигационное свойство - {child.name}", "@")}'
+                           f'    public List<{child.name}> {child.name}Items {{ get; set; }} = new();\n')
+        else:
+            members.append(f'{_summary(f"Идентификатор {child.name}")}    public long? {child.name}Id {{ get; set; }}\n')
+            members.append(f'{_summary(f"Навигационное свойство - {child.name}", "@")}'
+                           f'    public {child.name} {child.name} {{ get; set; }}\n')
+
+    return ('\n'.join(usings) + f'\n\nnamespace {entity.namespace};\n\n/// <summary>\n/// Сущность {entity.name}\n'
+            f'/// </summary>\npublic class {entity.name} : BaseEntity\n{{\n' + '\n'.join(members) + '}\n')
+
+
+def enum_source(number: int) -> str:
+    values = ''.join(f'    Value{value},\n' for value in range(5))
+    return f'namespace {solution_name}.Domain.Enums.Module{number};\n\npublic enum Status{number}\n{{\n{values}}}\n'
+
+
+def _write(path: Path, text: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding='utf-8')
+
+
+def generate_solution(directory: Path, parameters: SolutionParameters) -> GeneratedSolution:
+    """
+    Сгенерировать решение в директории
+    :param directory: пустая директория решения (содержит .sln и src)
+    :param parameters: параметры решения
+    """
+    root = directory / 'src'
+    _write(directory / f'{solution_name}.sln', '')
+    mediator = 'MediatR' if parameters.mediatr else 'Mediator'
+    _write(root / 'Application' / 'Application.csproj', f'<Project><PackageReference Include="{mediator}"/></Project>\n')
+    if parameters.sieve:
+        _write(root / 'Application' / 'Common' / 'Services' / 'SieveService.cs',
+               f'namespace {solution_name}.Application.Common.Services;\n\npublic class SieveService\n{{\n}}\n')
+    (root / ('WebApi' if parameters.webapi else 'WebUI') / 'Controllers').mkdir(parents=True)
+
+    for number in range(parameters.enums):
+        _write(root / 'Domain' / 'Enums' / f'Module{number}' / f'Status{number}.cs', enum_source(number))
+
+    paths = {}
+    roots = []
+    for index, entity in enumerate(plan_entities(parameters)):
+        path = root / 'Domain' / 'Entities' / Path(*entity.namespace_parts) / f'{entity.name}.cs'
+        _write(path, entity_source(entity, index, parameters))
+        paths[entity.name] = path
+        if entity.parent is None:
+            roots.append(entity.name)
+    return GeneratedSolution(root, paths, roots)
@@ -0,0 +1,169 @@
+"""
+Бюджет времени запуска: время импорта модулей (python -X importtime) для команды summary
+на небольшом сгенерированном решении и проверка, что команда не импортирует модули генерации CRUD.
+
+Запуск: python -m tests.benchmarks.startup_benchmark [--budget 60] [--cli-budget 120]
+Код возврата 1, если суммарное время импорта превышает бюджет или импортирован запрещённый модуль.
+Те же проверки с бюджетами по умолчанию выполняет pytest (test_client_summary_startup, test_cli_summary_startup)
+"""
+from __future__ import annotations
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+package_root = Path(__file__).resolve().parents[2]
+
+# Бюджеты времени импорта команды summary, мс
+client_budget = 60
+cli_budget = 120
+default_repeat = 10
+
+# Модули, которые не нужны команде summary
+forbidden_modules = ('jinja2', 'typer', 'devnetgen.config', 'devnetgen.constructors', 'concurrent.futures.process')
+
+entity_text = '''using Sample.Domain.Common;
+
+namespace Sample.Domain.Entities.Orders;
+
+/// <summary>
+/// Заказ
+/// </summary>
+public class Order : BaseEntity
+{
+    /// <summary>
+    /// Номер заказа
+    /// </summary>
+    public string Number { get; set; }
+}
+'''
+
+vm_text = '''using Sample.Domain.Entities.Orders;
+
+namespace Sample.Application.Orders.Queries.GetOrder;
+
+public class OrderVm : IMapFrom<Order>
+{
+    public long Id { get; set; }
+
+    public string Number { get; set; }
+}
+'''
+
+# Команды запускаются так же, как консольные скрипты пакета (без runpy)
+client_command = ['-c', 'import sys; from devnetgen.client import main; sys.exit(main())']
+cli_command = ['-c', 'import sys; from devnetgen.main import app; app(args=sys.argv[1:], prog_name="dev-netgen")']
+
+
+def create_solution(directory: Path) -> Path:
+    """ Создать решение из одной сущности и её Vm. :return: путь до файла Vm """
+    (directory / 'Sample.sln').write_text('', encoding='utf-8')
+    entity_path = directory / 'src' / 'Domain' / 'Entities' / 'Orders' / 'Order.cs'
+    vm_path = directory / 'src' / 'Application' / 'Orders' / 'Queries' / 'GetOrder' / 'OrderVm.cs'
+    for path, text in ((entity_path, entity_text), (vm_path, vm_text)):
+        path.parent.mkdir(parents=True)
+        path.write_text(text, encoding='utf-8')
+    return vm_path
+
+
+def parse_importtime(stderr: str) -> tuple[float, dict[str, float]]:
+    """ :return: суммарное время импорта верхнего уровня в мс и накопленное время импорта по модулям в мс """
+    total = 0.0
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line.removeprefix('import time:').split('|')
+        modules[name.strip()] = int(cumulative) / 1000
+        if len(name) - len(name.lstrip()) == 1:
+            total += int(cumulative) / 1000
+    return total, modules
+
+
+def measure(command: list[str], arguments: list[str], socket_path: Path,
+            pycache_path: Path) -> tuple[float, float, dict[str, float]]:
+    """
+    :param pycache_path: директория кэша байткода (PYTHONPYCACHEPREFIX): замеряется запуск с прогретым кэшем,
+     как у установленного пакета, даже если в окружении задан PYTHONDONTWRITEBYTECODE
+    :return: время импорта в мс, время работы процесса в мс и время импорта по модулям
+    """
+    environment = {**os.environ, 'DEVNETGEN_SOCKET': str(socket_path), 'PYTHONPATH': str(package_root),
+                   'PYTHONPYCACHEPREFIX': str(pycache_path)}
+    environment.pop('PYTHONDONTWRITEBYTECODE', None)
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, '-X', 'importtime', *command, *arguments], env=environment,
+                             cwd=package_root, capture_output=True, text=True)
+    elapsed = (time.perf_counter() - start) * 1000
+    if process.returncode != 0:
+        raise RuntimeError(f'Команда завершилась с кодом {process.returncode}:\n{process.stderr[-2000:]}')
+    total, modules = parse_importtime(process.stderr)
+    return total, elapsed, modules
+
+
+def best_of(repeat: int, *args) -> tuple[float, float, dict[str, float]]:
+    """ Лучший из repeat замеров (первый запуск прогревает кэш байткода) """
+    results = [measure(*args) for _ in range(repeat)]
+    return min(results, key=lambda result: result[0])
+
+
+def measure_summary(command: list[str], repeat: int) -> tuple[float, float, dict[str, float]]:
+    """ :return: лучший из repeat замеров команды summary --dry-run на сгенерированном решении без демона """
+    with tempfile.TemporaryDirectory() as directory:
+        vm_path = create_solution(Path(directory))
+        arguments = ['summary', '--dry-run', str(vm_path)]
+        return best_of(repeat, command, arguments, Path(directory) / 'missing.sock', Path(directory) / 'pycache')
+
+
+def forbidden_imports(command: list[str], modules: dict[str, float]) -> list[str]:
+    """ :return: импортированные командой модули, не нужные summary """
+    return [module for module in forbidden_modules if module in modules
+            and not (command is cli_command and module == 'typer')]
+
+
+def slowest_imports(modules: dict[str, float], top: int) -> str:
+    return '\n'.join(f'  {cumulative:8.1f} мс  {module}'
+                     for module, cumulative in sorted(modules.items(), key=lambda item: -item[1])[:top])
+
+
+def test_client_summary_startup():
+    total, _, modules = measure_summary(client_command, default_repeat)
+    assert total <= client_budget, f'импорт {total:.1f} мс, бюджет {client_budget} мс:\n{slowest_imports(modules, 10)}'
+    assert not forbidden_imports(client_command, modules)
+
+
+def test_cli_summary_startup():
+    total, _, modules = measure_summary(cli_command, default_repeat)
+    assert total <= cli_budget, f'импорт {total:.1f} мс, бюджет {cli_budget} мс:\n{slowest_imports(modules, 10)}'
+    assert not forbidden_imports(cli_command, modules)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget', type=float, default=client_budget,
+                        help='бюджет времени импорта dev-netgen-client summary без демона, мс')
+    parser.add_argument('--cli-budget', type=float, default=cli_budget,
+                        help='бюджет времени импорта dev-netgen summary (typer), мс')
+    parser.add_argument('--repeat', type=int, default=default_repeat, help='число замеров')
+    parser.add_argument('--top', type=int, default=10, help='число самых долгих импортов в отчёте')
+    args = parser.parse_args()
+
+    failed = False
+    for name, command, budget in (('dev-netgen-client summary', client_command, args.budget),
+                                  ('dev-netgen summary', cli_command, args.cli_budget)):
+        total, elapsed, modules = measure_summary(command, args.repeat)
+        status = 'OK' if total <= budget else 'ПРЕВЫШЕН'
+        print(f'== {name}: импорт {total:.1f} мс (бюджет {budget:.0f} мс, {status}), процесс {elapsed:.1f} мс')
+        print(slowest_imports(modules, args.top))
+        failed |= total > budget
+
+        if imported := forbidden_imports(command, modules):
+            print(f'  импортированы модули, не нужные команде: {", ".join(imported)}')
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
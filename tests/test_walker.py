@@ -0,0 +1,33 @@
+"""
+Сопоставление шаблонов .gitignore (walker.IgnorePattern)
+"""
+from pathlib import Path
+
+from devnetgen.walker import IgnorePattern
+
+root = Path('/r')
+
+
+def matches(pattern: str, path: str, is_dir: bool = False) -> bool:
+    return IgnorePattern.parse(root, pattern).matches(root / path, is_dir)
+
+
+def test_wildcards_do_not_cross_directories():
+    assert not matches('src/*.cs', 'src/a/b.cs')
+    assert matches('src/*.cs', 'src/b.cs')
+    assert not matches('doc/?.md', 'doc/a/b.md')
+    assert not matches('[!a]/b.md', 'x/y/b.md')
+
+
+def test_double_star_crosses_directories():
+    assert matches('src/**/*.cs', 'src/a/b.cs')
+    assert matches('src/**/*.cs', 'src/b.cs')
+    assert matches('**/gen/x', 'a/b/gen/x')
+    assert matches('a/**', 'a/b/c')
+
+
+def test_unanchored_pattern_matches_name():
+    assert matches('*.g.cs', 'x/y.g.cs')
+    assert matches('**/gen', 'a/gen', True)
+    assert not matches('/bin', 'x/bin', True)
+    assert not matches('gen/', 'a/gen', False)